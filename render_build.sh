@@ -6,5 +6,9 @@ npm install
 npm run build
 
 pip install -r src/backend/requirements.txt
+pip install -r src/backend/requirements-optional.txt
+
+# Precompress dist/ and write the manifest read by the static server
+python tools/compress_assets.py dist
 
 python src/backend/manage.py upgrade
@@ -7,14 +7,17 @@ needed for the Vite front-end build in dist/.
 """
 
 import os
-from flask import send_from_directory
-from backend.app import app as backend_app
+from flask import request
+from backend.app import create_app
+from backend.static_assets import StaticAssets
 
 ENV = "development" if os.getenv("FLASK_DEBUG") == "1" else "production"
 static_file_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), "../dist/")
+# Manifest of the Vite build, scanned once at startup (see static_assets.py).
+static_assets = StaticAssets(static_file_dir)
 
-# Re-export the Tapin backend app so existing deployment scripts keep working.
-app = backend_app
+# Build the Tapin backend app so existing deployment scripts keep working.
+app = create_app()
 
 
 @app.route("/")
@@ -25,23 +28,22 @@ def sitemap():
     """
     if ENV == "development":
         # Reuse the backend's original "/" route if it exists
-        backend_index = app.view_functions.get("index")
+        backend_index = app.view_functions.get("api.index")
         if backend_index and backend_index is not sitemap:
             return backend_index()
-    return send_from_directory(static_file_dir, "index.html")
+    return static_assets.serve("index.html", request)
 
 
 @app.route("/<path:path>", methods=["GET"])
 def serve_any_other_file(path):
     """
-    Serve static assets built by Vite. Unknown paths fall back to index.html
-    so the SPA router can handle them.
+    Serve static assets built by Vite. Hashed bundles are cached as
+    immutable, index.html is revalidated, and unknown paths fall back to
+    index.html so the SPA router can handle them.
     """
-    if not os.path.isfile(os.path.join(static_file_dir, path)):
-        path = "index.html"
-    response = send_from_directory(static_file_dir, path)
-    response.cache_control.max_age = 0  # avoid cache memory
-    return response
+    if ENV == "development" and path not in static_assets.assets:
+        static_assets.scan()  # pick up rebuilds without a restart
+    return static_assets.serve(path, request)
 
 
 if __name__ == "__main__":
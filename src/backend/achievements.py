@@ -0,0 +1,247 @@
+"""Award achievements from signup and review events.
+
+Request handlers call ``emit_signup``/``emit_review`` after committing. The
+events (just the affected user ids) go onto a queue that a background
+thread drains in batches. For each batch the engine reads the users'
+``user_stats`` rows and existing awards with one query each, checks the
+rules in ``RULES`` against those counters, and writes all new awards with a
+single bulk insert. The counters are maintained in the same transaction as
+the signup/review writes (see ``user_stats.py``), so the engine never
+counts signups or reviews itself.
+
+``achievements_awarded`` is sent with the user ids after each batch that
+awarded something.
+
+With ``ACHIEVEMENTS_BACKGROUND`` off (the default under ``TESTING``) events
+stay queued until ``drain()`` is called.
+"""
+
+import logging
+import os
+import queue
+import threading
+from dataclasses import dataclass
+
+from blinker import Namespace
+from flask import current_app
+from sqlalchemy import event, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from models import Achievement, UserAchievement, UserStats, db
+
+log = logging.getLogger(__name__)
+
+_engines = []
+
+_signals = Namespace()
+achievements_awarded = _signals.signal("achievements-awarded")
+
+ACCEPTED_SIGNUPS = "accepted_signups"
+FIVE_STAR_REVIEWS = "five_star_reviews_received"
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    description: str
+    icon: str
+    counter: str
+    threshold: int
+
+
+RULES = (
+    Rule(
+        "First Steps",
+        "Completed your first volunteer opportunity.",
+        "fa-shoe-prints",
+        ACCEPTED_SIGNUPS,
+        1,
+    ),
+    Rule(
+        "Helping Hand",
+        "Completed 5 volunteer opportunities.",
+        "fa-hands-helping",
+        ACCEPTED_SIGNUPS,
+        5,
+    ),
+    Rule(
+        "Community Champion",
+        "Completed 10 volunteer opportunities.",
+        "fa-trophy",
+        ACCEPTED_SIGNUPS,
+        10,
+    ),
+    Rule(
+        "Good Samaritan",
+        "Received a 5-star rating on a review.",
+        "fa-star",
+        FIVE_STAR_REVIEWS,
+        1,
+    ),
+    Rule(
+        "Superstar Volunteer",
+        "Received 5 5-star ratings.",
+        "fa-meteor",
+        FIVE_STAR_REVIEWS,
+        5,
+    ),
+)
+
+
+class AchievementEngine:
+    def __init__(self, app=None, batch_size=100):
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+        self._lock = threading.Lock()  # one batch at a time
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault(
+            "ACHIEVEMENTS_BACKGROUND",
+            os.environ.get("ACHIEVEMENTS_BACKGROUND", "1") == "1"
+            and not app.config.get("TESTING")
+            and not os.environ.get("TESTING"),
+        )
+        app.extensions["achievements"] = self
+        _engines.append(self)
+
+    def reset(self):
+        """Drop queued events (e.g. for a new database)."""
+        with self._lock:
+            while self._next_batch(block=False):
+                pass
+
+    def emit(self, user_id):
+        self.queue.put(user_id)
+        if self.app.config["ACHIEVEMENTS_BACKGROUND"]:
+            self._ensure_worker()
+
+    def _ensure_worker(self):
+        # Threads do not survive a fork (gunicorn --preload), so the worker
+        # is started lazily in the process that serves requests.
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="achievements", daemon=True
+                )
+                self._thread.start()
+
+    def _next_batch(self, block=True):
+        batch = []
+        try:
+            batch.append(self.queue.get(block=block))
+            while len(batch) < self.batch_size:
+                batch.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self.process(batch)
+            except Exception:
+                log.exception("failed to process %d achievement events", len(batch))
+
+    def drain(self):
+        """Process every queued event now; return the awards made."""
+        awards = []
+        while True:
+            batch = self._next_batch(block=False)
+            if not batch:
+                return awards
+            awards.extend(self.process(batch))
+
+    def process(self, batch):
+        user_ids = set(batch)
+        with self._lock, self.app.app_context():
+            stats = {
+                row.user_id: row
+                for row in UserStats.query.filter(UserStats.user_id.in_(user_ids))
+            }
+            awarded = set(
+                db.session.execute(
+                    select(UserAchievement.user_id, Achievement.name)
+                    .join(Achievement, UserAchievement.achievement_id == Achievement.id)
+                    .where(UserAchievement.user_id.in_(user_ids))
+                ).all()
+            )
+            awards = [
+                (user_id, rule.name)
+                for user_id, row in stats.items()
+                for rule in RULES
+                if (user_id, rule.name) not in awarded
+                and getattr(row, rule.counter) >= rule.threshold
+            ]
+            if awards:
+                self._write(awards)
+                achievements_awarded.send(
+                    self, user_ids={user_id for user_id, _ in awards}
+                )
+            return awards
+
+    def _achievement_ids(self):
+        ids = dict(db.session.execute(select(Achievement.name, Achievement.id)).all())
+        missing = [rule for rule in RULES if rule.name not in ids]
+        if missing:
+            db.session.add_all(
+                Achievement(name=r.name, description=r.description, icon=r.icon)
+                for r in missing
+            )
+            db.session.flush()
+            ids = dict(
+                db.session.execute(select(Achievement.name, Achievement.id)).all()
+            )
+        return ids
+
+    def _write(self, awards):
+        ids = self._achievement_ids()
+        rows = [
+            {"user_id": user_id, "achievement_id": ids[name]}
+            for user_id, name in awards
+        ]
+        try:
+            db.session.execute(insert(UserAchievement), rows)
+            db.session.commit()
+        except IntegrityError:
+            # Another process awarded some of these already; keep the rest.
+            db.session.rollback()
+            ids = self._achievement_ids()
+            for user_id, name in awards:
+                try:
+                    with db.session.begin_nested():
+                        db.session.add(
+                            UserAchievement(user_id=user_id, achievement_id=ids[name])
+                        )
+                except IntegrityError:
+                    pass
+            db.session.commit()
+
+
+@event.listens_for(UserAchievement.__table__, "after_create")
+def _reset_engines(table, connection, **kw):
+    for engine in _engines:
+        engine.reset()
+
+
+def _engine():
+    return current_app.extensions["achievements"]
+
+
+def emit_signup(signup):
+    """Report a change to ``signup`` (call after committing it)."""
+    _engine().emit(signup.user_id)
+
+
+def emit_review(review, listing):
+    """Report a new review of ``listing`` (call after committing it)."""
+    if listing.owner_id is not None:
+        _engine().emit(listing.owner_id)
@@ -0,0 +1,71 @@
+"""listing categories lookup table
+
+Revision ID: 0002_listing_categories
+Revises: 0001_initial
+Create Date: 2025-11-25 00:00:00.000000
+
+Replaces the free-text ``listing.category`` column with an indexed
+``listing.category_id`` foreign key to a seeded ``category`` table. The
+``listing`` table predates alembic in some databases (it was created with
+``db.create_all()``), so every step checks what already exists.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from categories import LISTING_CATEGORIES
+
+# revision identifiers, used by Alembic.
+revision = "0002_listing_categories"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = inspector.get_table_names()
+
+    if "category" not in tables:
+        category = op.create_table(
+            "category",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(length=80), nullable=False, unique=True),
+        )
+        op.bulk_insert(category, [{"name": name} for name in LISTING_CATEGORIES])
+
+    if "listing" not in tables:
+        return
+    columns = {column["name"] for column in inspector.get_columns("listing")}
+    if "category_id" not in columns:
+        with op.batch_alter_table("listing") as batch:
+            batch.add_column(sa.Column("category_id", sa.Integer(), nullable=True))
+            batch.create_foreign_key(
+                "fk_listing_category_id", "category", ["category_id"], ["id"]
+            )
+            batch.create_index("ix_listing_category_id", ["category_id"])
+    if "category" in columns:
+        op.execute(
+            "UPDATE listing SET category_id = ("
+            " SELECT category.id FROM category"
+            " WHERE lower(category.name) = lower(listing.category)"
+            ") WHERE category_id IS NULL AND category IS NOT NULL"
+        )
+        with op.batch_alter_table("listing") as batch:
+            batch.drop_column("category")
+
+
+def downgrade():
+    with op.batch_alter_table("listing") as batch:
+        batch.add_column(sa.Column("category", sa.String(length=80), nullable=True))
+    op.execute(
+        "UPDATE listing SET category = ("
+        " SELECT category.name FROM category WHERE category.id = listing.category_id"
+        ")"
+    )
+    with op.batch_alter_table("listing") as batch:
+        batch.drop_index("ix_listing_category_id")
+        batch.drop_constraint("fk_listing_category_id", type_="foreignkey")
+        batch.drop_column("category_id")
+    op.drop_table("category")
@@ -0,0 +1,43 @@
+"""unique (user_id, value) on user_values
+
+Revision ID: 0003_user_values_unique
+Revises: 0002_listing_categories
+Create Date: 2025-11-26 00:00:00.000000
+
+Duplicate rows left behind by the one-value-at-a-time endpoints are removed
+(keeping the oldest) before the constraint is added.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0003_user_values_unique"
+down_revision = "0002_listing_categories"
+branch_labels = None
+depends_on = None
+
+CONSTRAINT = "uq_user_values_user_id_value"
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if "user_values" not in inspector.get_table_names():
+        return
+    existing = {c["name"] for c in inspector.get_unique_constraints("user_values")}
+    if CONSTRAINT in existing:
+        return
+    op.execute(
+        "DELETE FROM user_values WHERE id NOT IN ("
+        " SELECT keep_id FROM ("
+        "  SELECT MIN(id) AS keep_id FROM user_values GROUP BY user_id, value"
+        " ) AS keep"
+        ")"
+    )
+    with op.batch_alter_table("user_values") as batch:
+        batch.create_unique_constraint(CONSTRAINT, ["user_id", "value"])
+
+
+def downgrade():
+    with op.batch_alter_table("user_values") as batch:
+        batch.drop_constraint(CONSTRAINT, type_="unique")
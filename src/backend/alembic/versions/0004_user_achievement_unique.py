@@ -0,0 +1,44 @@
+"""unique (user_id, achievement_id) on user_achievement
+
+Revision ID: 0004_user_achievement_unique
+Revises: 0003_user_values_unique
+Create Date: 2025-11-27 00:00:00.000000
+
+Lets the achievement engine bulk insert awards without checking first.
+Duplicate awards (e.g. from seed data) are removed, keeping the oldest.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0004_user_achievement_unique"
+down_revision = "0003_user_values_unique"
+branch_labels = None
+depends_on = None
+
+CONSTRAINT = "uq_user_achievement_user_id_achievement_id"
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if "user_achievement" not in inspector.get_table_names():
+        return
+    existing = {c["name"] for c in inspector.get_unique_constraints("user_achievement")}
+    if CONSTRAINT in existing:
+        return
+    op.execute(
+        "DELETE FROM user_achievement WHERE id NOT IN ("
+        " SELECT keep_id FROM ("
+        "  SELECT MIN(id) AS keep_id FROM user_achievement"
+        "  GROUP BY user_id, achievement_id"
+        " ) AS keep"
+        ")"
+    )
+    with op.batch_alter_table("user_achievement") as batch:
+        batch.create_unique_constraint(CONSTRAINT, ["user_id", "achievement_id"])
+
+
+def downgrade():
+    with op.batch_alter_table("user_achievement") as batch:
+        batch.drop_constraint(CONSTRAINT, type_="unique")
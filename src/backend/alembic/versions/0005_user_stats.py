@@ -0,0 +1,40 @@
+"""user_stats counters table
+
+Revision ID: 0005_user_stats
+Revises: 0004_user_achievement_unique
+Create Date: 2025-11-28 00:00:00.000000
+
+The table starts empty; 0014_backfill_user_stats fills it from the
+existing signups and reviews.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0005_user_stats"
+down_revision = "0004_user_achievement_unique"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if "user_stats" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "user_stats",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("user.id"), primary_key=True),
+        sa.Column("signups", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("accepted_signups", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("reviews_written", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "five_star_reviews_received",
+            sa.Integer(),
+            nullable=False,
+            server_default="0",
+        ),
+    )
+
+
+def downgrade():
+    op.drop_table("user_stats")
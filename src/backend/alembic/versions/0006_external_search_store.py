@@ -0,0 +1,44 @@
+"""external_event / external_search store for federated search
+
+Revision ID: 0006_external_search_store
+Revises: 0005_user_stats
+Create Date: 2025-12-02 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0006_external_search_store"
+down_revision = "0005_user_stats"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    if "external_event" not in tables:
+        op.create_table(
+            "external_event",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("url_hash", sa.String(length=64), nullable=False, unique=True),
+            sa.Column("url", sa.Text(), nullable=False),
+            sa.Column("title", sa.String(length=300), nullable=False),
+            sa.Column("snippet", sa.Text(), nullable=False),
+            sa.Column("category", sa.String(length=64), nullable=True),
+            sa.Column("fetched_at", sa.DateTime(), nullable=False),
+        )
+    if "external_search" not in tables:
+        op.create_table(
+            "external_search",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("query_hash", sa.String(length=64), nullable=False, unique=True),
+            sa.Column("query_text", sa.String(length=500), nullable=False),
+            sa.Column("url_hashes", sa.JSON(), nullable=False),
+            sa.Column("fetched_at", sa.DateTime(), nullable=False),
+        )
+
+
+def downgrade():
+    op.drop_table("external_search")
+    op.drop_table("external_event")
@@ -0,0 +1,41 @@
+"""job table for the background job queue
+
+Revision ID: 0007_job_queue
+Revises: 0006_external_search_store
+Create Date: 2025-12-04 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0007_job_queue"
+down_revision = "0006_external_search_store"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if "job" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "job",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False, server_default="5"),
+        sa.Column("run_at", sa.DateTime(), nullable=False),
+        sa.Column("locked_until", sa.DateTime(), nullable=True),
+        sa.Column("locked_by", sa.String(length=64), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_job_status_run_at", "job", ["status", "run_at"])
+
+
+def downgrade():
+    op.drop_index("ix_job_status_run_at", table_name="job")
+    op.drop_table("job")
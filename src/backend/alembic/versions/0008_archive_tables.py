@@ -0,0 +1,66 @@
+"""listing/sign_up/review archive tables for the cleanup job
+
+Revision ID: 0008_archive_tables
+Revises: 0007_job_queue
+Create Date: 2025-12-06 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0008_archive_tables"
+down_revision = "0007_job_queue"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    if "listing_archive" not in tables:
+        op.create_table(
+            "listing_archive",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column("title", sa.String(length=120), nullable=False),
+            sa.Column("description", sa.String(length=240), nullable=False),
+            sa.Column("location", sa.String(length=120), nullable=True),
+            sa.Column("latitude", sa.Float(), nullable=True),
+            sa.Column("longitude", sa.Float(), nullable=True),
+            sa.Column("category_id", sa.Integer(), nullable=True),
+            sa.Column("image_url", sa.String(length=240), nullable=True),
+            sa.Column("owner_id", sa.Integer(), nullable=True),
+            sa.Column("organization_id", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("archived_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_listing_archive_owner_id", "listing_archive", ["owner_id"])
+    if "sign_up_archive" not in tables:
+        op.create_table(
+            "sign_up_archive",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("listing_id", sa.Integer(), nullable=False),
+            sa.Column("message", sa.String(length=500), nullable=True),
+            sa.Column("status", sa.String(length=20), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("archived_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_sign_up_archive_user_id", "sign_up_archive", ["user_id"])
+    if "review_archive" not in tables:
+        op.create_table(
+            "review_archive",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column("rating", sa.Integer(), nullable=False),
+            sa.Column("text", sa.String(length=240), nullable=True),
+            sa.Column("user_id", sa.Integer(), nullable=True),
+            sa.Column("listing_id", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("archived_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_review_archive_user_id", "review_archive", ["user_id"])
+
+
+def downgrade():
+    op.drop_table("review_archive")
+    op.drop_table("sign_up_archive")
+    op.drop_table("listing_archive")
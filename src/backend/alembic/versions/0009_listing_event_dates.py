@@ -0,0 +1,45 @@
+"""listing.starts_at / ends_at with range indexes
+
+Revision ID: 0009_listing_event_dates
+Revises: 0008_archive_tables
+Create Date: 2025-12-08 00:00:00.000000
+
+Existing listings keep NULL dates: they are treated as ongoing.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0009_listing_event_dates"
+down_revision = "0008_archive_tables"
+branch_labels = None
+depends_on = None
+
+
+def _columns(table):
+    return {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    if "starts_at" not in _columns("listing"):
+        with op.batch_alter_table("listing") as batch:
+            batch.add_column(sa.Column("starts_at", sa.DateTime(), nullable=True))
+            batch.add_column(sa.Column("ends_at", sa.DateTime(), nullable=True))
+            batch.create_index("ix_listing_starts_at", ["starts_at"])
+            batch.create_index("ix_listing_ends_at", ["ends_at"])
+    if "starts_at" not in _columns("listing_archive"):
+        with op.batch_alter_table("listing_archive") as batch:
+            batch.add_column(sa.Column("starts_at", sa.DateTime(), nullable=True))
+            batch.add_column(sa.Column("ends_at", sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("listing_archive") as batch:
+        batch.drop_column("ends_at")
+        batch.drop_column("starts_at")
+    with op.batch_alter_table("listing") as batch:
+        batch.drop_index("ix_listing_ends_at")
+        batch.drop_index("ix_listing_starts_at")
+        batch.drop_column("ends_at")
+        batch.drop_column("starts_at")
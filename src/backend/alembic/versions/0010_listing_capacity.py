@@ -0,0 +1,51 @@
+"""listing.capacity / filled for atomic slot reservation
+
+Revision ID: 0010_listing_capacity
+Revises: 0009_listing_event_dates
+Create Date: 2025-12-15 00:00:00.000000
+
+Existing listings get no capacity (unlimited); ``filled`` is backfilled
+from their pending and accepted signups.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0010_listing_capacity"
+down_revision = "0009_listing_event_dates"
+branch_labels = None
+depends_on = None
+
+
+def _columns(table):
+    return {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    if "capacity" not in _columns("listing"):
+        with op.batch_alter_table("listing") as batch:
+            batch.add_column(sa.Column("capacity", sa.Integer(), nullable=True))
+            batch.add_column(
+                sa.Column("filled", sa.Integer(), nullable=False, server_default="0")
+            )
+        op.execute(
+            "UPDATE listing SET filled = ("
+            "SELECT COUNT(*) FROM sign_up WHERE sign_up.listing_id = listing.id "
+            "AND sign_up.status IN ('pending', 'accepted'))"
+        )
+    if "capacity" not in _columns("listing_archive"):
+        with op.batch_alter_table("listing_archive") as batch:
+            batch.add_column(sa.Column("capacity", sa.Integer(), nullable=True))
+            batch.add_column(
+                sa.Column("filled", sa.Integer(), nullable=False, server_default="0")
+            )
+
+
+def downgrade():
+    with op.batch_alter_table("listing_archive") as batch:
+        batch.drop_column("filled")
+        batch.drop_column("capacity")
+    with op.batch_alter_table("listing") as batch:
+        batch.drop_column("filled")
+        batch.drop_column("capacity")
@@ -0,0 +1,54 @@
+"""sign_up.waitlist_position and listing.waitlist_seq
+
+Revision ID: 0011_signup_waitlist
+Revises: 0010_listing_capacity
+Create Date: 2025-12-22 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0011_signup_waitlist"
+down_revision = "0010_listing_capacity"
+branch_labels = None
+depends_on = None
+
+
+def _columns(table):
+    return {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _seq_column():
+    return sa.Column("waitlist_seq", sa.Integer(), nullable=False, server_default="0")
+
+
+def upgrade():
+    if "waitlist_position" not in _columns("sign_up"):
+        with op.batch_alter_table("sign_up") as batch:
+            batch.add_column(
+                sa.Column("waitlist_position", sa.Integer(), nullable=True)
+            )
+            batch.create_index(
+                "ix_sign_up_listing_waitlist", ["listing_id", "waitlist_position"]
+            )
+    if "waitlist_position" not in _columns("sign_up_archive"):
+        with op.batch_alter_table("sign_up_archive") as batch:
+            batch.add_column(
+                sa.Column("waitlist_position", sa.Integer(), nullable=True)
+            )
+    for table in ("listing", "listing_archive"):
+        if "waitlist_seq" not in _columns(table):
+            with op.batch_alter_table(table) as batch:
+                batch.add_column(_seq_column())
+
+
+def downgrade():
+    for table in ("listing_archive", "listing"):
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("waitlist_seq")
+    with op.batch_alter_table("sign_up_archive") as batch:
+        batch.drop_column("waitlist_position")
+    with op.batch_alter_table("sign_up") as batch:
+        batch.drop_index("ix_sign_up_listing_waitlist")
+        batch.drop_column("waitlist_position")
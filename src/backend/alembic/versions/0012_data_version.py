@@ -0,0 +1,30 @@
+"""data_version: shared version counters for cross-process cache keys
+
+Revision ID: 0012_data_version
+Revises: 0011_signup_waitlist
+Create Date: 2025-12-29 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0012_data_version"
+down_revision = "0011_signup_waitlist"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table("data_version"):
+        return
+    table = op.create_table(
+        "data_version",
+        sa.Column("name", sa.String(length=40), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+    )
+    op.bulk_insert(table, [{"name": "listings", "version": 0}])
+
+
+def downgrade():
+    op.drop_table("data_version")
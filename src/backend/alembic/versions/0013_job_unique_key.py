@@ -0,0 +1,39 @@
+"""job.unique_key with a partial unique index over queued jobs
+
+Revision ID: 0013_job_unique_key
+Revises: 0012_data_version
+Create Date: 2026-01-05 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0013_job_unique_key"
+down_revision = "0012_data_version"
+branch_labels = None
+depends_on = None
+
+QUEUED = sa.text("status = 'queued'")
+
+
+def upgrade():
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("job")}
+    if "unique_key" in columns:
+        return
+    with op.batch_alter_table("job") as batch:
+        batch.add_column(sa.Column("unique_key", sa.String(length=64), nullable=True))
+    op.create_index(
+        "uq_job_queued_unique_key",
+        "job",
+        ["unique_key"],
+        unique=True,
+        sqlite_where=QUEUED,
+        postgresql_where=QUEUED,
+    )
+
+
+def downgrade():
+    op.drop_index("uq_job_queued_unique_key", table_name="job")
+    with op.batch_alter_table("job") as batch:
+        batch.drop_column("unique_key")
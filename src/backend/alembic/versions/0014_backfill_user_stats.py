@@ -0,0 +1,62 @@
+"""fill user_stats from existing signups and reviews
+
+Revision ID: 0014_backfill_user_stats
+Revises: 0013_job_unique_key
+Create Date: 2026-01-09 00:00:00.000000
+
+0005 created ``user_stats`` empty, and the flush hooks only apply deltas,
+so users with earlier activity were undercounted from their next write
+on. This recomputes every row from the live and archive tables in one
+``INSERT ... SELECT ... GROUP BY``, the same counts as
+``user_stats.backfill()``.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0014_backfill_user_stats"
+down_revision = "0013_job_unique_key"
+branch_labels = None
+depends_on = None
+
+BACKFILL = """
+WITH signups AS (
+    SELECT user_id, status FROM sign_up
+    UNION ALL SELECT user_id, status FROM sign_up_archive
+), reviews AS (
+    SELECT user_id, listing_id, rating FROM review
+    UNION ALL SELECT user_id, listing_id, rating FROM review_archive
+), listings AS (
+    SELECT id, owner_id FROM listing
+    UNION ALL SELECT id, owner_id FROM listing_archive
+), counts AS (
+    SELECT user_id, 1 AS signups,
+           CASE WHEN status = 'accepted' THEN 1 ELSE 0 END AS accepted_signups,
+           0 AS reviews_written, 0 AS five_star_reviews_received
+    FROM signups
+    UNION ALL
+    SELECT user_id, 0, 0, 1, 0 FROM reviews
+    UNION ALL
+    SELECT listings.owner_id, 0, 0, 0, 1
+    FROM reviews JOIN listings ON listings.id = reviews.listing_id
+    WHERE reviews.rating = 5
+)
+INSERT INTO user_stats (
+    user_id, signups, accepted_signups, reviews_written, five_star_reviews_received
+)
+SELECT counts.user_id, SUM(signups), SUM(accepted_signups),
+       SUM(reviews_written), SUM(five_star_reviews_received)
+FROM counts JOIN "user" ON "user".id = counts.user_id
+GROUP BY counts.user_id
+"""
+
+
+def upgrade():
+    op.execute("DELETE FROM user_stats")
+    op.execute(sa.text(BACKFILL))
+
+
+def downgrade():
+    # The counters stay valid; there is nothing to undo.
+    pass
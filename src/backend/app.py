@@ -1,15 +1,26 @@
+"""Tapin backend API.
+
+``create_app(config)`` builds a configured Flask app; the routes live on the
+``api`` blueprint. Importing this module stays cheap: nothing is configured
+until an app is created, and heavy optional dependencies (googleapiclient,
+smtplib, flask_migrate) are imported only when used. ``app`` is still
+available as a module attribute (``from app import app``, gunicorn's
+``app:app``) and is created on first access.
+"""
+
 import os
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from flask import Flask, request, jsonify, url_for, abort
-from flask_migrate import Migrate
-from flask_swagger import swagger
+from flask import Blueprint, Flask, current_app, request, jsonify, url_for, abort
 from flask_cors import CORS
 from flask_jwt_extended import (
-    create_access_token,
     get_jwt_identity,
     jwt_required,
     JWTManager,
 )
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+from sqlalchemy import and_, delete, insert, select
+from sqlalchemy.exc import IntegrityError
 from werkzeug.security import generate_password_hash, check_password_hash
 from models import (
     db,
@@ -22,74 +33,129 @@ from models import (
     UserAchievement,
     Achievement,
     SignUp,
+    as_utc,
+    category_id_for,
 )
-from google_search import search_events
+from federated_search import federated_search
+from google_search import SearchError, breaker as search_breaker
 from auth import token_for
+from jobs import enqueue, job
+import maintenance  # noqa: F401  (registers the cleanup job)
+from cache import cache
+from capacity import holds_slot, promote, release_slot, reserve_slot, waitlist
+from health import cached_database_probe, pool_status
+from facets import cached_facets
+from recommendations import index as recommendation_index
+from achievements import AchievementEngine, emit_review, emit_signup
+from user_stats import stats_for
+from leaderboard import boards as leaderboards
+from db_routing import init_read_replica, read_replica
+from db_pool import engine_options
+from compression import init_compression
+from signup_events import current_broker, init_signup_events, stream_response
+
+api = Blueprint("api", __name__)
 
-app = Flask(__name__)
 base_dir = os.path.abspath(os.path.dirname(__file__))
-# Load .env: prefer repository root `.env`, then backend `.env` (robust for local dev).
-try:
-    from dotenv import load_dotenv
+repo_root = Path(__file__).resolve().parents[2]
+
 
-    repo_root = Path(__file__).resolve().parents[2]
+def load_env():
+    """Load .env: prefer repository root `.env`, then backend `.env`."""
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
     backend_env = Path(__file__).resolve().parent / ".env"
-    env_candidates = [repo_root / ".env", backend_env]
-    for env_path in env_candidates:
+    for env_path in [repo_root / ".env", backend_env]:
         if env_path.exists():
             load_dotenv(env_path)
             break
-except Exception:
-    pass
 
-repo_root = Path(__file__).resolve().parents[2]
-# Default to a repo-root SQLite DB when no DB URL provided. This makes local
-# development and examples use `data.db` at the repository root rather than
-# scattering DB files inside service directories.
-default_db = "sqlite:///" + str(repo_root / "data.db")
-app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
-    "SQLALCHEMY_DATABASE_URI", default_db
-)
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-# Supabase connection pooling configuration for transaction mode (port 6543)
-db_url = app.config["SQLALCHEMY_DATABASE_URI"]
-
-# Skip engine options entirely for testing/SQLite
-if os.environ.get("TESTING") == "1" or (
-    isinstance(db_url, str) and db_url.lower().startswith("sqlite")
-):
-    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {}
-else:
-    engine_options = {
-        "pool_pre_ping": True,
-        "pool_recycle": 300,
-        "pool_size": 5,
-        "max_overflow": 10,
+
+def default_config():
+    """Configuration read from the environment."""
+    # Default to a repo-root SQLite DB when no DB URL provided. This makes local
+    # development and examples use `data.db` at the repository root rather than
+    # scattering DB files inside service directories.
+    default_db = "sqlite:///" + str(repo_root / "data.db")
+    config = {
+        "SQLALCHEMY_DATABASE_URI": os.environ.get(
+            "SQLALCHEMY_DATABASE_URI", default_db
+        ),
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+        "REPLICA_STICKY_SECONDS": float(os.environ.get("REPLICA_STICKY_SECONDS", 10)),
+        "HEALTH_READY_CACHE_SECONDS": float(
+            os.environ.get("HEALTH_READY_CACHE_SECONDS", 5)
+        ),
+        "FACETS_CACHE_SECONDS": float(os.environ.get("FACETS_CACHE_SECONDS", 300)),
+        "EXTERNAL_SEARCH_TTL_SECONDS": float(
+            os.environ.get("EXTERNAL_SEARCH_TTL_SECONDS", 86400)
+        ),
+        "SEARCH_LOCAL_ENOUGH": int(os.environ.get("SEARCH_LOCAL_ENOUGH", 10)),
+        "SEARCH_DEADLINE_SECONDS": float(os.environ.get("SEARCH_DEADLINE_SECONDS", 5)),
+        "LISTING_INACTIVE_DAYS": int(os.environ.get("LISTING_INACTIVE_DAYS", 180)),
+        "LISTING_ENDED_DAYS": int(os.environ.get("LISTING_ENDED_DAYS", 30)),
+        "SIGNUP_RETENTION_DAYS": int(os.environ.get("SIGNUP_RETENTION_DAYS", 90)),
+        "CLEANUP_BATCH_SIZE": int(os.environ.get("CLEANUP_BATCH_SIZE", 500)),
+        "CLEANUP_INTERVAL_SECONDS": float(
+            os.environ.get("CLEANUP_INTERVAL_SECONDS", 86400)
+        ),
+        "REDIS_URL": os.environ.get("REDIS_URL"),
+        "SSE_KEEPALIVE_SECONDS": float(os.environ.get("SSE_KEEPALIVE_SECONDS", 15)),
+        "SSE_MAX_SECONDS": float(os.environ.get("SSE_MAX_SECONDS", 300)),
+        "SSE_QUEUE_SIZE": int(os.environ.get("SSE_QUEUE_SIZE", 100)),
+        "SSE_MAX_STREAMS": int(os.environ.get("SSE_MAX_STREAMS", 4)),
+        "SSE_REPLAY_SIZE": int(os.environ.get("SSE_REPLAY_SIZE", 1000)),
+        "SECRET_KEY": os.environ.get("SECRET_KEY", "dev-secret-key"),
+        "JWT_SECRET_KEY": os.environ.get("JWT_SECRET_KEY", "dev-jwt-secret-key"),
+        "SECURITY_PASSWORD_SALT": os.environ.get("SECURITY_PASSWORD_SALT", "dev-salt"),
     }
+    # Optional read replica for read-only endpoints (see db_routing.py)
+    replica_uri = os.environ.get("SQLALCHEMY_REPLICA_URI")
+    if replica_uri:
+        config["SQLALCHEMY_BINDS"] = {"replica": replica_uri}
+    return config
 
-    # Use PostgreSQL-specific connect args only when using psycopg2
-    if isinstance(db_url, str) and db_url.lower().startswith("postgresql"):
-        engine_options["connect_args"] = {
-            "connect_timeout": 10,
-            "options": "-c statement_timeout=30000",
-        }
 
-    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options
+def create_app(config=None):
+    """Create and configure the Flask app.
 
-app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev-secret-key")
-app.config["JWT_SECRET_KEY"] = os.environ.get("JWT_SECRET_KEY", "dev-jwt-secret-key")
-app.config["SECURITY_PASSWORD_SALT"] = os.environ.get(
-    "SECURITY_PASSWORD_SALT", "dev-salt"
-)
+    ``config`` is a mapping applied over the environment-derived defaults.
+    """
+    load_env()
+    app = Flask(__name__)
+    app.config.update(default_config())
+    if config:
+        app.config.update(config)
+    # Pool settings depend on the URL (e.g. Supabase transaction pooling on
+    # port 6543) and on the worker/thread model; see db_pool.py.
+    app.config.setdefault(
+        "SQLALCHEMY_ENGINE_OPTIONS",
+        engine_options(app.config["SQLALCHEMY_DATABASE_URI"]),
+    )
 
-CORS(app)
+    init_compression(app)  # registered first so it runs after other hooks
+    CORS(app)
+    db.init_app(app)
+    try:
+        # Only needed for the `flask db` commands.
+        from flask_migrate import Migrate
+    except ImportError:
+        pass
+    else:
+        Migrate(app, db)
+    JWTManager(app)
+    init_read_replica(app)
+    AchievementEngine(app)
+    init_signup_events(app)
+    app.register_blueprint(api)
 
-db.init_app(app)
-migrate = Migrate(app, db)
-jwt = JWTManager(app)
+    _warn_on_default_secrets(app)
+    return app
 
 
-def _warn_on_default_secrets():
+def _warn_on_default_secrets(app):
     """Log a warning if important secret env vars are left at their dev defaults.
 
     This is only advisory and will not stop the app from running. It's helpful
@@ -120,43 +186,62 @@ def _warn_on_default_secrets():
         )
 
 
-_warn_on_default_secrets()
+_default_app = None
 
 
-@app.route("/")
+def __getattr__(name):
+    # `app` is created lazily so that importing this module (tests, CLI
+    # tools) does not configure extensions until an app is actually needed.
+    global _default_app
+    if name == "app":
+        if _default_app is None:
+            _default_app = create_app()
+        return _default_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@api.route("/")
 def index():
     return jsonify({"message": "Tapin Backend API Root"})
 
 
-@app.route("/api/health", methods=["GET"])
-def api_health():
-    """Enhanced health check including database connectivity."""
-    health_status = {"status": "ok", "components": {}}
+@api.route("/api/health/live", methods=["GET"])
+def api_health_live():
+    """Liveness probe: the process is up and serving requests. No I/O."""
+    return jsonify({"status": "ok"}), 200
 
-    try:
-        db.session.execute(db.text("SELECT 1"))
-        health_status["components"]["database"] = {
-            "status": "connected",
-            "uri_prefix": app.config["SQLALCHEMY_DATABASE_URI"][:20] + "...",
-            "pool_size": (
-                db.engine.pool.size() if hasattr(db.engine.pool, "size") else "N/A"
-            ),
-        }
-    except Exception as e:
-        health_status["status"] = "degraded"
-        health_status["components"]["database"] = {"status": "error", "error": str(e)}
-        return jsonify(health_status), 503
 
-    return jsonify(health_status), 200
+@api.route("/api/health", methods=["GET"])
+@api.route("/api/health/ready", methods=["GET"])
+def api_health_ready():
+    """Readiness probe with a cached database check and pool/cache status.
+
+    ``/api/health`` is kept as an alias for existing monitors.
+    """
+    healthy, database = cached_database_probe(
+        current_app.config["HEALTH_READY_CACHE_SECONDS"]
+    )
+    health_status = {
+        "status": "ok" if healthy else "degraded",
+        "components": {
+            "database": database,
+            "pool": pool_status(db.engine),
+            "cache": cache.status(),
+            # Informational: search degrades to stored results while open.
+            "google_search": search_breaker.status(),
+            "signup_streams": current_broker().status(),
+        },
+    }
+    return jsonify(health_status), 200 if healthy else 503
 
 
-@app.route("/api/items", methods=["GET"])
+@api.route("/api/items", methods=["GET"])
 def api_list_items():
     items = Item.query.order_by(Item.id.asc()).all()
     return jsonify({"items": [i.to_dict() for i in items]}), 200
 
 
-@app.route("/api/items", methods=["POST"])
+@api.route("/api/items", methods=["POST"])
 @jwt_required()
 def api_create_item():
     data = request.get_json() or {}
@@ -169,7 +254,7 @@ def api_create_item():
     return jsonify(item.to_dict()), 201
 
 
-@app.route("/register", methods=["POST"])
+@api.route("/register", methods=["POST"])
 def register_user():
     data = request.get_json() or {}
     email = data.get("email")
@@ -188,7 +273,7 @@ def register_user():
     return jsonify({"message": "user created", "user": user.to_dict(), **tokens}), 201
 
 
-@app.route("/login", methods=["POST"])
+@api.route("/login", methods=["POST"])
 def login_user():
     data = request.get_json() or {}
     email = data.get("email")
@@ -202,7 +287,7 @@ def login_user():
     return jsonify({"message": "login successful", "user": user.to_dict(), **tokens})
 
 
-@app.route("/refresh", methods=["POST"])
+@api.route("/refresh", methods=["POST"])
 @jwt_required(refresh=True)
 def refresh_token():
     """Exchange a valid refresh token for a new access token."""
@@ -218,7 +303,7 @@ def refresh_token():
     return jsonify({"access_token": access_token})
 
 
-@app.route("/me", methods=["GET"])
+@api.route("/me", methods=["GET"])
 @jwt_required()
 def me():
     uid = get_jwt_identity()
@@ -232,6 +317,10 @@ def me():
     return jsonify({"user": user.to_dict()})
 
 
+def get_serializer():
+    return URLSafeTimedSerializer(current_app.config["SECRET_KEY"])
+
+
 def send_reset_email(to_email, reset_url):
     smtp_host = os.environ.get("SMTP_HOST")
     if not smtp_host:
@@ -241,6 +330,9 @@ def send_reset_email(to_email, reset_url):
     smtp_pass = os.environ.get("SMTP_PASS")
     use_tls = os.environ.get("SMTP_USE_TLS", "true").lower() in ("1", "true", "yes")
 
+    import smtplib
+    from email.message import EmailMessage
+
     msg = EmailMessage()
     msg["Subject"] = "Tapin Password Reset"
     msg["From"] = smtp_user or f"no-reply@{smtp_host}"
@@ -262,7 +354,15 @@ def send_reset_email(to_email, reset_url):
         return False, str(e)
 
 
-@app.route("/reset-password", methods=["POST"])
+@job("send_reset_email")
+def send_reset_email_job(to_email, reset_url):
+    """Worker side of `/reset-password`; raising makes the queue retry."""
+    sent, info = send_reset_email(to_email, reset_url)
+    if not sent:
+        raise RuntimeError(info)
+
+
+@api.route("/reset-password", methods=["POST"])
 def reset_password():
     data = request.get_json() or {}
     email = data.get("email")
@@ -274,23 +374,24 @@ def reset_password():
         return jsonify({"message": msg})
 
     serializer = get_serializer()
-    token = serializer.dumps(email, salt=app.config["SECURITY_PASSWORD_SALT"])
-    reset_url = url_for("confirm_reset", token=token, _external=True)
+    token = serializer.dumps(email, salt=current_app.config["SECURITY_PASSWORD_SALT"])
+    reset_url = url_for("api.confirm_reset", token=token, _external=True)
 
-    sent, info = send_reset_email(email, reset_url)
-    if sent:
-        return jsonify({"message": "reset email sent"})
-    else:
+    if not os.environ.get("SMTP_HOST"):
         return jsonify(
             {
                 "message": "smtp not configured, returning reset link (dev)",
                 "reset_url": reset_url,
-                "error": info,
+                "error": "SMTP not configured",
             }
         )
+    # The SMTP session runs on a job worker (`python manage.py worker`).
+    enqueue("send_reset_email", to_email=email, reset_url=reset_url)
+    db.session.commit()
+    return jsonify({"message": "reset email sent"})
 
 
-@app.route("/reset-password/confirm/<token>", methods=["POST"])
+@api.route("/reset-password/confirm/<token>", methods=["POST"])
 def confirm_reset(token):
     data = request.get_json() or {}
     new_password = data.get("password")
@@ -299,7 +400,7 @@ def confirm_reset(token):
     serializer = get_serializer()
     try:
         email = serializer.loads(
-            token, salt=app.config["SECURITY_PASSWORD_SALT"], max_age=3600
+            token, salt=current_app.config["SECURITY_PASSWORD_SALT"], max_age=3600
         )
     except SignatureExpired:
         return jsonify({"error": "token expired"}), 400
@@ -314,29 +415,186 @@ def confirm_reset(token):
     return jsonify({"message": "password updated"})
 
 
-@app.route("/listings", methods=["GET"])
-def get_listings():
-    q = request.args.get("q", type=str)
-    location = request.args.get("location", type=str)
+def _parse_datetime(value, end_of_day=False):
+    """Parse an ISO 8601 date or datetime into an aware UTC datetime.
 
-    query = Listing.query
+    Naive values are taken as UTC. A bare date means midnight, or with
+    ``end_of_day`` midnight of the next day. Raises ValueError.
+    """
+    if value.endswith(("Z", "z")):
+        # Python 3.10's fromisoformat does not accept the "Z" suffix.
+        value = value[:-1] + "+00:00"
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value)
+    else:
+        parsed = datetime.combine(day + timedelta(days=end_of_day), datetime.min.time())
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _listing_filters(args):
+    """SQL conditions for the listing search query args.
+
+    ``q``, ``category`` and ``location`` filter as before. ``from``/``to``
+    (ISO dates or datetimes) keep the dated listings that overlap the window;
+    without them, events that have already ended are left out unless
+    ``include_past=1``. Returns ``{name: condition or None}``; raises
+    ValueError for an unknown category or a bad date.
+    """
+    q = args.get("q", type=str)
+    location = args.get("location", type=str)
+    category = args.get("category", type=str)
+
+    filters = {"q": None, "category": None, "location": None, "when": None}
+    if category and category != "All":
+        category_id = category_id_for(category)
+        if category_id is None:
+            raise ValueError("invalid category")
+        filters["category"] = Listing.category_id == category_id
     if q:
-        categories = ["Community", "Environment", "Education", "Health", "Animals"]
-        if q.lower() in [c.lower() for c in categories]:
-            query = query.filter(Listing.category.ilike(q))
+        category_id = category_id_for(q)
+        if category_id is not None:
+            filters["q"] = Listing.category_id == category_id
         else:
             like = f"%{q}%"
             title_match = Listing.title.ilike(like)
             desc_match = Listing.description.ilike(like)
-            query = query.filter(title_match | desc_match)
+            filters["q"] = title_match | desc_match
     if location:
-        query = query.filter(Listing.location.ilike(f"%{location}%"))
+        filters["location"] = Listing.location.ilike(f"%{location}%")
+
+    try:
+        start = _parse_datetime(args["from"]) if args.get("from") else None
+        end = _parse_datetime(args["to"], end_of_day=True) if args.get("to") else None
+    except ValueError:
+        raise ValueError("from/to must be ISO 8601 dates or datetimes")
+    if start and end and end <= start:
+        raise ValueError("to must be after from")
+    # Range conditions on the indexed starts_at/ends_at columns only.
+    if start or end:
+        conditions = []
+        if start:
+            conditions.append(Listing.ends_at >= start)
+        if end:
+            conditions.append(Listing.starts_at < end)
+        if not start and args.get("include_past") != "1":
+            conditions.append(Listing.ends_at >= datetime.now(timezone.utc))
+        filters["when"] = and_(*conditions)
+    elif args.get("include_past") != "1":
+        filters["when"] = Listing.not_ended()
+    return filters
+
+
+def _event_dates(data, starts_at=None, ends_at=None):
+    """``(starts_at, ends_at)`` from a listing payload, over the current values.
+
+    ``ends_at`` defaults to ``starts_at`` (a one-off event) and must not be
+    before it. Raises ValueError.
+    """
+    try:
+        if "starts_at" in data:
+            value = data["starts_at"]
+            starts_at = _parse_datetime(value) if value else None
+            if "ends_at" not in data:
+                ends_at = starts_at
+        if "ends_at" in data:
+            value = data["ends_at"]
+            ends_at = _parse_datetime(value) if value else starts_at
+    except (TypeError, ValueError):
+        raise ValueError("starts_at/ends_at must be ISO 8601 datetimes")
+    if ends_at is not None and starts_at is None:
+        raise ValueError("ends_at requires starts_at")
+    if ends_at is not None and ends_at < starts_at:
+        raise ValueError("ends_at must not be before starts_at")
+    return starts_at, ends_at
+
+
+def _capacity(value):
+    """Validate a listing capacity: a non-negative int, or None for unlimited."""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError("capacity must be a non-negative integer")
+    return value
+
+
+@api.route("/listings", methods=["GET"])
+@read_replica
+def get_listings():
+    try:
+        filters = _listing_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    query = Listing.query.filter(*[f for f in filters.values() if f is not None])
+    if request.args.get("from") or request.args.get("to"):
+        query = query.order_by(Listing.starts_at, Listing.id)
+    else:
+        query = query.order_by(Listing.created_at.desc())
+    return jsonify([listing.to_dict() for listing in query.all()])
+
 
-    listings = query.order_by(Listing.created_at.desc()).all()
-    return jsonify([listing.to_dict() for listing in listings])
+@api.route("/listings/facets", methods=["GET"])
+def get_listing_facets():
+    """Listing counts per category and per location for the current filters.
+
+    Served from the primary: counts are cached, and the cache must only
+    hold counts as of the current listings version (see ``facets.py``).
+    """
+    try:
+        filters = _listing_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    names = ["q", "category", "location"]
+    if any(request.args.get(name) for name in ("from", "to", "include_past")):
+        names += ["from", "to", "include_past"]
+    key = "|".join((request.args.get(name) or "").strip().lower() for name in names)
+    facets = cached_facets(key, filters, current_app.config["FACETS_CACHE_SECONDS"])
+    return jsonify(facets)
 
 
-@app.route("/listings", methods=["POST"])
+@api.route("/listings/recommended", methods=["GET"])
+@jwt_required()
+def get_recommended_listings():
+    """Top listings for the current user by their values and signup history."""
+    user_id = int(get_jwt_identity())
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 50)
+
+    values = [row.value for row in UserValues.query.filter_by(user_id=user_id).all()]
+    signups = (
+        db.session.query(SignUp.listing_id, SignUp.status, Listing.category_id)
+        .join(Listing, SignUp.listing_id == Listing.id)
+        .filter(SignUp.user_id == user_id)
+        .all()
+    )
+    # Declined, cancelled and waitlisted signups say little about interest.
+    history = [row.category_id for row in signups if holds_slot(row.status)]
+    ranked = recommendation_index.recommend(
+        values,
+        history=history,
+        exclude=[row.listing_id for row in signups],
+        user_id=user_id,
+        k=limit,
+    )
+
+    listings = {
+        listing.id: listing
+        for listing in Listing.query.filter(
+            Listing.id.in_([listing_id for listing_id, _ in ranked])
+        )
+    }
+    results = []
+    for listing_id, score in ranked:
+        if listing_id in listings:
+            results.append(dict(listings[listing_id].to_dict(), score=score))
+    return jsonify(results)
+
+
+@api.route("/listings", methods=["POST"])
 @jwt_required()
 def create_listing():
     data = request.get_json() or {}
@@ -345,8 +603,8 @@ def create_listing():
         return jsonify({"error": "title required"}), 400
     owner_id = int(get_jwt_identity())
     category = data.get("category")
-    allowed = ["Community", "Environment", "Education", "Health", "Animals"]
-    if category and category not in allowed:
+    category_id = category_id_for(category)
+    if category and category_id is None:
         return jsonify({"error": "invalid category"}), 400
 
     latitude = data.get("latitude")
@@ -357,28 +615,38 @@ def create_listing():
     except (TypeError, ValueError):
         return jsonify({"error": "invalid coordinates"}), 400
 
+    try:
+        starts_at, ends_at = _event_dates(data)
+        capacity = _capacity(data.get("capacity"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     listing = Listing(
         title=title,
         description=data.get("description"),
         location=data.get("location"),
         latitude=latitude,
         longitude=longitude,
-        category=category,
+        category_id=category_id,
         image_url=data.get("image_url"),
         owner_id=owner_id,
+        starts_at=starts_at,
+        ends_at=ends_at,
+        capacity=capacity,
     )
     db.session.add(listing)
     db.session.commit()
     return jsonify(listing.to_dict()), 201
 
 
-@app.route("/listings/<int:id>", methods=["GET"])
+@api.route("/listings/<int:id>", methods=["GET"])
+@read_replica
 def get_listing_detail(id):
     listing = db.session.get(Listing, id) or abort(404)
     return jsonify(listing.to_dict())
 
 
-@app.route("/listings/<int:id>", methods=["PUT"])
+@api.route("/listings/<int:id>", methods=["PUT"])
 @jwt_required()
 def update_listing(id):
     listing = db.session.get(Listing, id) or abort(404)
@@ -386,15 +654,16 @@ def update_listing(id):
     if listing.owner_id != owner_id:
         return jsonify({"error": "unauthorized - you are not the owner"}), 403
     data = request.get_json() or {}
+    promoted = []
     listing.title = data.get("title", listing.title)
     listing.description = data.get("description", listing.description)
     listing.location = data.get("location", listing.location)
     if "category" in data:
         category = data.get("category")
-        allowed = ["Community", "Environment", "Education", "Health", "Animals"]
-        if category and category not in allowed:
+        category_id = category_id_for(category)
+        if category and category_id is None:
             return jsonify({"error": "invalid category"}), 400
-        listing.category = category
+        listing.category_id = category_id
     if "image_url" in data:
         listing.image_url = data.get("image_url")
     if "latitude" in data or "longitude" in data:
@@ -413,11 +682,29 @@ def update_listing(id):
                 )
         except (TypeError, ValueError):
             return jsonify({"error": "invalid coordinates"}), 400
+    if "starts_at" in data or "ends_at" in data:
+        try:
+            listing.starts_at, listing.ends_at = _event_dates(
+                data, as_utc(listing.starts_at), as_utc(listing.ends_at)
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    if "capacity" in data:
+        # Lowering it below `filled` keeps existing signups and only
+        # stops new ones.
+        try:
+            listing.capacity = _capacity(data.get("capacity"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        db.session.flush()
+        promoted = promote(db.session, listing.id)
     db.session.commit()
+    for signup in promoted:
+        emit_signup(signup)
     return jsonify(listing.to_dict())
 
 
-@app.route("/listings/<int:id>", methods=["DELETE"])
+@api.route("/listings/<int:id>", methods=["DELETE"])
 @jwt_required()
 def delete_listing(id):
     listing = db.session.get(Listing, id) or abort(404)
@@ -429,7 +716,7 @@ def delete_listing(id):
     return jsonify({"message": "deleted"})
 
 
-@app.route("/listings/<int:id>/signup", methods=["POST"])
+@api.route("/listings/<int:id>/signup", methods=["POST"])
 @jwt_required()
 def signup_for_listing(id):
     """Volunteer signs up for a listing."""
@@ -444,13 +731,16 @@ def signup_for_listing(id):
     signup = SignUp(
         user_id=user_id, listing_id=id, message=data.get("message"), status="pending"
     )
+    if not reserve_slot(db.session, id):
+        waitlist(db.session, signup)
     db.session.add(signup)
     db.session.commit()
+    emit_signup(signup)
 
     return jsonify(signup.to_dict()), 201
 
 
-@app.route("/listings/<int:id>/signups", methods=["GET"])
+@api.route("/listings/<int:id>/signups", methods=["GET"])
 @jwt_required()
 def get_listing_signups(id):
     """Get all sign-ups for a listing (owner only)."""
@@ -475,7 +765,27 @@ def get_listing_signups(id):
     return jsonify(results)
 
 
-@app.route("/signups/<int:id>", methods=["PUT"])
+@api.route("/listings/<int:id>/signups/stream", methods=["GET"])
+@jwt_required(locations=["headers", "query_string"])
+def stream_listing_signups(id):
+    """Server-Sent Events for new and updated sign-ups on a listing (owner only).
+
+    ``EventSource`` cannot set headers, so the token may be passed as ``?jwt=``.
+    """
+    listing = db.session.get(Listing, id) or abort(404)
+    if listing.owner_id != int(get_jwt_identity()):
+        return jsonify({"error": "unauthorized - you are not the owner"}), 403
+    return stream_response([f"listing:{id}"])
+
+
+@api.route("/user/signups/stream", methods=["GET"])
+@jwt_required(locations=["headers", "query_string"])
+def stream_user_signups():
+    """Server-Sent Events for changes to the current user's sign-ups."""
+    return stream_response([f"user:{int(get_jwt_identity())}"])
+
+
+@api.route("/signups/<int:id>", methods=["PUT"])
 @jwt_required()
 def update_signup_status(id):
     """Update sign-up status (owner can accept/decline, volunteer can cancel)."""
@@ -503,16 +813,29 @@ def update_signup_status(id):
     else:
         return jsonify({"error": "unauthorized"}), 403
 
+    promoted = []
+    if holds_slot(new_status) and not holds_slot(signup.status):
+        if not reserve_slot(db.session, listing.id):
+            db.session.rollback()
+            return jsonify({"error": "listing is full"}), 409
+    elif holds_slot(signup.status) and not holds_slot(new_status):
+        release_slot(db.session, listing.id)
+        # The freed slot goes to the next waitlisted volunteer.
+        promoted = promote(db.session, listing.id)
     signup.status = new_status
+    signup.waitlist_position = None
     db.session.commit()
+    emit_signup(signup)
+    for promoted_signup in promoted:
+        emit_signup(promoted_signup)
     return jsonify(signup.to_dict())
 
 
-@app.route("/listings/<int:id>/reviews", methods=["POST"])
+@api.route("/listings/<int:id>/reviews", methods=["POST"])
 @jwt_required()
 def create_review(id):
     """Create a review for a listing."""
-    _ = db.session.get(Listing, id) or abort(404)
+    listing = db.session.get(Listing, id) or abort(404)
     user_id = int(get_jwt_identity())
 
     existing = Review.query.filter_by(user_id=user_id, listing_id=id).first()
@@ -530,11 +853,13 @@ def create_review(id):
     )
     db.session.add(review)
     db.session.commit()
+    emit_review(review, listing)
 
     return jsonify(review.to_dict()), 201
 
 
-@app.route("/listings/<int:id>/reviews", methods=["GET"])
+@api.route("/listings/<int:id>/reviews", methods=["GET"])
+@read_replica
 def get_listing_reviews(id):
     """Get all reviews for a listing."""
     _ = db.session.get(Listing, id) or abort(404)
@@ -553,7 +878,8 @@ def get_listing_reviews(id):
     return jsonify(results)
 
 
-@app.route("/listings/<int:id>/average-rating", methods=["GET"])
+@api.route("/listings/<int:id>/average-rating", methods=["GET"])
+@read_replica
 def get_listing_average_rating(id):
     """Get average rating for a listing."""
     _ = db.session.get(Listing, id) or abort(404)
@@ -568,7 +894,7 @@ def get_listing_average_rating(id):
     )
 
 
-@app.route("/user/values", methods=["GET"])
+@api.route("/user/values", methods=["GET"])
 @jwt_required()
 def get_user_values():
     current_user_id = get_jwt_identity()
@@ -576,19 +902,64 @@ def get_user_values():
     return jsonify({"values": [v.value for v in user.values]}), 200
 
 
-@app.route("/user/values", methods=["POST"])
+@api.route("/user/values", methods=["POST"])
 @jwt_required()
 def add_user_value():
     current_user_id = get_jwt_identity()
     user = db.session.get(User, int(current_user_id))
     data = request.get_json()
-    value = UserValues(user_id=user.id, value=data["value"])
-    db.session.add(value)
-    db.session.commit()
+    exists = UserValues.query.filter_by(user_id=user.id, value=data["value"]).first()
+    if exists is None:
+        db.session.add(UserValues(user_id=user.id, value=data["value"]))
+        db.session.commit()
     return jsonify({"msg": "Value added successfully"}), 200
 
 
-@app.route("/user/values", methods=["DELETE"])
+@api.route("/user/values", methods=["PUT"])
+@jwt_required()
+def replace_user_values():
+    """Replace the current user's values with ``{"values": [...]}``.
+
+    Only the difference is written: one bulk INSERT for new values and one
+    DELETE for dropped ones, in a single transaction.
+    """
+    user_id = int(get_jwt_identity())
+    data = request.get_json(silent=True) or {}
+    values = data.get("values")
+    if not isinstance(values, list) or not all(
+        isinstance(v, str) and v.strip() and len(v.strip()) <= 50 for v in values
+    ):
+        return jsonify({"error": "values must be a list of short strings"}), 400
+
+    wanted = {v.strip() for v in values}
+    current = set(
+        db.session.scalars(
+            select(UserValues.value).where(UserValues.user_id == user_id)
+        )
+    )
+    removed = current - wanted
+    added = wanted - current
+    try:
+        if removed:
+            db.session.execute(
+                delete(UserValues).where(
+                    UserValues.user_id == user_id, UserValues.value.in_(removed)
+                )
+            )
+        if added:
+            db.session.execute(
+                insert(UserValues),
+                [{"user_id": user_id, "value": value} for value in sorted(added)],
+            )
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent update added one of the same values first.
+        db.session.rollback()
+        return jsonify({"error": "values changed concurrently, retry"}), 409
+    return jsonify({"values": sorted(wanted)}), 200
+
+
+@api.route("/user/values", methods=["DELETE"])
 @jwt_required()
 def delete_user_value():
     current_user_id = get_jwt_identity()
@@ -600,21 +971,70 @@ def delete_user_value():
     return jsonify({"msg": "Value deleted successfully"}), 200
 
 
-@app.route("/api/search/events", methods=["GET"])
+@api.route("/api/search/events", methods=["GET"])
 def search_external_events():
+    """Tapin listings plus external events; see `federated_search.py`."""
     query = request.args.get("q")
     category = request.args.get("category")
 
     if not query:
         return jsonify({"error": "Missing search query"}), 400
 
-    search_query = f"{query} in {category}" if category and category != "All" else query
-
-    results = search_events(search_query)
-    return jsonify(results), 200
+    try:
+        answer = federated_search(
+            query,
+            category,
+            ttl=current_app.config["EXTERNAL_SEARCH_TTL_SECONDS"],
+            local_enough=current_app.config["SEARCH_LOCAL_ENOUGH"],
+            deadline=current_app.config["SEARCH_DEADLINE_SECONDS"],
+        )
+    except SearchError as e:
+        return jsonify({"error": str(e)}), e.status
+    response = jsonify(answer.results)
+    response.headers["X-Search-Source"] = answer.source
+    if answer.missing:
+        # Some sub-queries timed out or failed; the next search retries them.
+        response.headers["X-Search-Partial"] = str(len(answer.missing))
+    if answer.stale:
+        response.headers["X-Search-Stale"] = str(len(answer.stale))
+    return response, 200
+
+
+@api.route("/api/leaderboard", methods=["GET"])
+@jwt_required(optional=True)
+def get_leaderboard():
+    """Top volunteers by accepted signups (default) or achievements.
+
+    Signed-in callers also get their own rank under ``me``.
+    """
+    by = request.args.get("by", "signups")
+    board = leaderboards.get(by)
+    if board is None:
+        return jsonify({"error": f"by must be one of {sorted(leaderboards)}"}), 400
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 100)
+
+    top = [
+        {"rank": rank, "user_id": user_id, "score": score}
+        for rank, user_id, score in board.top(limit)
+    ]
+    me = None
+    identity = get_jwt_identity()
+    if identity is not None:
+        rank, score = board.rank(int(identity))
+        me = {"rank": rank, "user_id": int(identity), "score": score}
+    return jsonify({"by": by, "top": top, "me": me}), 200
+
+
+@api.route("/api/user/<int:user_id>/stats", methods=["GET"])
+@jwt_required()
+@read_replica
+def get_user_stats(user_id):
+    """Signup and review counters for a user, read from `user_stats`."""
+    db.session.get(User, user_id) or abort(404)
+    return jsonify(stats_for(user_id).to_dict()), 200
 
 
-@app.route("/api/user/<int:user_id>/achievements", methods=["GET"])
+@api.route("/api/user/<int:user_id>/achievements", methods=["GET"])
 @jwt_required()
 def get_user_achievements(user_id):
     """Gets all achievements for a specific user."""
@@ -642,4 +1062,4 @@ def get_user_achievements(user_id):
 
 
 if __name__ == "__main__":
-    app.run(debug=True, port=5000)
+    create_app().run(debug=True, port=5000)
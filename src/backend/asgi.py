@@ -0,0 +1,56 @@
+"""ASGI entry point for the Tapin backend.
+
+Run with an ASGI server from this directory, e.g.::
+
+    uvicorn asgi:asgi_app --workers 2
+    gunicorn -k uvicorn.workers.UvicornWorker asgi:asgi_app
+
+asgiref's stock ``WsgiToAsgi`` runs every request on one shared thread, so a
+slow view blocks the whole worker. Here each request runs in its own
+``ThreadSensitiveContext`` (asgiref's public way to give a request its own
+thread), and at most ``ASGI_THREADS`` (default 32) requests run at once;
+the rest wait on the event loop.
+
+This buys the same concurrency as a threaded WSGI worker with as many
+threads (``gunicorn -k gthread --threads 32``), no more: a request holds
+its thread until the response is done. Views are all synchronous on
+purpose. asgiref would run an ``async def`` view's coroutine on the
+server's event loop, where any database call would block every other
+request on the worker. See ``benchmarks/asgi_concurrency.py``.
+"""
+
+import asyncio
+import os
+import weakref
+
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+
+from app import app
+
+ASGI_THREADS = int(os.environ.get("ASGI_THREADS", 32))
+
+
+class ThreadPoolWsgiToAsgi:
+    """Wrap a WSGI app so up to ``max_threads`` requests run concurrently."""
+
+    def __init__(self, wsgi_application, max_threads=ASGI_THREADS):
+        self.wsgi_application = wsgi_application
+        self.max_threads = max_threads
+        self._asgi = WsgiToAsgi(wsgi_application)
+        # asyncio primitives belong to one loop; servers normally run one.
+        self._slots = weakref.WeakKeyDictionary()
+
+    def _semaphore(self):
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(self.max_threads)
+        return slots
+
+    async def __call__(self, scope, receive, send):
+        async with self._semaphore(), ThreadSensitiveContext():
+            await self._asgi(scope, receive, send)
+
+
+asgi_app = ThreadPoolWsgiToAsgi(app)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Concurrency per worker under a slow upstream: threaded WSGI vs. ASGI.
+
+The Google Custom Search call is replaced by a stand-in that sleeps for
+``--delay`` seconds. The script fires ``--requests`` concurrent requests at
+``/api/search/events`` through:
+
+* the WSGI app on a pool of ``--threads`` threads (what a
+  ``gunicorn -k gthread --threads N`` worker does),
+* ``asgi.asgi_app`` limited to the same ``--threads``, and
+* asgiref's stock ``WsgiToAsgi`` (one shared thread) for reference,
+
+and reports wall time and effective concurrency (requests in flight on
+average). The first two should match: both hold a thread per request for
+its whole duration. Run from ``src/backend``::
+
+    python benchmarks/asgi_concurrency.py --requests 50 --delay 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+os.environ.setdefault("TESTING", "1")
+os.environ["GOOGLE_API_KEY"] = "benchmark"
+os.environ["CUSTOM_SEARCH_ENGINE_ID"] = "benchmark"
+
+from asgiref.wsgi import WsgiToAsgi  # noqa: E402
+
+import google_search  # noqa: E402
+from app import create_app  # noqa: E402
+from asgi import ThreadPoolWsgiToAsgi  # noqa: E402
+
+
+def slow_upstream(delay):
+    def _execute_search(query, api_key, search_engine_id, num=10, timeout=None):
+        time.sleep(delay)
+        return [{"title": f"{query} event", "snippet": "", "link": "https://x"}]
+
+    return _execute_search
+
+
+async def call(asgi, path, query_string):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query_string.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "server": ("bench", 80),
+        "client": ("127.0.0.1", 1234),
+    }
+    status = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    await asgi(scope, receive, send)
+    return status.get("code")
+
+
+async def run(asgi, n, tag):
+    started = time.perf_counter()
+    codes = await asyncio.gather(
+        *(call(asgi, "/api/search/events", f"q={tag}park{i}") for i in range(n))
+    )
+    elapsed = time.perf_counter() - started
+    assert all(code == 200 for code in codes), codes
+    return elapsed
+
+
+def run_threaded_wsgi(app, n, threads, tag):
+    def get(i):
+        return app.test_client().get(f"/api/search/events?q={tag}park{i}").status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        codes = list(pool.map(get, range(n)))
+    elapsed = time.perf_counter() - started
+    assert all(code == 200 for code in codes), codes
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.2)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    n, threads = args.requests, args.threads
+    google_search._execute_search = slow_upstream(args.delay)
+    # A file database, so every thread sees the same tables, and a
+    # connection per thread, so the pool is not what limits concurrency.
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///"
+            + os.path.join(tempfile.mkdtemp(), "asgi_bench.db"),
+            "SQLALCHEMY_ENGINE_OPTIONS": {
+                "pool_size": threads,
+                "connect_args": {"timeout": 30},
+            },
+        }
+    )
+    with app.app_context():
+        from models import db
+
+        db.create_all()
+
+    serial_floor = args.requests * args.delay
+    asgi = ThreadPoolWsgiToAsgi(app, max_threads=threads)
+    run_threaded_wsgi(app, 1, 1, "warmup")
+    # Each run searches for its own queries, so none is answered from the
+    # results stored by an earlier run.
+    for name, bench in (
+        (f"WSGI x{threads}", lambda: run_threaded_wsgi(app, n, threads, "wsgi")),
+        (f"asgi_app x{threads}", lambda: asyncio.run(run(asgi, n, "asgi"))),
+        ("WsgiToAsgi", lambda: asyncio.run(run(WsgiToAsgi(app), n, "stock"))),
+    ):
+        elapsed = bench()
+        print(
+            f"{name:<14} {args.requests} requests in {elapsed:6.2f}s "
+            f"-> {args.requests / elapsed:7.1f} req/s, "
+            f"concurrency ~{serial_floor / elapsed:5.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Throughput of search-result categorization: substring loops vs compiled regex.
+
+Generates ``--results`` synthetic Google-style results (title + snippet)
+and times, best of ``--repeat`` runs:
+
+* the old loop: substring test of each category name, first match wins;
+* the same synonym scoring as ``Categorizer`` done with a substring test
+  per term (what the old loop grows into once synonyms are added);
+* ``categorizer.Categorizer``.
+
+It also reports how often the old loop and the categorizer disagree. Run
+from ``src/backend``::
+
+    python benchmarks/categorize_results.py --results 5000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from categories import CATEGORIES, VALUE_KEYWORDS  # noqa: E402
+from categorizer import (  # noqa: E402
+    NAME_WEIGHT,
+    SYNONYM_WEIGHT,
+    TITLE_MULTIPLIER,
+    Categorizer,
+)
+
+FILLER = (
+    "join us this weekend for a volunteer event near downtown bring friends "
+    "and family every age welcome snacks provided register online today"
+).split()
+
+
+def synthetic_results(n, seed=0):
+    rng = random.Random(seed)
+    terms = [t for keywords in VALUE_KEYWORDS.values() for t in keywords]
+    terms += [c for c in CATEGORIES if c != "All"]
+    results = []
+    for i in range(n):
+        words = rng.sample(FILLER, 8)
+        snippet = rng.sample(FILLER, 20)
+        for _ in range(rng.randint(0, 3)):
+            snippet.insert(rng.randrange(len(snippet)), rng.choice(terms))
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words)), rng.choice(terms))
+        results.append(
+            {
+                "title": " ".join(words).title(),
+                "snippet": " ".join(snippet) + ".",
+                "link": f"https://events.example.com/{i}",
+            }
+        )
+    return results
+
+
+def legacy_categorize(items):
+    """The previous implementation: first substring match wins."""
+    for item in items:
+        item["category"] = "Other"
+        for category in CATEGORIES:
+            if (
+                category.lower() in item.get("title", "").lower()
+                or category.lower() in item.get("snippet", "").lower()
+            ):
+                item["category"] = category
+                break
+    return items
+
+
+def naive_scoring(items):
+    """Categorizer's scoring rules, one substring test per term."""
+    terms = []
+    for category in CATEGORIES:
+        if category != "All":
+            terms.append((category.lower(), category, NAME_WEIGHT))
+            for synonym in VALUE_KEYWORDS.get(category, ()):
+                terms.append((synonym, category, SYNONYM_WEIGHT))
+    order = {category: i for i, category in enumerate(CATEGORIES)}
+    for item in items:
+        title = item.get("title", "").lower()
+        snippet = item.get("snippet", "").lower()
+        scores = {}
+        for term, category, weight in terms:
+            score = TITLE_MULTIPLIER * weight * (term in title) + weight * (
+                term in snippet
+            )
+            if score:
+                scores[category] = scores.get(category, 0) + score
+        item["category"] = min(
+            scores, key=lambda c: (-scores[c], order[c]), default="Other"
+        )
+    return items
+
+
+def best_time(fn, items, repeat):
+    best = None
+    for _ in range(repeat):
+        copies = [dict(item) for item in items]
+        started = time.perf_counter()
+        fn(copies)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, copies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--results", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    items = synthetic_results(args.results)
+    started = time.perf_counter()
+    categorizer = Categorizer()
+    build_ms = (time.perf_counter() - started) * 1000
+
+    legacy, legacy_out = best_time(legacy_categorize, items, args.repeat)
+    naive, _ = best_time(naive_scoring, items, args.repeat)
+    compiled, compiled_out = best_time(categorizer.categorize_items, items, args.repeat)
+    differ = sum(
+        a["category"] != b["category"] for a, b in zip(legacy_out, compiled_out)
+    )
+
+    print(f"{args.results} results, categorizer built in {build_ms:.2f} ms")
+    timings = (
+        ("names, first match", legacy),
+        ("synonyms, substring", naive),
+        ("synonyms, compiled", compiled),
+    )
+    for name, elapsed in timings:
+        per_result_us = elapsed / args.results * 1e6
+        print(f"  {name:<20} {elapsed * 1000:8.2f} ms  {per_result_us:6.2f} us/result")
+    print(f"  compiled vs substring scoring: {naive / compiled:.2f}x faster")
+    print(f"  {differ} results categorized differently by the old loop")
+
+
+if __name__ == "__main__":
+    main()
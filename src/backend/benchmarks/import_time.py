@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Cold-start import time of the backend, checked against a budget.
+
+Runs ``python -X importtime -c "import app"`` in fresh interpreters, takes
+the best of ``--runs`` cumulative times for the ``app`` module and fails
+(exit status 1) when it exceeds ``--budget-ms``. Also times
+``create_app()`` and lists the heaviest imports so regressions are easy to
+attribute. Run from ``src/backend``::
+
+    python benchmarks/import_time.py --budget-ms 750
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET_MS = 750
+
+
+def _run(code):
+    env = dict(os.environ, TESTING="1", SQLALCHEMY_DATABASE_URI="sqlite:///:memory:")
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def parse_importtime(stderr, module="app"):
+    """Return ``(cumulative_us, {child: cumulative_us})`` for ``module``.
+
+    ``-X importtime`` prints a module after its imports, indenting two
+    spaces per nesting level, so ``module``'s direct imports are the
+    depth-1 lines since the previous top-level line.
+    """
+    children = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children[name.strip()] = int(cumulative)
+        elif depth == 0:
+            if name.strip() == module:
+                return int(cumulative), children
+            children = {}
+    raise ValueError(f"{module} not found in importtime output")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    best, best_children = None, {}
+    for _ in range(args.runs):
+        cumulative, children = parse_importtime(_run("import app").stderr)
+        if best is None or cumulative < best:
+            best, best_children = cumulative, children
+    import_ms = best / 1000
+
+    create_code = (
+        "import time, app; t = time.perf_counter(); app.create_app(); "
+        "print((time.perf_counter() - t) * 1000)"
+    )
+    create_ms = float(_run(create_code).stdout.strip().splitlines()[-1])
+
+    print(f"import app:   {import_ms:8.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"create_app(): {create_ms:8.1f} ms")
+    print("heaviest imports made by `app`:")
+    heaviest = sorted(best_children.items(), key=lambda kv: kv[1], reverse=True)
+    for name, cumulative in heaviest[: args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    if import_ms > args.budget_ms:
+        print("FAIL: import time over budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
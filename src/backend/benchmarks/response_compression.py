@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Bytes on the wire and CPU cost per response for API compression settings.
+
+Builds ``/listings``-shaped JSON payloads of several sizes and, for each
+encoding/level, reports the compressed size, ratio and CPU time per
+response (``time.process_time`` averaged over ``--repeat`` runs). Run
+from ``src/backend``::
+
+    python benchmarks/response_compression.py --sizes 10 100 1000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import compression  # noqa: E402
+
+WORDS = (
+    "community garden cleanup volunteers needed weekend seniors tutoring "
+    "animal shelter food bank river park literacy mentoring"
+).split()
+
+
+def listing_payload(n):
+    listings = []
+    for i in range(n):
+        words = [WORDS[(i * 7 + k) % len(WORDS)] for k in range(30)]
+        listings.append(
+            {
+                "id": i,
+                "title": " ".join(words[:4]).title(),
+                "description": " ".join(words),
+                "location": f"{100 + i} Main St, Springfield",
+                "latitude": 34.0 + i / 1000,
+                "longitude": -118.0 - i / 1000,
+                "category": ["Community", "Environment", "Education"][i % 3],
+                "image_url": f"https://images.example.com/{i}.jpg?w=800&h=600",
+                "owner_id": i % 17,
+                "organization_id": None,
+                "created_at": "2025-11-24T12:00:00+00:00",
+            }
+        )
+    return json.dumps(listings).encode()
+
+
+def settings():
+    yield "gzip", {"level": 1}
+    yield "gzip", {"level": 6}
+    yield "gzip", {"level": 9}
+    if compression.brotli is not None:
+        for quality in (1, 4, 11):
+            yield "br", {"br_quality": quality}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(
+        f"{'listings':>8} {'setting':<10} {'bytes':>10} {'ratio':>7} {'cpu/resp':>10}"
+    )
+    for n in args.sizes:
+        data = listing_payload(n)
+        print(f"{n:>8} {'identity':<10} {len(data):>10} {1:>7.2f} {'-':>10}")
+        for encoding, kwargs in settings():
+            started = time.process_time()
+            for _ in range(args.repeat):
+                out = compression.compress_body(data, encoding, **kwargs)
+            cpu_ms = (time.process_time() - started) / args.repeat * 1000
+            label = f"{encoding}-{next(iter(kwargs.values()))}"
+            print(
+                f"{n:>8} {label:<10} {len(out):>10} "
+                f"{len(data) / len(out):>7.2f} {cpu_ms:>8.3f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
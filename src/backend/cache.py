@@ -0,0 +1,87 @@
+"""Small in-process TTL cache shared by the API.
+
+Entries live in a plain dict guarded by a lock, so the cache is per worker
+process. It is meant for short-lived, cheap-to-recompute values (health
+probes, aggregate counts) where a few seconds of staleness is acceptable.
+"""
+
+import threading
+import time
+
+
+class TTLCache:
+    """Thread-safe mapping whose entries expire after a time-to-live."""
+
+    backend = "memory"
+
+    def __init__(self, default_ttl=60.0, maxsize=1024):
+        self.default_ttl = default_ttl
+        self.maxsize = maxsize
+        self._data = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            self._data.pop(key, None)
+            if len(self._data) >= self.maxsize:
+                self._evict()
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def get_or_set(self, key, factory, ttl=None):
+        """Return the cached value for ``key``, computing it on a miss."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = factory()
+            self.set(key, value, ttl)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [k for k in self._data if str(k).startswith(prefix)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def status(self):
+        with self._lock:
+            entries = len(self._data)
+        return {
+            "backend": self.backend,
+            "status": "ok",
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _evict(self):
+        # Drop expired entries first, then the oldest insertions.
+        now = time.monotonic()
+        for key in [k for k, (exp, _) in self._data.items() if exp <= now]:
+            del self._data[key]
+        while len(self._data) >= self.maxsize:
+            del self._data[next(iter(self._data))]
+
+
+cache = TTLCache()
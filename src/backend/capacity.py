@@ -0,0 +1,101 @@
+"""Listing capacity: atomic slot reservation and a FIFO waitlist.
+
+``Listing.capacity`` is optional (``None`` means unlimited) and
+``Listing.filled`` counts the signups currently holding a slot, i.e. those
+in ``HOLDS_SLOT`` statuses. Both are kept on the listing row so a signup
+never has to count the signups table.
+
+A slot is taken with a single conditional statement::
+
+    UPDATE listing SET filled = filled + 1
+    WHERE id = :id AND (capacity IS NULL OR filled < capacity)
+
+The database evaluates the check and the increment together under the
+row's write lock, so concurrent signups cannot overfill a listing and no
+``SELECT ... FOR UPDATE`` is held while the rest of the request runs. A
+rowcount of 0 means the listing is full.
+
+Signups for a full listing are ``waitlisted`` with a ``waitlist_position``
+taken from the listing's ``waitlist_seq`` counter, incremented the same
+way. Whenever a slot frees up, ``promote`` moves the lowest position to
+``pending`` through the ``(listing_id, waitlist_position)`` index, so
+finding the next volunteer is one index lookup, not a sort of all signups.
+
+All helpers only touch the caller's session; their changes commit or roll
+back with the request's own writes.
+"""
+
+from sqlalchemy import or_, select, update
+
+from models import Listing, SignUp
+
+HOLDS_SLOT = ("pending", "accepted")
+WAITLISTED = "waitlisted"
+
+
+def holds_slot(status):
+    return status in HOLDS_SLOT
+
+
+def reserve_slot(session, listing_id):
+    """Take one slot on the listing; returns False if it is full."""
+    taken = session.execute(
+        update(Listing)
+        .where(
+            Listing.id == listing_id,
+            or_(Listing.capacity.is_(None), Listing.filled < Listing.capacity),
+        )
+        .values(filled=Listing.filled + 1)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    return bool(taken)
+
+
+def release_slot(session, listing_id):
+    """Give back one slot on the listing."""
+    session.execute(
+        update(Listing)
+        .where(Listing.id == listing_id, Listing.filled > 0)
+        .values(filled=Listing.filled - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def waitlist(session, signup):
+    """Put ``signup`` at the back of its listing's waitlist."""
+    session.execute(
+        update(Listing)
+        .where(Listing.id == signup.listing_id)
+        .values(waitlist_seq=Listing.waitlist_seq + 1)
+        .execution_options(synchronize_session=False)
+    )
+    # The UPDATE holds the listing row until commit, so this is our number.
+    signup.waitlist_position = session.scalar(
+        select(Listing.waitlist_seq).where(Listing.id == signup.listing_id)
+    )
+    signup.status = WAITLISTED
+
+
+def promote(session, listing_id):
+    """Move waitlisted signups into free slots, first come first served.
+
+    Returns the promoted signups (now ``pending``).
+    """
+    promoted = []
+    while True:
+        signup = session.scalars(
+            select(SignUp)
+            .where(
+                SignUp.listing_id == listing_id,
+                SignUp.waitlist_position.is_not(None),
+            )
+            .order_by(SignUp.waitlist_position)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).first()
+        if signup is None or not reserve_slot(session, listing_id):
+            return promoted
+        signup.status = "pending"
+        signup.waitlist_position = None
+        session.flush()
+        promoted.append(signup)
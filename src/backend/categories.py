@@ -17,3 +17,34 @@ CATEGORIES = [
     "Technology",
     "Women's Issues",
 ]
+
+# Categories a Tapin listing can be filed under. These seed the `category`
+# lookup table (ids follow this order) and match the Filters chips.
+LISTING_CATEGORIES = ["Community", "Environment", "Education", "Health", "Animals"]
+
+# How each user value (see `/user/values`) maps onto listings, for
+# recommendations: the listing category it corresponds to, if any, and words
+# that signal it in a listing's title or description.
+VALUE_CATEGORIES = {
+    "Animal Welfare": "Animals",
+    "Community Development": "Community",
+    "Education & Literacy": "Education",
+    "Environment": "Environment",
+    "Health & Medicine": "Health",
+}
+VALUE_KEYWORDS = {
+    "Animal Welfare": ("animal", "animals", "pet", "pets", "shelter", "rescue"),
+    "Arts & Culture": ("art", "arts", "culture", "museum", "music", "theater"),
+    "Children & Youth": ("children", "kids", "youth", "teens", "mentoring"),
+    "Community Development": ("community", "neighborhood", "garden", "housing"),
+    "Disaster Relief": ("disaster", "relief", "emergency", "flood", "wildfire"),
+    "Education & Literacy": ("education", "literacy", "tutoring", "reading"),
+    "Environment": ("environment", "cleanup", "beach", "park", "trees", "river"),
+    "Health & Medicine": ("health", "medical", "clinic", "hospital", "blood"),
+    "Human Rights": ("rights", "justice", "refugee", "immigrant", "advocacy"),
+    "Seniors": ("senior", "seniors", "elderly", "aging"),
+    "Social Services": ("food", "pantry", "homeless", "shelter", "meals"),
+    "Sports & Recreation": ("sports", "recreation", "coach", "league", "fitness"),
+    "Technology": ("technology", "tech", "computer", "coding", "digital"),
+    "Women's Issues": ("women", "girls", "mothers"),
+}
@@ -0,0 +1,94 @@
+"""Categorize search results with one precompiled regex.
+
+Every category name in ``CATEGORIES`` and every synonym in
+``VALUE_KEYWORDS`` is compiled once into a single word-bounded regex whose
+alternation is factored into a character trie (``animal(?:s| welfare)?``),
+so the regex engine tries one branch per character instead of every term
+at every position. A result's title and snippet are lower-cased and
+scanned once each; the cost does not grow with the number of categories
+or synonyms.
+
+Each matched term adds to the score of the categories it belongs to; title
+matches count more than snippet matches and a full category name more than
+a synonym. The best-scoring category wins (ties go to the earlier entry in
+``CATEGORIES``); a result with no match is ``"Other"``.
+"""
+
+import re
+from collections import defaultdict
+
+from categories import CATEGORIES, VALUE_KEYWORDS
+
+OTHER = "Other"
+NAME_WEIGHT = 3
+SYNONYM_WEIGHT = 1
+TITLE_MULTIPLIER = 2
+
+
+def trie_pattern(terms):
+    """Regex source matching any of ``terms``, factored by common prefixes."""
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}  # end of a term
+
+    def build(node):
+        branches = [
+            re.escape(char) + build(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        optional = "" in node
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if optional else group
+
+    return build(trie)
+
+
+class Categorizer:
+    def __init__(self, categories=CATEGORIES, synonyms=VALUE_KEYWORDS):
+        self.categories = [c for c in categories if c != "All"]
+        self._order = {category: i for i, category in enumerate(self.categories)}
+        weights = defaultdict(dict)  # term -> {category: weight}
+        for category in self.categories:
+            weights[category.lower()][category] = NAME_WEIGHT
+            for synonym in synonyms.get(category, ()):
+                weights[synonym.lower()].setdefault(category, SYNONYM_WEIGHT)
+        self._weights = {term: tuple(w.items()) for term, w in weights.items()}
+        self._pattern = re.compile(rf"\b{trie_pattern(self._weights)}\b")
+
+    def scores(self, title, snippet=""):
+        """Return ``{category: score}`` for one result."""
+        scores = {}
+        weights = self._weights
+        for text, multiplier in ((title, TITLE_MULTIPLIER), (snippet, 1)):
+            if text:
+                for term in self._pattern.findall(text.lower()):
+                    for category, weight in weights[term]:
+                        scores[category] = scores.get(category, 0) + weight * multiplier
+        return scores
+
+    def categorize(self, title, snippet=""):
+        best, best_key = OTHER, None
+        for category, score in self.scores(title, snippet).items():
+            key = (-score, self._order[category])
+            if best_key is None or key < best_key:
+                best, best_key = category, key
+        return best
+
+    def categorize_items(self, items):
+        """Set ``item["category"]`` on each search result; return the items."""
+        for item in items:
+            item["category"] = self.categorize(
+                item.get("title", ""), item.get("snippet", "")
+            )
+        return items
+
+
+categorizer = Categorizer()
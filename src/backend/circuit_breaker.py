@@ -0,0 +1,123 @@
+"""A circuit breaker for calls to an external dependency.
+
+``closed``: calls go through; ``failure_threshold`` consecutive failures
+open the circuit. ``open``: calls fail fast with ``CircuitOpenError`` for
+``reset_timeout`` seconds, so a slow or failing upstream costs callers
+nothing. ``half_open``: after that, one probe call is let through; success
+closes the circuit, failure opens it for another ``reset_timeout``.
+
+``is_failure(exc)`` decides which exceptions count against the upstream
+(default: all). Others, such as a 4xx answer to a bad request, show the
+upstream is up and count as a success; they are re-raised all the same.
+
+State is per process; each gunicorn worker trips its own breaker.
+"""
+
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling while the circuit is open."""
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name,
+        failure_threshold=5,
+        reset_timeout=30.0,
+        clock=time.monotonic,
+        is_failure=None,
+    ):
+        self.name = name
+        self.is_failure = is_failure or (lambda exc: True)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+            self._totals = {"calls": 0, "failures": 0, "rejected": 0}
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+        return self._state
+
+    def _allow(self):
+        state = self._current_state()
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = self.clock()
+        self._probing = False
+
+    def _close(self):
+        self._state = CLOSED
+        self._failures = 0
+        self._probing = False
+
+    def call(self, fn, *args, **kwargs):
+        """Call ``fn`` through the breaker; re-raises its exceptions."""
+        with self._lock:
+            if not self._allow():
+                self._totals["rejected"] += 1
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            self._totals["calls"] += 1
+            probe = self._state == HALF_OPEN
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as exc:
+            with self._lock:
+                if not self.is_failure(exc):
+                    self._close()
+                    raise
+                self._totals["failures"] += 1
+                self._failures += 1
+                if probe or self._failures >= self.failure_threshold:
+                    self._open()
+            raise
+        finally:
+            # A probe cut short (timeout, cancellation) must not leave the
+            # circuit half open with no probe allowed.
+            if probe:
+                with self._lock:
+                    self._probing = False
+        with self._lock:
+            self._close()
+        return result
+
+    def status(self):
+        """State and counters, for the readiness probe."""
+        with self._lock:
+            status = {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                **self._totals,
+            }
+            if self._state != CLOSED:
+                elapsed = self.clock() - self._opened_at
+                status["retry_in"] = round(max(self.reset_timeout - elapsed, 0), 2)
+            return status
@@ -0,0 +1,134 @@
+"""Negotiated gzip/brotli compression for API responses.
+
+``init_compression(app)`` registers an ``after_request`` hook that
+compresses responses whose MIME type is in ``COMPRESS_MIMETYPES`` when the
+client sends a matching ``Accept-Encoding``:
+
+* Buffered responses are compressed in one go when the body is at least
+  ``COMPRESS_MIN_SIZE`` bytes and compression actually makes it smaller.
+* Streamed responses (generators) are compressed chunk by chunk with a
+  sync flush after each chunk, so each event still reaches the client
+  right away.
+
+Brotli is preferred when the optional ``brotli`` package is installed;
+``COMPRESS_LEVEL`` (gzip, 1-9) and ``COMPRESS_BR_QUALITY`` (0-11) trade CPU
+for bytes. See ``benchmarks/response_compression.py`` for numbers.
+"""
+
+import gzip
+import os
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+DEFAULT_MIMETYPES = ("application/json", "text/event-stream")
+
+
+def available_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encodings):
+    """Pick the best encoding the client accepts, or None."""
+    for encoding in available_encodings():
+        if accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def compress_body(data, encoding, level=6, br_quality=4):
+    if encoding == "br":
+        return brotli.compress(data, quality=br_quality)
+    return gzip.compress(data, compresslevel=level)
+
+
+def compress_stream(chunks, encoding, level=6, br_quality=4):
+    """Compress an iterable of byte chunks, flushing after every chunk.
+
+    Closing the result closes ``chunks`` too, so a long-lived stream (SSE)
+    cleans up as soon as the client goes away.
+    """
+    try:
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=br_quality)
+            for chunk in chunks:
+                yield compressor.process(chunk) + compressor.flush()
+            yield compressor.finish()
+        else:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+            for chunk in chunks:
+                yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            yield compressor.flush()
+    finally:
+        _close(chunks)
+
+
+def _close(iterable):
+    close = getattr(iterable, "close", None)
+    if close is not None:
+        close()
+
+
+def _encoded_chunks(iterable):
+    try:
+        for chunk in iterable:
+            yield chunk.encode() if isinstance(chunk, str) else chunk
+    finally:
+        _close(iterable)
+
+
+def init_compression(app):
+    """Register the compression hook on ``app``.
+
+    Call this before other ``after_request`` hooks are registered: Flask
+    runs them in reverse order, so compression then sees the final body.
+    """
+    app.config.setdefault(
+        "COMPRESS_MIN_SIZE", int(os.environ.get("COMPRESS_MIN_SIZE", 1024))
+    )
+    app.config.setdefault("COMPRESS_LEVEL", int(os.environ.get("COMPRESS_LEVEL", 6)))
+    app.config.setdefault(
+        "COMPRESS_BR_QUALITY", int(os.environ.get("COMPRESS_BR_QUALITY", 4))
+    )
+    app.config.setdefault("COMPRESS_MIMETYPES", DEFAULT_MIMETYPES)
+
+    @app.after_request
+    def compress_response(response):
+        config = app.config
+        if (
+            request.method == "HEAD"
+            or not 200 <= response.status_code < 300
+            or response.status_code == 204
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in config["COMPRESS_MIMETYPES"]
+        ):
+            return response
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+        level = config["COMPRESS_LEVEL"]
+        br_quality = config["COMPRESS_BR_QUALITY"]
+
+        if response.is_streamed:
+            response.response = compress_stream(
+                _encoded_chunks(response.response), encoding, level, br_quality
+            )
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < config["COMPRESS_MIN_SIZE"]:
+                return response
+            compressed = compress_body(data, encoding, level, br_quality)
+            if len(compressed) >= len(data):
+                return response
+            response.set_data(compressed)
+
+        response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        return response
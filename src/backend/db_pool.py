@@ -0,0 +1,170 @@
+"""Connection-pool configuration for the SQLAlchemy engine.
+
+``engine_options(db_url)`` builds ``SQLALCHEMY_ENGINE_OPTIONS`` from the
+database URL and the process model:
+
+* SQLite (and ``TESTING=1``) keep SQLAlchemy's defaults.
+* Transaction-mode poolers (Supabase/PgBouncer on port 6543, or URLs with
+  ``pgbouncer=true`` / ``pool_mode=transaction``, or ``DB_POOL_MODE``
+  set to ``transaction``) already multiplex server connections, so by
+  default we hold no connections of our own (``NullPool``). Set
+  ``DB_TRANSACTION_POOL=queue`` to keep a small local pool instead.
+  Server-side prepared statements and startup ``options`` are disabled
+  because the pooler may hand each transaction a different backend.
+* Everything else gets a ``QueuePool`` sized from the gunicorn thread count
+  (``GUNICORN_THREADS``/``WEB_THREADS``), capped by ``DB_MAX_CONNECTIONS``
+  shared across ``WEB_CONCURRENCY`` workers. ``DB_POOL_SIZE``,
+  ``DB_MAX_OVERFLOW``, ``DB_POOL_TIMEOUT`` and ``DB_POOL_RECYCLE`` override
+  the computed values.
+
+The pool classes used here record how long checkouts wait; ``health.py``
+reports the numbers under ``/api/health/ready``.
+"""
+
+import os
+import threading
+import time
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+
+TRANSACTION_POOLER_PORT = 6543
+
+
+class WaitStats:
+    """Running totals of connection checkout wait time for one pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+
+    def observe(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            avg = self.total_wait / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "avg_wait_ms": round(avg * 1000, 3),
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "timeouts": self.timeouts,
+            }
+
+
+class _TimedPoolMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = WaitStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.observe(time.perf_counter() - started, timed_out=True)
+            raise
+        self.wait_stats.observe(time.perf_counter() - started)
+        return conn
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """``QueuePool`` that records checkout wait time."""
+
+
+class TimedNullPool(_TimedPoolMixin, NullPool):
+    """``NullPool`` that records connect time per checkout."""
+
+
+def _env_int(environ, name, default):
+    value = environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def is_transaction_pooler(url, environ=os.environ):
+    """Return True if ``url`` points at a transaction-mode connection pooler."""
+    if environ.get("DB_POOL_MODE", "").lower() == "transaction":
+        return True
+    url = make_url(url)
+    query = {k: str(v).lower() for k, v in url.query.items()}
+    if query.get("pgbouncer") == "true" or query.get("pool_mode") == "transaction":
+        return True
+    return url.port == TRANSACTION_POOLER_PORT
+
+
+def pool_sizing(environ=os.environ):
+    """Return ``(pool_size, max_overflow)`` for one worker process."""
+    threads = max(
+        1, _env_int(environ, "GUNICORN_THREADS", _env_int(environ, "WEB_THREADS", 1))
+    )
+    # One spare connection for work outside request threads (health checks,
+    # background workers).
+    pool_size = threads + 1
+    max_overflow = threads
+    budget = _env_int(environ, "DB_MAX_CONNECTIONS", 0)
+    if budget:
+        workers = max(1, _env_int(environ, "WEB_CONCURRENCY", 1))
+        per_worker = max(1, budget // workers)
+        pool_size = min(pool_size, per_worker)
+        max_overflow = max(0, min(max_overflow, per_worker - pool_size))
+    return (
+        _env_int(environ, "DB_POOL_SIZE", pool_size),
+        _env_int(environ, "DB_MAX_OVERFLOW", max_overflow),
+    )
+
+
+def _driver_connect_args(url, transaction_pooler):
+    backend = url.get_backend_name()
+    driver = url.get_driver_name()
+    if backend != "postgresql":
+        return {}
+    connect_args = {"connect_timeout": 10}
+    if not transaction_pooler:
+        connect_args["options"] = "-c statement_timeout=30000"
+    elif driver == "psycopg":
+        connect_args["prepare_threshold"] = None
+    elif driver == "asyncpg":
+        connect_args = {"timeout": 10, "statement_cache_size": 0}
+    return connect_args
+
+
+def engine_options(db_url, environ=os.environ):
+    """Build ``SQLALCHEMY_ENGINE_OPTIONS`` for ``db_url``."""
+    if environ.get("TESTING") == "1" or not isinstance(db_url, str):
+        return {}
+    url = make_url(db_url)
+    if url.get_backend_name() == "sqlite":
+        return {}
+
+    transaction_pooler = is_transaction_pooler(url, environ)
+    options = {}
+    connect_args = _driver_connect_args(url, transaction_pooler)
+    if connect_args:
+        options["connect_args"] = connect_args
+
+    if transaction_pooler and environ.get("DB_TRANSACTION_POOL", "null") == "null":
+        options["poolclass"] = TimedNullPool
+        return options
+
+    pool_size, max_overflow = pool_sizing(environ)
+    options.update(
+        {
+            "poolclass": TimedQueuePool,
+            "pool_pre_ping": True,
+            "pool_recycle": _env_int(environ, "DB_POOL_RECYCLE", 300),
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": _env_int(environ, "DB_POOL_TIMEOUT", 30),
+        }
+    )
+    return options
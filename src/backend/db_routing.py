@@ -0,0 +1,136 @@
+"""Route read-only requests to an optional read replica.
+
+Configure a replica with ``SQLALCHEMY_REPLICA_URI`` (it becomes the
+``replica`` entry of ``SQLALCHEMY_BINDS``). Views decorated with
+``@read_replica`` then run their queries against that engine, except:
+
+* while the session is flushing (writes always go to the primary), and
+* for a client that wrote recently ("read-your-writes"). After a request
+  that commits changes, the writer is pinned to the primary for
+  ``REPLICA_STICKY_SECONDS``. The pin is recorded per JWT identity in the
+  worker and in a cookie so it also holds when the next request lands on a
+  different gunicorn worker.
+
+Without a replica configured every query goes to the primary as before.
+"""
+
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA_BIND = "replica"
+STICKY_COOKIE = "tapin_rw"
+
+_use_replica = ContextVar("use_replica", default=False)
+_recent_writers = {}
+_recent_writers_lock = threading.Lock()
+
+
+class RoutingSession(Session):
+    """Session that sends reads to the replica inside ``@read_replica`` views."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _use_replica.get() and not self._flushing:
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _flag_bulk_write(orm_execute_state):
+    state = orm_execute_state
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _flag_flush_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _record_commit(session):
+    if session.info.pop("wrote", False) and has_request_context():
+        g.db_wrote = True
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _clear_write_flag(session):
+    session.info.pop("wrote", None)
+
+
+def _current_identity():
+    try:
+        from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except Exception:
+        return None
+
+
+def _is_sticky():
+    window = current_app.config.get("REPLICA_STICKY_SECONDS", 0)
+    now = time.time()
+    try:
+        if now - float(request.cookies.get(STICKY_COOKIE, 0)) < window:
+            return True
+    except ValueError:
+        pass
+    identity = _current_identity()
+    if identity is None:
+        return False
+    with _recent_writers_lock:
+        last_write = _recent_writers.get(str(identity), 0)
+    return now - last_write < window
+
+
+def read_replica(view):
+    """Run ``view`` against the replica unless the caller wrote recently."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        engines = current_app.extensions["sqlalchemy"].engines
+        use_replica = REPLICA_BIND in engines and not _is_sticky()
+        token = _use_replica.set(use_replica)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+
+    return wrapper
+
+
+def init_read_replica(app):
+    """Register the hook that pins recent writers to the primary."""
+
+    @app.after_request
+    def _pin_writer_to_primary(response):
+        if not g.pop("db_wrote", False):
+            return response
+        if REPLICA_BIND not in app.extensions["sqlalchemy"].engines:
+            return response
+        now = time.time()
+        window = app.config.get("REPLICA_STICKY_SECONDS", 0)
+        identity = _current_identity()
+        if identity is not None:
+            with _recent_writers_lock:
+                _recent_writers[str(identity)] = now
+                if len(_recent_writers) > 1024:
+                    for key, ts in list(_recent_writers.items()):
+                        if now - ts >= window:
+                            del _recent_writers[key]
+        response.set_cookie(
+            STICKY_COOKIE,
+            str(now),
+            max_age=int(window) + 1,
+            httponly=True,
+            samesite="Lax",
+        )
+        return response
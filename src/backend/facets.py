@@ -0,0 +1,69 @@
+"""Listing counts per category and location for the search filters.
+
+Counts are computed in the database with one ``GROUP BY`` per facet and
+cached in ``cache`` under ``facets:<version>:<filters>``, where
+``<version>`` is the shared listings version from ``data_version``. Every
+transaction that changes listings bumps it, in any process (web workers,
+the job worker), so once the write commits every worker misses the cache
+and recomputes. The version is read and counts are computed on the
+primary, so a lagging replica cannot put old counts back under the new
+version. The TTL (``FACETS_CACHE_SECONDS``) only bounds memory; in this
+process, entries for old versions are also dropped as soon as the
+``listing_changed`` signal arrives.
+
+Each facet applies every active filter except its own, so selecting a
+category still shows how many listings the other categories have.
+"""
+
+from sqlalchemy import func
+
+from cache import cache
+from listing_events import listing_changed, listings_version
+from models import Listing, category_name, db
+
+CACHE_PREFIX = "facets:"
+
+
+def _counts(column, conditions):
+    query = db.session.query(column, func.count(Listing.id)).filter(*conditions)
+    return query.group_by(column).all()
+
+
+def compute_facets(filters):
+    """Return facet counts for ``filters`` ({name: SQL condition or None})."""
+
+    def others(name):
+        return [
+            cond for key, cond in filters.items() if key != name and cond is not None
+        ]
+
+    categories = [
+        {"name": category_name(category_id), "count": count}
+        for category_id, count in _counts(Listing.category_id, others("category"))
+        if category_id is not None
+    ]
+    locations = [
+        {"name": location, "count": count}
+        for location, count in _counts(Listing.location, others("location"))
+        if location
+    ]
+    for rows in (categories, locations):
+        rows.sort(key=lambda row: (-row["count"], row["name"]))
+    return {"categories": categories, "locations": locations}
+
+
+def cached_facets(key, filters, ttl):
+    """Facet counts for ``filters``, cached under ``key`` (run on the primary)."""
+    # Read before computing: a write committing meanwhile bumps the version,
+    # so a result that might predate it is stored under a key nobody reads.
+    key = f"{CACHE_PREFIX}{listings_version(db.session)}:{key}"
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(filters)
+        cache.set(key, facets, ttl)
+    return facets
+
+
+@listing_changed.connect
+def _invalidate(sender, changes):
+    cache.delete_prefix(CACHE_PREFIX)
@@ -0,0 +1,315 @@
+"""Federated event search: Tapin listings first, Google only on a cold miss.
+
+``/api/search/events`` answers from three tiers, cheapest first:
+
+1. Our own listings whose title, description or location contain every
+   word of the query (and that fit the requested category). When they
+   fill a page (``SEARCH_LOCAL_ENOUGH``) Google is not called at all.
+2. The external store. Every Google result is kept once in
+   ``external_event``, keyed by the sha256 of its normalized URL, and each
+   normalized query remembers which results it returned in
+   ``external_search``. A query fetched within
+   ``EXTERNAL_SEARCH_TTL_SECONDS`` is answered from these two tables.
+3. Google, on a cold miss. Its categorized results are upserted into the
+   store and recorded against the query.
+
+Searching ``"All"`` fans out: the bare query and one ``"<query> in
+<category>"`` sub-query per category run concurrently, each through tiers
+2 and 3, under one deadline (``SEARCH_DEADLINE_SECONDS``). Sub-queries
+still running at the deadline are left out and the answer is marked
+partial; the next search retries just those. Only the Google calls run on
+the I/O pool (``io_pool.py``); every database read and write stays on the
+request's thread and session.
+
+When Google fails or is too slow (see the circuit breaker in
+``google_search.py``), a sub-query falls back to its stored results
+whatever their age, marked stale.
+
+Results come back as one list, listings first, each tagged with
+``source`` (``"tapin"`` or ``"external"``).
+"""
+
+import hashlib
+from concurrent.futures import wait
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from itertools import zip_longest
+from urllib.parse import urlsplit, urlunsplit
+
+from sqlalchemy import or_, select
+
+from categories import CATEGORIES, VALUE_CATEGORIES
+from categorizer import categorizer
+from google_search import SearchError, SearchTimeout, search_events
+from io_pool import submit
+from models import (
+    ExternalEvent,
+    ExternalSearch,
+    Listing,
+    category_name,
+    db,
+    dialect_insert,
+)
+
+STOPWORDS = frozenset({"and", "for", "near", "the", "with"})
+CANDIDATES = 50  # listing rows read before the category check
+
+
+def normalize_query(text):
+    return " ".join(text.lower().split())
+
+
+def normalize_url(url):
+    """Drop the fragment and trailing slash; lower-case scheme and host."""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/") if parts.path != "/" else ""
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), path, parts.query, "")
+    )
+
+
+def sha256_hex(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def url_hash(url):
+    return sha256_hex(normalize_url(url))
+
+
+def local_results(query, category=None, limit=10):
+    """Listings matching every query word, as search results."""
+    words = [w for w in normalize_query(query).split() if len(w) > 2]
+    words = [w for w in words if w not in STOPWORDS]
+    if not words:
+        return []
+    conditions = [
+        or_(
+            Listing.title.ilike(f"%{word}%"),
+            Listing.description.ilike(f"%{word}%"),
+            Listing.location.ilike(f"%{word}%"),
+        )
+        for word in words
+    ]
+    rows = db.session.scalars(
+        select(Listing)
+        .where(*conditions, Listing.not_ended())
+        .order_by(Listing.created_at.desc())
+        .limit(CANDIDATES)
+    )
+    results = []
+    for listing in rows:
+        guessed = categorizer.categorize(listing.title, listing.description)
+        if category and category != "All":
+            if not _fits(listing, category, guessed):
+                continue
+            guessed = category
+        results.append(
+            {
+                "source": "tapin",
+                "listing_id": listing.id,
+                "title": listing.title,
+                "snippet": listing.description,
+                "link": None,
+                "category": guessed,
+            }
+        )
+        if len(results) == limit:
+            break
+    return results
+
+
+def _fits(listing, category, guessed):
+    """Filed under the listing category ``category`` maps to, or reads like it."""
+    mapped = VALUE_CATEGORIES.get(category)
+    return guessed == category or (
+        mapped is not None and mapped == category_name(listing.category_id)
+    )
+
+
+def _upsert(table, key, rows):
+    """Insert ``rows`` into ``table``, overwriting rows with the same ``key``."""
+    connection = db.session.connection()
+    insert = dialect_insert(connection.dialect.name)
+    if insert is not None:
+        # One statement, and safe when two workers store the same URL at once.
+        statement = insert(table).values(rows)
+        columns = [name for name in rows[0] if name != key]
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=[key],
+                set_={name: statement.excluded[name] for name in columns},
+            )
+        )
+        return
+    existing = set(
+        connection.scalars(
+            select(table.c[key]).where(table.c[key].in_([r[key] for r in rows]))
+        )
+    )
+    for row in rows:
+        if row[key] in existing:
+            connection.execute(
+                table.update().where(table.c[key] == row[key]).values(row)
+            )
+        else:
+            connection.execute(table.insert().values(row))
+
+
+def stored_results(query_key, ttl=None):
+    """Results stored for ``query_key`` within ``ttl`` seconds, else None.
+
+    ``ttl=None`` accepts results of any age (the stale fallback).
+    """
+    query = select(ExternalSearch.url_hashes).where(
+        ExternalSearch.query_hash == sha256_hex(query_key)
+    )
+    if ttl is not None:
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=ttl)
+        query = query.where(ExternalSearch.fetched_at >= cutoff)
+    hashes = db.session.scalar(query)
+    if hashes is None:
+        return None
+    table = ExternalEvent.__table__
+    rows = db.session.execute(select(table).where(table.c.url_hash.in_(hashes)))
+    events = {row["url_hash"]: row for row in rows.mappings()}
+    return [_external(events[h]) for h in hashes if h in events]
+
+
+def store_results(query_key, items):
+    """Store categorized Google ``items`` for ``query_key``, one row per URL.
+
+    The caller commits.
+    """
+    now = datetime.now(timezone.utc)
+    events = {}
+    for item in items:
+        link = item.get("link")
+        if link:
+            events.setdefault(
+                url_hash(link),
+                {
+                    "url_hash": url_hash(link),
+                    "url": link,
+                    "title": (item.get("title") or "")[:300],
+                    "snippet": item.get("snippet") or "",
+                    "category": item.get("category"),
+                    "fetched_at": now,
+                },
+            )
+    if events:
+        _upsert(ExternalEvent.__table__, "url_hash", list(events.values()))
+    search = {
+        "query_hash": sha256_hex(query_key),
+        "query_text": query_key[:500],
+        "url_hashes": list(events),
+        "fetched_at": now,
+    }
+    _upsert(ExternalSearch.__table__, "query_hash", [search])
+    return [_external(row) for row in events.values()]
+
+
+def _external(row):
+    return {
+        "source": "external",
+        "title": row["title"],
+        "snippet": row["snippet"],
+        "link": row["url"],
+        "category": row["category"],
+    }
+
+
+def _sub_query(query, category):
+    return f"{query} in {category}" if category else query
+
+
+def _interleave(lists):
+    """Round-robin over ``lists``, dropping repeated links."""
+    seen, merged = set(), []
+    for row in zip_longest(*lists):
+        for result in row:
+            if result is not None and url_hash(result["link"]) not in seen:
+                seen.add(url_hash(result["link"]))
+                merged.append(result)
+    return merged
+
+
+@dataclass
+class SearchResults:
+    results: list
+    source: str  # last tier used: "local", "store" or "google"
+    missing: list = field(default_factory=list)  # sub-queries left out
+    stale: list = field(default_factory=list)  # answered past their TTL
+
+
+def external_results(query, categories, ttl, deadline):
+    """External results for ``query`` in each of ``categories`` (None: no suffix).
+
+    Fresh stored sub-queries are read from the store; the cold ones go to
+    Google concurrently. Calls that fail, or are still running ``deadline``
+    seconds in (their thread finishes in the background and the result is
+    discarded), fall back to stored results of any age. Raises the first
+    `SearchError` when no sub-query produced anything.
+    """
+    keys = {c: normalize_query(_sub_query(query, c)) for c in categories}
+    found, cold = {}, []
+    for category in categories:
+        stored = stored_results(keys[category], ttl)
+        if stored is None:
+            cold.append(category)
+        else:
+            found[category] = stored
+
+    answer = SearchResults([], "google" if cold else "store")
+    errors = []
+    if cold:
+        calls = [submit(search_events, _sub_query(query, c)) for c in cold]
+        done, pending = wait(calls, timeout=deadline)
+        for call in pending:
+            call.cancel()
+        for category, call in zip(cold, calls):
+            label = category or query
+            if call in done and call.exception() is None:
+                found[category] = store_results(keys[category], call.result())
+                continue
+            if call in done:
+                errors.append(call.exception())
+            stale = stored_results(keys[category])
+            if stale is None:
+                answer.missing.append(label)
+            else:
+                found[category] = stale
+                answer.stale.append(label)
+        db.session.commit()
+
+    if not found:
+        if errors:
+            raise errors[0]
+        raise SearchTimeout(f"no search results within {deadline}s")
+    answer.results = _interleave([found[c] for c in categories if c in found])
+    return answer
+
+
+def federated_search(query, category=None, ttl=86400, local_enough=10, deadline=5.0):
+    """Search listings, then the external store, then Google.
+
+    ``category="All"`` fans out one sub-query per category (plus the bare
+    query) and interleaves their results. Returns `SearchResults` with the
+    listings first. Raises `SearchError` when Google fails, nothing is
+    stored for the query and no listing matched.
+    """
+    local = local_results(query, category, limit=local_enough)
+    if len(local) >= local_enough:
+        return SearchResults(local, "local")
+
+    if category == "All":
+        categories = [None] + [c for c in CATEGORIES if c != "All"]
+    else:
+        categories = [category]
+    try:
+        answer = external_results(query, categories, ttl, deadline)
+    except SearchError:
+        if not local:
+            raise
+        return SearchResults(local, "local", missing=[query])
+    answer.results = local + answer.results
+    return answer
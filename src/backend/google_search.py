@@ -1,51 +1,95 @@
 import os
-from googleapiclient.discovery import build
-from dotenv import load_dotenv
-from categories import CATEGORIES
+from categorizer import categorizer
+from circuit_breaker import CircuitBreaker, CircuitOpenError
 
-load_dotenv()
+
+def _is_upstream_failure(exc):
+    """Timeouts, connection errors and 5xx answers; not 4xx (bad key, quota)."""
+    status = getattr(getattr(exc, "resp", None), "status", None)
+    if status is not None:
+        return int(status) >= 500
+    # Imported here for the same reason as in _execute_search.
+    from httplib2 import HttpLib2Error
+
+    return isinstance(exc, (OSError, HttpLib2Error))
+
+
+# Calls to Google go through one breaker per worker process. Each call gets
+# a socket timeout, so a hung upstream costs at most GOOGLE_TIMEOUT_SECONDS.
+breaker = CircuitBreaker(
+    "google_search",
+    failure_threshold=int(os.environ.get("GOOGLE_BREAKER_FAILURES", 5)),
+    reset_timeout=float(os.environ.get("GOOGLE_BREAKER_RESET_SECONDS", 30)),
+    is_failure=_is_upstream_failure,
+)
+
+
+class SearchError(Exception):
+    """The external search failed; ``status`` is the HTTP status to answer with."""
+
+    status = 502
+
+
+class SearchUnavailable(SearchError):
+    """Search is not configured or its circuit is open."""
+
+    status = 503
+
+
+class SearchTimeout(SearchError):
+    status = 504
 
 
 def search_events(query):
     """
     Searches for volunteer events using the Google Custom Search JSON API.
+
+    Raises `SearchError` (or a subclass) instead of returning partial data.
     """
     api_key = os.getenv("GOOGLE_API_KEY")
     search_engine_id = os.getenv("CUSTOM_SEARCH_ENGINE_ID")
 
     if not api_key or not search_engine_id:
-        return {"error": "Google API key or Search Engine ID not configured."}
+        raise SearchUnavailable("Google API key or Search Engine ID not configured.")
 
+    timeout = float(os.environ.get("GOOGLE_TIMEOUT_SECONDS", 4))
     try:
-        service = build("customsearch", "v1", developerKey=api_key)
-        result = (
-            service.cse()
-            .list(q=query, cx=search_engine_id, num=10)  # Number of results to return
-            .execute()
+        items = breaker.call(
+            _execute_search, query, api_key, search_engine_id, timeout=timeout
         )
-        items = result.get("items", [])
-        return refine_and_categorize(items)
+    except CircuitOpenError as e:
+        raise SearchUnavailable(str(e)) from e
+    except TimeoutError as e:
+        raise SearchTimeout(f"Google search timed out after {timeout}s") from e
     except Exception as e:
-        return {"error": str(e)}
+        raise SearchError(str(e)) from e
+    return refine_and_categorize(items)
+
+
+def _execute_search(query, api_key, search_engine_id, num=10, timeout=None):
+    """Call the Custom Search API and return the raw result items."""
+    # Imported here: googleapiclient is slow to import and only needed once
+    # a search actually reaches Google.
+    import httplib2
+    from googleapiclient.discovery import build
+
+    service = build(
+        "customsearch",
+        "v1",
+        developerKey=api_key,
+        http=httplib2.Http(timeout=timeout),
+        cache_discovery=False,
+    )
+    result = (
+        service.cse()
+        .list(q=query, cx=search_engine_id, num=num)  # Number of results to return
+        .execute(num_retries=0)
+    )
+    return result.get("items", [])
 
 
 def refine_and_categorize(items):
     """
     Refines raw Google search results and categorizes them.
     """
-    refined_results = []
-    for item in items:
-        categorized = False
-        for category in CATEGORIES:
-            if (
-                category.lower() in item.get("title", "").lower()
-                or category.lower() in item.get("snippet", "").lower()
-            ):
-                item["category"] = category
-                refined_results.append(item)
-                categorized = True
-                break
-        if not categorized:
-            item["category"] = "Other"
-            refined_results.append(item)
-    return refined_results
+    return categorizer.categorize_items(list(items))
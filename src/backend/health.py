@@ -0,0 +1,94 @@
+"""Helpers for the liveness and readiness probes.
+
+Liveness (`/api/health/live`) must never touch I/O. Readiness
+(`/api/health/ready`) checks the database, but the round trip and the
+migration revision lookup are cached for ``HEALTH_READY_CACHE_SECONDS`` so
+frequent load-balancer probes do not hold pool connections.
+"""
+
+import time
+from pathlib import Path
+
+from cache import cache
+from models import db
+
+ALEMBIC_DIR = Path(__file__).resolve().parent / "alembic"
+READY_CACHE_KEY = "health:database"
+
+
+def migration_status(connection):
+    """Compare the database's alembic revision with the script head."""
+    try:
+        from alembic.config import Config
+        from alembic.runtime.migration import MigrationContext
+        from alembic.script import ScriptDirectory
+    except ImportError:
+        return {"status": "unknown", "error": "alembic not installed"}
+
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    heads = sorted(ScriptDirectory.from_config(config).get_heads())
+    current = sorted(MigrationContext.configure(connection).get_current_heads())
+    return {
+        "status": "up_to_date" if current == heads else "pending",
+        "head": heads,
+        "current": current,
+    }
+
+
+def database_probe():
+    """Run ``SELECT 1`` and read the migration revision on one connection."""
+    started = time.perf_counter()
+    with db.engine.connect() as connection:
+        connection.execute(db.text("SELECT 1"))
+        latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        try:
+            migrations = migration_status(connection)
+        except Exception as e:
+            migrations = {"status": "unknown", "error": str(e)}
+    return {
+        "status": "connected",
+        "latency_ms": latency_ms,
+        "migrations": migrations,
+        "checked_at": time.time(),
+    }
+
+
+def cached_database_probe(ttl):
+    """Return the last probe result, re-probing at most once per ``ttl``.
+
+    Failures are cached as well so a down database is not hammered by every
+    probe; the result is a ``(healthy, payload)`` pair.
+    """
+    result = cache.get(READY_CACHE_KEY)
+    if result is None:
+        try:
+            result = (True, database_probe())
+        except Exception as e:
+            result = (False, {"status": "error", "error": str(e)})
+        cache.set(READY_CACHE_KEY, result, ttl)
+    return result
+
+
+def pool_status(engine):
+    """Describe connection pool usage without checking out a connection."""
+    pool = engine.pool
+    status = {"class": type(pool).__name__}
+    if hasattr(pool, "wait_stats"):
+        status["wait"] = pool.wait_stats.snapshot()
+    if not hasattr(pool, "size"):
+        return status
+    size = pool.size()
+    checked_out = pool.checkedout()
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    capacity = size + max(max_overflow, 0)
+    status.update(
+        {
+            "size": size,
+            "checked_out": checked_out,
+            "overflow": pool.overflow(),
+            "max_overflow": max_overflow,
+            "saturation": round(checked_out / capacity, 3) if capacity else None,
+        }
+    )
+    return status
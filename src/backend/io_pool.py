@@ -0,0 +1,23 @@
+"""A thread pool for blocking upstream calls fanned out from one request.
+
+Views stay synchronous: they run on the request's thread and use its
+database session. Only the upstream calls themselves (Google searches) are
+handed to this pool, so one request can wait on several of them at once
+while every database call stays on the request's thread.
+
+The pool is sized by ``IO_THREADS`` rather than the CPU count, since the
+calls spend their time waiting on the network.
+"""
+
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+IO_THREADS = int(os.environ.get("IO_THREADS", 32))
+
+_executor = ThreadPoolExecutor(max_workers=IO_THREADS, thread_name_prefix="blocking-io")
+
+
+def submit(func, *args, **kwargs):
+    """Start ``func(*args, **kwargs)`` on the I/O pool; returns its ``Future``."""
+    return _executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
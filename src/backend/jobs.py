@@ -0,0 +1,220 @@
+"""A database-backed job queue for slow side effects.
+
+Handlers register with ``@job("name")``. Request code calls
+``enqueue("name", **payload)``, which adds a ``Job`` row to the current
+session, so the job is committed (or rolled back) together with the
+request's own writes. Workers (``python manage.py worker``) run them.
+
+Claiming is safe with any number of workers: candidates are selected with
+``FOR UPDATE SKIP LOCKED`` (Postgres; SQLite ignores it), then each is taken
+with a conditional ``UPDATE ... WHERE status = <still claimable>``, so only
+one worker wins a job. A claim holds the job for ``visibility_timeout``
+seconds; if the worker dies, the job becomes claimable again when that
+lapses.
+
+``enqueue(..., unique=True)`` relies on a partial unique index over the
+queued jobs' ``unique_key``: the insert is an ``INSERT ... ON CONFLICT DO
+NOTHING`` (a savepoint on other databases), so two callers racing to queue
+the same job end up sharing one row. The key is cleared when the job is
+claimed, so a running job never blocks the next one from being queued.
+
+A handler that raises is retried with exponential backoff
+(``RETRY_BASE_SECONDS * 2 ** (attempts - 1)``) until ``max_attempts``, then
+the job is marked ``failed`` with the last error kept on the row.
+"""
+
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, insert, or_, select, text, update
+from sqlalchemy.exc import IntegrityError
+
+from models import Job, db, dialect_insert
+
+log = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+RETRY_BASE_SECONDS = 10
+
+handlers = {}
+
+
+def job(name):
+    """Register the decorated function as the handler for jobs called ``name``."""
+
+    def register(fn):
+        handlers[name] = fn
+        return fn
+
+    return register
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def enqueue(name, delay=0, max_attempts=5, unique=False, **payload):
+    """Add a job to the session; it runs once the caller commits.
+
+    ``payload`` must be JSON-serializable; it is passed to the handler as
+    keyword arguments. ``delay`` schedules the first attempt that many
+    seconds from now. With ``unique``, nothing is added when a unique job
+    of the same name is already queued, and that job is returned instead;
+    the row is inserted right away (still in the caller's transaction).
+    """
+    if name not in handlers:
+        raise KeyError(f"no handler registered for job {name!r}")
+    values = dict(
+        name=name,
+        payload=payload,
+        max_attempts=max_attempts,
+        run_at=_now() + timedelta(seconds=delay),
+    )
+    if unique:
+        return _enqueue_unique(values)
+    row = Job(**values)
+    db.session.add(row)
+    return row
+
+
+def _enqueue_unique(values):
+    key = values["name"]
+    upsert = dialect_insert(db.engine.dialect.name)
+    if upsert is not None:
+        db.session.execute(
+            upsert(Job)
+            .values(status=QUEUED, unique_key=key, **values)
+            .on_conflict_do_nothing(
+                # Literal, to match the index's predicate.
+                index_elements=["unique_key"],
+                index_where=text(f"status = '{QUEUED}'"),
+            )
+        )
+    else:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(
+                    insert(Job).values(status=QUEUED, unique_key=key, **values)
+                )
+        except IntegrityError:
+            pass
+    return db.session.scalars(
+        select(Job).where(Job.unique_key == key, Job.status == QUEUED)
+    ).one()
+
+
+def _claimable(now):
+    return or_(
+        and_(Job.status == QUEUED, Job.run_at <= now),
+        and_(Job.status == RUNNING, Job.locked_until < now),
+    )
+
+
+def claim(worker_id, limit=10, visibility_timeout=300):
+    """Lock up to ``limit`` due jobs for ``worker_id`` and return them."""
+    now = _now()
+    candidates = db.session.scalars(
+        select(Job.id)
+        .where(_claimable(now))
+        .order_by(Job.run_at, Job.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+    claimed = []
+    for job_id in candidates:
+        taken = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, _claimable(now))
+            .values(
+                status=RUNNING,
+                unique_key=None,
+                attempts=Job.attempts + 1,
+                locked_by=worker_id,
+                locked_until=now + timedelta(seconds=visibility_timeout),
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if taken:
+            claimed.append(job_id)
+    db.session.commit()
+    if not claimed:
+        return []
+    return db.session.scalars(
+        select(Job)
+        .where(Job.id.in_(claimed))
+        .order_by(Job.run_at, Job.id)
+        .execution_options(populate_existing=True)
+    ).all()
+
+
+def _finish(job_id, worker_id, **values):
+    """Record an outcome, unless the claim lapsed and another worker took over."""
+    finished = db.session.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == RUNNING, Job.locked_by == worker_id)
+        .values(locked_until=None, locked_by=None, **values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return bool(finished)
+
+
+def run(row, worker_id):
+    """Run one claimed job and record the outcome; returns True on success."""
+    job_id, name, attempts = row.id, row.name, row.attempts
+    max_attempts, payload = row.max_attempts, dict(row.payload or {})
+    try:
+        handler = handlers[name]
+        handler(**payload)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        error = f"{type(e).__name__}: {e}"
+        if attempts >= max_attempts:
+            log.error("job %s (%s) failed for good: %s", job_id, name, error)
+            _finish(job_id, worker_id, status=FAILED, last_error=error)
+        else:
+            delay = RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+            log.warning(
+                "job %s (%s) failed, retry in %ss: %s", job_id, name, delay, error
+            )
+            _finish(
+                job_id,
+                worker_id,
+                status=QUEUED,
+                last_error=error,
+                run_at=_now() + timedelta(seconds=delay),
+            )
+        return False
+    _finish(job_id, worker_id, status=DONE, finished_at=_now(), last_error=None)
+    return True
+
+
+def work(
+    worker_id=None,
+    batch=10,
+    visibility_timeout=300,
+    poll_interval=1.0,
+    once=False,
+    stop=None,
+):
+    """Claim and run jobs until ``stop`` is set (or, with ``once``, the queue is empty).
+
+    Needs an app context. Returns the number of jobs run.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    stop = stop or threading.Event()
+    count = 0
+    while not stop.is_set():
+        rows = claim(worker_id, batch, visibility_timeout)
+        for row in rows:
+            run(row, worker_id)
+            count += 1
+        if not rows:
+            if once:
+                break
+            stop.wait(poll_interval)
+    return count
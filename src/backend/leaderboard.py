@@ -0,0 +1,129 @@
+"""Volunteer leaderboards kept as in-process sorted lists.
+
+Each board holds ``(-score, user_id)`` keys in a list kept sorted with
+``bisect``, plus a ``user_id -> score`` map, so top-N is a slice and a
+user's rank is one binary search. Moving a user is two binary searches
+plus a list shift (a memmove, cheap at volunteer-count sizes). Users with
+a score of zero are left out.
+
+Boards are loaded from the database on first use and reloaded every
+``max_age`` seconds, which also picks up writes made by other worker
+processes. In between, users are marked dirty from commit-time signals
+(``user_stats_changed`` when a signup is accepted or cancelled,
+``achievements_awarded`` after awards) and only their scores are re-read
+on the next query.
+"""
+
+import bisect
+import threading
+import time
+
+from sqlalchemy import event, func, select
+
+from achievements import achievements_awarded
+from models import UserAchievement, UserStats, db
+from user_stats import user_stats_changed
+
+
+class Leaderboard:
+    def __init__(self, load_scores, max_age=300.0):
+        """``load_scores(user_ids=None)`` returns ``{user_id: score}``."""
+        self.load_scores = load_scores
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._reset()
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self._keys = []  # sorted (-score, user_id)
+        self._scores = {}
+        self._dirty = set()
+        self._loaded_at = None
+
+    def mark_dirty(self, user_ids):
+        with self._lock:
+            self._dirty.update(user_ids)
+
+    def _set(self, user_id, score):
+        old = self._scores.pop(user_id, None)
+        if old is not None:
+            index = bisect.bisect_left(self._keys, (-old, user_id))
+            del self._keys[index]
+        if score > 0:
+            self._scores[user_id] = score
+            bisect.insort(self._keys, (-score, user_id))
+
+    def refresh(self):
+        """Reload when expired, otherwise re-read only the dirty users."""
+        with self._lock:
+            now = time.monotonic()
+            if self._loaded_at is None or now - self._loaded_at > self.max_age:
+                scores = self.load_scores()
+                self._scores = {u: s for u, s in scores.items() if s > 0}
+                self._keys = sorted((-s, u) for u, s in self._scores.items())
+                self._dirty.clear()
+                self._loaded_at = now
+            elif self._dirty:
+                dirty, self._dirty = self._dirty, set()
+                scores = self.load_scores(dirty)
+                for user_id in dirty:
+                    self._set(user_id, scores.get(user_id, 0))
+
+    def top(self, n):
+        """The ``n`` best ``(rank, user_id, score)`` entries."""
+        self.refresh()
+        with self._lock:
+            return [
+                (rank, user_id, -negative)
+                for rank, (negative, user_id) in enumerate(self._keys[:n], 1)
+            ]
+
+    def rank(self, user_id):
+        """``(rank, score)`` for ``user_id``; rank is None for a zero score."""
+        self.refresh()
+        with self._lock:
+            score = self._scores.get(user_id)
+            if score is None:
+                return None, 0
+            return bisect.bisect_left(self._keys, (-score, user_id)) + 1, score
+
+
+def _accepted_signups(user_ids=None):
+    query = select(UserStats.user_id, UserStats.accepted_signups)
+    if user_ids is not None:
+        query = query.where(UserStats.user_id.in_(user_ids))
+    return dict(db.session.execute(query).all())
+
+
+def _achievement_counts(user_ids=None):
+    query = select(UserAchievement.user_id, func.count()).group_by(
+        UserAchievement.user_id
+    )
+    if user_ids is not None:
+        query = query.where(UserAchievement.user_id.in_(user_ids))
+    return dict(db.session.execute(query).all())
+
+
+boards = {
+    "signups": Leaderboard(_accepted_signups),
+    "achievements": Leaderboard(_achievement_counts),
+}
+
+
+@user_stats_changed.connect
+def _on_stats_changed(sender, user_ids):
+    boards["signups"].mark_dirty(user_ids)
+
+
+@achievements_awarded.connect
+def _on_awarded(sender, user_ids):
+    boards["achievements"].mark_dirty(user_ids)
+
+
+@event.listens_for(UserStats.__table__, "after_create")
+def _reset_boards(table, connection, **kw):
+    for board in boards.values():
+        board.clear()
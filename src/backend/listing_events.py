@@ -0,0 +1,98 @@
+"""Notify in-process subscribers when listings change.
+
+Listings touched by a flush are collected on the session and announced
+with the ``listing_changed`` signal once the transaction commits, so
+subscribers (cached aggregates, indexes) never see rolled-back writes::
+
+    @listing_changed.connect
+    def on_listing_changed(sender, changes):
+        ...  # changes: {listing_id: "created" | "updated" | "deleted"}
+
+Receivers run synchronously in the committing thread and should stay
+cheap. Bulk ``query.update()``/``delete()`` statements bypass the flush;
+code that uses them reports its changes with ``record_changes``.
+
+The signal only reaches this process. For caches shared across gunicorn
+workers and the job worker, every transaction that changes listings also
+bumps the ``listings`` row of ``data_version``, so it commits (or rolls
+back) with the change; ``listings_version`` reads it.
+"""
+
+from blinker import Namespace
+from sqlalchemy import event, select, update
+
+from db_routing import RoutingSession
+
+_signals = Namespace()
+listing_changed = _signals.signal("listing-changed")
+
+_PENDING_KEY = "listing_changes"
+_BUMPED_KEY = "listings_version_bumped"
+
+
+def _listing_ids(instances, listing_cls):
+    for obj in instances:
+        if isinstance(obj, listing_cls) and obj.id is not None:
+            yield obj.id
+
+
+def record_changes(session, changes):
+    """Announce ``{listing_id: kind}`` with the session's next commit."""
+    session.info.setdefault(_PENDING_KEY, {}).update(changes)
+    if changes:
+        _bump_version(session)
+
+
+def _bump_version(session):
+    """Bump the shared listings version, once per transaction."""
+    from models import LISTINGS_VERSION, DataVersion
+
+    if session.info.get(_BUMPED_KEY):
+        return
+    session.info[_BUMPED_KEY] = True
+    session.execute(
+        update(DataVersion)
+        .where(DataVersion.name == LISTINGS_VERSION)
+        .values(version=DataVersion.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def listings_version(session):
+    """The committed version of the listings data (0 if never bumped)."""
+    from models import LISTINGS_VERSION, DataVersion
+
+    version = session.scalar(
+        select(DataVersion.version).where(DataVersion.name == LISTINGS_VERSION)
+    )
+    return version or 0
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _collect_changes(session, flush_context):
+    from models import Listing
+
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    before = len(pending)
+    for listing_id in _listing_ids(session.new, Listing):
+        pending[listing_id] = "created"
+    for listing_id in _listing_ids(session.dirty, Listing):
+        pending.setdefault(listing_id, "updated")
+    for listing_id in _listing_ids(session.deleted, Listing):
+        pending[listing_id] = "deleted"
+    if len(pending) > before:
+        _bump_version(session)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _announce_changes(session):
+    session.info.pop(_BUMPED_KEY, None)
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        listing_changed.send(session, changes=changes)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard_changes(session):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_BUMPED_KEY, None)
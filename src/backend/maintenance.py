@@ -0,0 +1,153 @@
+"""Periodic cleanup: archive inactive listings, purge dead signups.
+
+``archive_listings`` moves events that ended more than
+``LISTING_ENDED_DAYS`` ago, and undated listings created more than
+``LISTING_INACTIVE_DAYS`` ago that have had no signup in that time, into
+``listing_archive``. Their signups and reviews move along into
+``sign_up_archive`` and ``review_archive``, so the foreign keys hold and the
+volunteers' history is kept. ``user_stats`` counters are left unchanged
+(``backfill()`` counts the archives too).
+
+``purge_signups`` deletes cancelled and declined signups older than
+``SIGNUP_RETENTION_DAYS`` and takes them off the users' ``signups``
+counters.
+
+Both work in batches of ``CLEANUP_BATCH_SIZE`` rows, one short transaction
+per batch, so no lock is held for long. Candidate rows are selected with
+``FOR UPDATE SKIP LOCKED`` (ignored by SQLite) so two cleanups never
+collide and rows locked by live requests are left for the next run.
+
+The ``cleanup`` job runs both and schedules its next run
+``CLEANUP_INTERVAL_SECONDS`` later; start the cycle once with
+``python manage.py cleanup --schedule``, or run ``python manage.py
+cleanup`` from cron instead.
+"""
+
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import and_, delete, exists, insert, literal, or_, select
+
+from jobs import enqueue, job
+from listing_events import record_changes
+from models import (
+    Listing,
+    ListingArchive,
+    Review,
+    ReviewArchive,
+    SignUp,
+    SignUpArchive,
+    db,
+)
+from user_stats import adjust
+
+log = logging.getLogger(__name__)
+
+PURGED_STATUSES = ("cancelled", "declined")
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _move(model, archive, condition, archived_at):
+    """Copy the rows of ``model`` matching ``condition`` into ``archive``.
+
+    The copied rows are then deleted from ``model``.
+    """
+    table = model.__table__
+    columns = [column.name for column in table.columns]
+    db.session.execute(
+        insert(archive.__table__).from_select(
+            columns + ["archived_at"],
+            select(*table.columns, literal(archived_at, db.DateTime)).where(condition),
+        )
+    )
+    db.session.execute(delete(table).where(condition))
+
+
+def archive_listings(inactive_days, ended_days=30, batch_size=500, now=None):
+    """Archive ended or inactive listings with their signups and reviews.
+
+    Returns the number of listings archived.
+    """
+    now = now or _now()
+    cutoff = now - timedelta(days=inactive_days)
+    recent_signup = exists().where(
+        SignUp.listing_id == Listing.id, SignUp.created_at >= cutoff
+    )
+    archivable = or_(
+        Listing.ends_at < now - timedelta(days=ended_days),
+        and_(Listing.ends_at.is_(None), Listing.created_at < cutoff, ~recent_signup),
+    )
+    total = 0
+    while True:
+        ids = db.session.scalars(
+            select(Listing.id)
+            .where(archivable)
+            .order_by(Listing.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not ids:
+            break
+        _move(SignUp, SignUpArchive, SignUp.listing_id.in_(ids), now)
+        _move(Review, ReviewArchive, Review.listing_id.in_(ids), now)
+        _move(Listing, ListingArchive, Listing.id.in_(ids), now)
+        record_changes(db.session, dict.fromkeys(ids, "deleted"))
+        db.session.commit()
+        total += len(ids)
+        if len(ids) < batch_size:
+            break
+    return total
+
+
+def purge_signups(retention_days, batch_size=500, now=None):
+    """Delete old cancelled/declined signups; return the count."""
+    cutoff = (now or _now()) - timedelta(days=retention_days)
+    total = 0
+    while True:
+        rows = db.session.execute(
+            select(SignUp.id, SignUp.user_id)
+            .where(SignUp.status.in_(PURGED_STATUSES), SignUp.created_at < cutoff)
+            .order_by(SignUp.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            break
+        db.session.execute(delete(SignUp).where(SignUp.id.in_([r.id for r in rows])))
+        deltas = defaultdict(Counter)
+        for row in rows:
+            deltas[row.user_id]["signups"] -= 1
+        adjust(db.session, deltas)
+        db.session.commit()
+        total += len(rows)
+        if len(rows) < batch_size:
+            break
+    return total
+
+
+def run_cleanup(config):
+    """Run both cleanups with the app's settings; return the counts."""
+    batch_size = config["CLEANUP_BATCH_SIZE"]
+    counts = {
+        "archived_listings": archive_listings(
+            config["LISTING_INACTIVE_DAYS"], config["LISTING_ENDED_DAYS"], batch_size
+        ),
+        "purged_signups": purge_signups(config["SIGNUP_RETENTION_DAYS"], batch_size),
+    }
+    log.info("cleanup: %s", counts)
+    return counts
+
+
+@job("cleanup")
+def cleanup_job():
+    # Schedule the next run first, so a failing run does not end the cycle.
+    enqueue(
+        "cleanup", delay=current_app.config["CLEANUP_INTERVAL_SECONDS"], unique=True
+    )
+    db.session.commit()
+    run_cleanup(current_app.config)
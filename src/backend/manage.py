@@ -9,6 +9,9 @@ Commands:
   revision             Create a new autogenerate revision (passes -m and --autogenerate)
   current              Show current revision
   history              Show revision history
+  backfill-user-stats  Recompute the user_stats counters from signups/reviews
+  worker               Run queued background jobs (see jobs.py)
+  cleanup              Archive inactive listings and purge old dead signups
 """
 import shlex
 import subprocess
@@ -72,6 +75,76 @@ def history():
     _run_alembic(f"-c {ALEMBIC_INI} history")
 
 
+@cli.command("backfill-user-stats")
+def backfill_user_stats():
+    """Recompute user_stats from the SignUp and Review tables."""
+    from app import create_app
+    from user_stats import backfill
+
+    with create_app().app_context():
+        count = backfill()
+    click.echo(f"Rebuilt stats for {count} users")
+
+
+@cli.command()
+@click.option("--once", is_flag=True, help="Exit once no job is due")
+@click.option("--batch", default=10, show_default=True, help="Jobs claimed at a time")
+@click.option(
+    "--visibility-timeout",
+    default=300,
+    show_default=True,
+    help="Seconds a claimed job stays hidden from other workers",
+)
+@click.option("--poll", default=1.0, show_default=True, help="Idle poll interval")
+def worker(once, batch, visibility_timeout, poll):
+    """Run background jobs until interrupted (SIGTERM/SIGINT finish the batch)."""
+    import signal
+    import threading
+
+    from app import create_app
+    from jobs import work
+
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+    with create_app().app_context():
+        count = work(
+            batch=batch,
+            visibility_timeout=visibility_timeout,
+            poll_interval=poll,
+            once=once,
+            stop=stop,
+        )
+    click.echo(f"Ran {count} jobs")
+
+
+@cli.command()
+@click.option(
+    "--schedule",
+    is_flag=True,
+    help="Queue the recurring cleanup job for the worker instead of running now",
+)
+def cleanup(schedule):
+    """Archive inactive listings and purge old cancelled/declined signups."""
+    from app import create_app
+    from jobs import enqueue
+    from maintenance import run_cleanup
+    from models import db
+
+    app = create_app()
+    with app.app_context():
+        if schedule:
+            enqueue("cleanup", unique=True)
+            db.session.commit()
+            click.echo("Cleanup job queued")
+            return
+        counts = run_cleanup(app.config)
+    click.echo(
+        f"Archived {counts['archived_listings']} listings, "
+        f"purged {counts['purged_signups']} signups"
+    )
+
+
 from models import User, Organization, Item, Listing, Review, UserValues  # noqa: E402
 
 
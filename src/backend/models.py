@@ -1,8 +1,33 @@
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash
 from datetime import datetime, timezone
+from sqlalchemy import event, or_
+from categories import LISTING_CATEGORIES
+from db_routing import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+
+def as_utc(value):
+    """Stored datetimes come back naive (UTC) from SQLite."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def dialect_insert(dialect_name):
+    """The ``insert`` with ``on_conflict_do_*`` for ``dialect_name``, or None.
+
+    PostgreSQL and SQLite have one; callers fall back to plain statements on
+    other dialects.
+    """
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
 
 
 class User(db.Model):
@@ -73,6 +98,56 @@ class Item(db.Model):
         }
 
 
+class Category(db.Model):
+    """Lookup table for listing categories (see `LISTING_CATEGORIES`)."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(80), unique=True, nullable=False)
+
+
+# Category names/ids rarely change, so they are cached per process instead of
+# joined or re-read on every request.
+_category_ids = {}  # lower-cased name -> id
+_category_names = {}  # id -> name
+
+
+@event.listens_for(Category.__table__, "after_create")
+def _seed_categories(table, connection, **kw):
+    connection.execute(
+        table.insert(),
+        [{"name": name} for name in LISTING_CATEGORIES],
+    )
+    _category_ids.clear()
+    _category_names.clear()
+
+
+def _load_categories():
+    if not _category_names:
+        for category in Category.query.all():
+            _category_ids[category.name.lower()] = category.id
+            _category_names[category.id] = category.name
+
+
+def category_id_for(name):
+    """Return the id of the category called `name` (case-insensitive), or None."""
+    if not name:
+        return None
+    _load_categories()
+    return _category_ids.get(name.lower())
+
+
+def category_name(category_id):
+    if category_id is None:
+        return None
+    _load_categories()
+    return _category_names.get(category_id)
+
+
+def category_names():
+    _load_categories()
+    return [_category_names[i] for i in sorted(_category_names)]
+
+
 class Listing(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(120), nullable=False)
@@ -80,7 +155,9 @@ class Listing(db.Model):
     location = db.Column(db.String(120), nullable=True)
     latitude = db.Column(db.Float, nullable=True)
     longitude = db.Column(db.Float, nullable=True)
-    category = db.Column(db.String(80), nullable=True)
+    category_id = db.Column(
+        db.Integer, db.ForeignKey("category.id"), nullable=True, index=True
+    )
     image_url = db.Column(db.String(240), nullable=True)
     owner_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
     owner = db.relationship("User")
@@ -91,6 +168,34 @@ class Listing(db.Model):
     created_at = db.Column(
         db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
     )
+    # When the opportunity takes place (UTC); both None for ongoing listings.
+    # A one-off event has ends_at == starts_at.
+    starts_at = db.Column(db.DateTime, nullable=True, index=True)
+    ends_at = db.Column(db.DateTime, nullable=True, index=True)
+    # Volunteer slots (None = unlimited) and how many signups hold one;
+    # see capacity.py.
+    capacity = db.Column(db.Integer, nullable=True)
+    filled = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    # Last waitlist position handed out on this listing.
+    waitlist_seq = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    @classmethod
+    def not_ended(cls, now=None):
+        """Condition for ongoing listings and events that have not ended."""
+        now = now or datetime.now(timezone.utc)
+        return or_(cls.ends_at.is_(None), cls.ends_at >= now)
+
+    @property
+    def category(self):
+        """Category name, resolved through the in-process category cache."""
+        return category_name(self.category_id)
+
+    @category.setter
+    def category(self, name):
+        category_id = category_id_for(name)
+        if name and category_id is None:
+            raise ValueError(f"unknown category: {name}")
+        self.category_id = category_id
 
     def to_dict(self):
         return {
@@ -105,6 +210,11 @@ class Listing(db.Model):
             "owner_id": self.owner_id,
             "organization_id": self.organization_id,
             "created_at": self.created_at.isoformat() if self.created_at else None,
+            # With their UTC offset, so clients do not read them as local time.
+            "starts_at": as_utc(self.starts_at).isoformat() if self.starts_at else None,
+            "ends_at": as_utc(self.ends_at).isoformat() if self.ends_at else None,
+            "capacity": self.capacity,
+            "filled": self.filled or 0,
         }
 
 
@@ -137,6 +247,10 @@ class Review(db.Model):
 
 
 class UserValues(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "value", name="uq_user_values_user_id_value"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     value = db.Column(db.String(50), nullable=False)
@@ -150,6 +264,14 @@ class Achievement(db.Model):
 
 
 class UserAchievement(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint(
+            "user_id",
+            "achievement_id",
+            name="uq_user_achievement_user_id_achievement_id",
+        ),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     achievement_id = db.Column(
@@ -160,13 +282,19 @@ class UserAchievement(db.Model):
 class SignUp(db.Model):
     """Track volunteer sign-ups for listings."""
 
+    __table_args__ = (
+        db.Index("ix_sign_up_listing_waitlist", "listing_id", "waitlist_position"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     listing_id = db.Column(db.Integer, db.ForeignKey("listing.id"), nullable=False)
     message = db.Column(db.String(500), nullable=True)
     status = db.Column(
         db.String(20), nullable=False, default="pending"
-    )  # pending, confirmed, cancelled
+    )  # pending, accepted, declined, cancelled, waitlisted
+    # Set while waitlisted; the lowest position is promoted first.
+    waitlist_position = db.Column(db.Integer, nullable=True)
     created_at = db.Column(
         db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
     )
@@ -180,5 +308,177 @@ class SignUp(db.Model):
             "listing_id": self.listing_id,
             "message": self.message,
             "status": self.status,
+            "waitlist_position": self.waitlist_position,
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
+
+
+class UserStats(db.Model):
+    """Per-user activity counters, kept in step with SignUp/Review writes.
+
+    Maintained by the flush hooks in `user_stats.py`; rebuild with
+    `python manage.py backfill-user-stats`.
+    """
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    signups = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    accepted_signups = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    reviews_written = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    five_star_reviews_received = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+
+    COUNTERS = (
+        "signups",
+        "accepted_signups",
+        "reviews_written",
+        "five_star_reviews_received",
+    )
+
+    def to_dict(self):
+        data = {"user_id": self.user_id}
+        data.update((name, getattr(self, name) or 0) for name in self.COUNTERS)
+        return data
+
+
+class ExternalEvent(db.Model):
+    """A categorized Google result, stored once per URL (see `federated_search.py`)."""
+
+    __tablename__ = "external_event"
+
+    id = db.Column(db.Integer, primary_key=True)
+    url_hash = db.Column(db.String(64), unique=True, nullable=False)  # sha256 hex
+    url = db.Column(db.Text, nullable=False)
+    title = db.Column(db.String(300), nullable=False, default="")
+    snippet = db.Column(db.Text, nullable=False, default="")
+    category = db.Column(db.String(64), nullable=True)
+    fetched_at = db.Column(
+        db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
+    )
+
+
+class ExternalSearch(db.Model):
+    """Which external events a normalized query returned, and when."""
+
+    __tablename__ = "external_search"
+
+    id = db.Column(db.Integer, primary_key=True)
+    query_hash = db.Column(db.String(64), unique=True, nullable=False)
+    query_text = db.Column(db.String(500), nullable=False)
+    url_hashes = db.Column(db.JSON, nullable=False, default=list)  # in result order
+    fetched_at = db.Column(
+        db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
+    )
+
+
+class Job(db.Model):
+    """A unit of background work; see `jobs.py`."""
+
+    __table_args__ = (
+        db.Index("ix_job_status_run_at", "status", "run_at"),
+        # At most one queued job per key; see `jobs.enqueue(unique=True)`.
+        db.Index(
+            "uq_job_queued_unique_key",
+            "unique_key",
+            unique=True,
+            sqlite_where=db.text("status = 'queued'"),
+            postgresql_where=db.text("status = 'queued'"),
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(64), nullable=False)
+    unique_key = db.Column(db.String(64), nullable=True)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    status = db.Column(
+        db.String(16), nullable=False, default="queued"
+    )  # queued, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(
+        db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
+    )
+    locked_until = db.Column(db.DateTime, nullable=True)
+    locked_by = db.Column(db.String(64), nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(
+        db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
+    )
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+
+class DataVersion(db.Model):
+    """Counters bumped with every committed write to a set of data.
+
+    Shared by all processes, so caches can key on the current version and
+    never serve results from before a write made elsewhere (see
+    ``listing_events.py``).
+    """
+
+    __tablename__ = "data_version"
+
+    name = db.Column(db.String(40), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+LISTINGS_VERSION = "listings"
+
+
+@event.listens_for(DataVersion.__table__, "after_create")
+def _seed_data_versions(table, connection, **kw):
+    connection.execute(table.insert(), [{"name": LISTINGS_VERSION, "version": 0}])
+
+
+# Archive tables: rows moved out of listing/sign_up/review by `maintenance.py`.
+# Each has every column of its source table (same ids) plus `archived_at`.
+
+
+class ListingArchive(db.Model):
+    __tablename__ = "listing_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(120), nullable=False)
+    description = db.Column(db.String(240), nullable=False)
+    location = db.Column(db.String(120), nullable=True)
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+    category_id = db.Column(db.Integer, nullable=True)
+    image_url = db.Column(db.String(240), nullable=True)
+    owner_id = db.Column(db.Integer, nullable=True, index=True)
+    organization_id = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    starts_at = db.Column(db.DateTime, nullable=True)
+    ends_at = db.Column(db.DateTime, nullable=True)
+    capacity = db.Column(db.Integer, nullable=True)
+    filled = db.Column(db.Integer, nullable=False, default=0)
+    waitlist_seq = db.Column(db.Integer, nullable=False, default=0)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+
+class SignUpArchive(db.Model):
+    __tablename__ = "sign_up_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    listing_id = db.Column(db.Integer, nullable=False)
+    message = db.Column(db.String(500), nullable=True)
+    status = db.Column(db.String(20), nullable=False)
+    waitlist_position = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+
+class ReviewArchive(db.Model):
+    __tablename__ = "review_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    rating = db.Column(db.Integer, nullable=False)
+    text = db.Column(db.String(240), nullable=True)
+    user_id = db.Column(db.Integer, nullable=True, index=True)
+    listing_id = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False)
@@ -0,0 +1,200 @@
+"""Rank listings for a user from an in-process inverted index.
+
+The index maps each user value (``categories.CATEGORIES``) to the listings
+that match it, with a weight: ``CATEGORY_WEIGHT`` when the listing is filed
+under the value's category (``VALUE_CATEGORIES``) plus ``KEYWORD_WEIGHT``
+when one of the value's keywords appears in its title or description. It
+also keeps listing ids per category, and of all listings, sorted by id.
+
+A user's score for a listing is the sum of the postings for their values
+plus ``HISTORY_WEIGHT`` per active signup (up to ``HISTORY_CAP``) in the
+listing's category. Within a category the boost is the same for every
+listing and ties rank the newest first, so only the newest ``k``
+unexcluded listings of each history category can make the top ``k``; the
+walk down the category's sorted ids stops there. Only those and the
+postings of the user's own values are scored, and the top K come from
+``heapq.nlargest``, so a request never scores the whole listing table.
+
+The index is built on first use. Committed listing writes mark the listing
+stale (see ``listing_events``) and it is re-read on the next lookup; a full
+rebuild every ``max_age`` seconds (default 5 minutes) picks up writes made by
+other worker processes and drops events that have ended.
+"""
+
+import heapq
+from bisect import bisect_left, insort
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from sqlalchemy import event
+
+from categories import VALUE_CATEGORIES, VALUE_KEYWORDS
+from listing_events import listing_changed
+from models import Listing, category_id_for
+
+CATEGORY_WEIGHT = 2.0
+KEYWORD_WEIGHT = 1.0
+HISTORY_WEIGHT = 0.5
+HISTORY_CAP = 4
+
+_WORD = re.compile(r"[a-z]+")
+
+
+def listing_weights(listing):
+    """Return ``{value: weight}`` for the values ``listing`` matches."""
+    words = set(_WORD.findall(f"{listing.title} {listing.description}".lower()))
+    weights = {}
+    for value, keywords in VALUE_KEYWORDS.items():
+        weight = 0.0
+        category = VALUE_CATEGORIES.get(value)
+        if category and listing.category_id == category_id_for(category):
+            weight += CATEGORY_WEIGHT
+        if words.intersection(keywords):
+            weight += KEYWORD_WEIGHT
+        if weight:
+            weights[value] = weight
+    return weights
+
+
+class RecommendationIndex:
+    """Inverted index of value -> {listing id: weight}."""
+
+    def __init__(self, max_age=300.0):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self._postings = defaultdict(dict)
+        self._by_category = defaultdict(list)  # category id -> sorted ids
+        self._ids = []  # every indexed listing id, sorted
+        self._by_owner = defaultdict(set)
+        self._listings = {}  # listing id -> (value weights, category id, owner id)
+        self._stale = set()
+        self._built_at = None
+
+    def clear(self):
+        with self._lock:
+            self.reset()
+
+    def invalidate(self, listing_ids):
+        with self._lock:
+            self._stale.update(listing_ids)
+
+    def _add(self, listing):
+        weights = listing_weights(listing)
+        for value, weight in weights.items():
+            self._postings[value][listing.id] = weight
+        insort(self._by_category[listing.category_id], listing.id)
+        insort(self._ids, listing.id)
+        self._by_owner[listing.owner_id].add(listing.id)
+        self._listings[listing.id] = (weights, listing.category_id, listing.owner_id)
+
+    def _remove(self, listing_id):
+        entry = self._listings.pop(listing_id, None)
+        if entry is None:
+            return
+        weights, category_id, owner_id = entry
+        for value in weights:
+            self._postings[value].pop(listing_id, None)
+        _discard(self._by_category[category_id], listing_id)
+        _discard(self._ids, listing_id)
+        self._by_owner[owner_id].discard(listing_id)
+
+    def refresh(self):
+        """Rebuild when expired, otherwise re-read only the stale listings."""
+        with self._lock:
+            now = time.monotonic()
+            if self._built_at is None or now - self._built_at > self.max_age:
+                self.reset()
+                # In id order, so every insort appends.
+                listings = Listing.query.filter(Listing.not_ended())
+                for listing in listings.order_by(Listing.id):
+                    self._add(listing)
+                self._built_at = now
+            elif self._stale:
+                stale, self._stale = self._stale, set()
+                for listing_id in stale:
+                    self._remove(listing_id)
+                fresh = Listing.query.filter(Listing.id.in_(stale), Listing.not_ended())
+                for listing in fresh:
+                    self._add(listing)
+
+    def recommend(self, values, history=(), exclude=(), user_id=None, k=10):
+        """Return up to ``k`` ``(listing_id, score)`` pairs, best first.
+
+        ``history`` holds the category ids of the user's active signups;
+        ``exclude`` the listing ids that should not be suggested, in addition
+        to the listings ``user_id`` owns. Slots left after the scored listings
+        are filled with the newest listings.
+        """
+        self.refresh()
+        exclude = set(exclude)
+        with self._lock:
+            if user_id is not None:
+                exclude.update(self._by_owner.get(user_id, ()))
+
+            scores = defaultdict(float)
+            for value in set(values):
+                for listing_id, weight in self._postings.get(value, {}).items():
+                    scores[listing_id] += weight
+            boosts = {
+                category_id: HISTORY_WEIGHT * min(count, HISTORY_CAP)
+                for category_id, count in Counter(history).items()
+                if category_id is not None
+            }
+            for listing_id in scores:
+                scores[listing_id] += boosts.get(self._listings[listing_id][1], 0.0)
+            # Listings without postings only score their category's boost.
+            scored = exclude.union(scores)
+            for category_id, boost in boosts.items():
+                for listing_id in _newest(
+                    self._by_category.get(category_id, ()), k, scored
+                ):
+                    scores[listing_id] = boost
+
+            ranked = heapq.nlargest(
+                k,
+                (
+                    (score, listing_id)
+                    for listing_id, score in scores.items()
+                    if listing_id not in exclude
+                ),
+            )
+            if len(ranked) < k:
+                taken = exclude.union(listing_id for _, listing_id in ranked)
+                newest = _newest(self._ids, k - len(ranked), taken)
+                ranked.extend((0.0, listing_id) for listing_id in newest)
+        return [(listing_id, score) for score, listing_id in ranked]
+
+
+def _discard(ids, listing_id):
+    i = bisect_left(ids, listing_id)
+    if i < len(ids) and ids[i] == listing_id:
+        del ids[i]
+
+
+def _newest(ids, k, skip):
+    """Up to ``k`` of the sorted ``ids``, newest first, leaving out ``skip``."""
+    found = []
+    for listing_id in reversed(ids):
+        if len(found) == k:
+            break
+        if listing_id not in skip:
+            found.append(listing_id)
+    return found
+
+
+index = RecommendationIndex()
+
+
+@listing_changed.connect
+def _on_listing_changed(sender, changes):
+    index.invalidate(changes)
+
+
+@event.listens_for(Listing.__table__, "after_create")
+def _reset_index(table, connection, **kw):
+    index.clear()
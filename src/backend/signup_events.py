@@ -0,0 +1,321 @@
+"""Push signup changes to clients over Server-Sent Events.
+
+Signups created or updated by a flush are collected on the session and
+published once the transaction commits (as in ``listing_events.py``), so
+streams never see rolled-back writes. Each change goes to two channels:
+``listing:<id>`` for the listing's owner and ``user:<id>`` for the
+volunteer. Waitlist promotions and cleanup jobs are covered too, since they
+go through the same flushes.
+
+``Broker`` fans messages out to in-process subscribers, each with a
+bounded queue. A subscriber that falls ``SSE_QUEUE_SIZE`` messages behind
+is dropped; its stream ends and the browser's ``EventSource`` reconnects.
+With ``REDIS_URL`` set (and the optional ``redis`` package installed),
+``publish`` goes through Redis pub/sub and one listener thread per worker
+relays the messages to that worker's subscribers. A signup handled by one
+gunicorn worker then reaches the streams held by the others.
+
+Streams send a keepalive comment every ``SSE_KEEPALIVE_SECONDS`` and end
+after ``SSE_MAX_SECONDS`` (the client reconnects), so a stream does not
+hold a worker thread forever. Streams hold no database connection, but
+each one does hold a thread, so the web process must run threaded workers
+(``gunicorn -k gthread``, see the Procfile) with ``--timeout`` above
+``SSE_MAX_SECONDS``. At most ``SSE_MAX_STREAMS`` streams are open per
+worker; past that, a new stream gets only a longer ``retry:`` and ends at
+once, so the threads stay free for ordinary requests. (A ``503`` would not
+do: ``EventSource`` gives up for good on any error status.)
+
+A stream subscribes before its response is returned, so nothing
+published between the request and the first read of the body is lost.
+Every event carries an ``id:`` (microseconds since the epoch, increasing
+within a worker and assigned by the publishing worker, so ids from
+different workers interleave in time order). The broker keeps the last
+``SSE_REPLAY_SIZE`` events; a reconnecting ``EventSource`` sends the last
+id it saw as ``Last-Event-ID`` and first gets the newer events for its
+channels from that buffer. If events it may have missed are no longer
+buffered (or predate this worker), the stream starts with an ``event:
+reset`` so the client reloads its signups instead.
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+from flask import Response, current_app, has_app_context, request
+from sqlalchemy import event
+
+from db_routing import RoutingSession
+
+log = logging.getLogger(__name__)
+
+_PENDING_KEY = "signup_events"
+RETRY_MS = 3000
+FULL_RETRY_MS = 15000
+
+
+class TooManyStreams(Exception):
+    """Raised by ``Broker.subscribe`` when ``max_subscribers`` are open."""
+
+
+def _event_id(after=0):
+    return max(after + 1, time.time_ns() // 1000)
+
+
+class Subscription:
+    """A subscriber's queue of ``(event id, message)`` from a set of channels."""
+
+    def __init__(self, broker, channels, maxsize):
+        self.broker = broker
+        self.channels = tuple(channels)
+        self.overflowed = False
+        self.missed = False  # replay could not cover everything since its id
+        self._queue = queue.Queue(maxsize)
+
+    def put(self, event_id, message):
+        try:
+            self._queue.put_nowait((event_id, message))
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        """Next ``(event id, message)``, or None after ``timeout`` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    """Channel-based pub/sub for this worker, optionally relayed via Redis."""
+
+    def __init__(
+        self,
+        redis_client=None,
+        prefix="tapin:",
+        queue_size=100,
+        max_subscribers=None,
+        replay_size=1000,
+    ):
+        self.redis = redis_client
+        self.prefix = prefix
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._channels = {}
+        self._subscriptions = set()
+        self._recent = deque(maxlen=replay_size)  # (event id, channel, message)
+        # Events up to this id may be missing from _recent: published before
+        # this broker started, or pushed out since.
+        self._last_id = self._replay_floor = _event_id()
+        self._lock = threading.Lock()
+        self._listener = None
+
+    def subscribe(self, channels, last_event_id=None):
+        """Subscribe to ``channels``.
+
+        With ``last_event_id``, buffered events after it are queued first.
+        """
+        subscription = Subscription(self, channels, self.queue_size)
+        with self._lock:
+            if (
+                self.max_subscribers is not None
+                and len(self._subscriptions) >= self.max_subscribers
+            ):
+                raise TooManyStreams(f"{self.max_subscribers} streams already open")
+            self._subscriptions.add(subscription)
+            for channel in subscription.channels:
+                self._channels.setdefault(channel, set()).add(subscription)
+            # Under the lock that deliver() takes too: every event is either
+            # replayed here or delivered live, never both or neither.
+            if last_event_id is not None:
+                subscription.missed = last_event_id < self._replay_floor
+                for event_id, channel, message in self._recent:
+                    if event_id > last_event_id and channel in subscription.channels:
+                        subscription.put(event_id, message)
+        if self.redis is not None:
+            self._start_listener()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            for channel in subscription.channels:
+                subscribers = self._channels.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._channels[channel]
+
+    def publish(self, channel, message):
+        """Send ``message`` to ``channel``'s subscribers; returns its event id."""
+        with self._lock:
+            event_id = self._last_id = _event_id(self._last_id)
+        if self.redis is not None:
+            try:
+                self.redis.publish(self.prefix + channel, f"{event_id} {message}")
+                return event_id
+            except Exception:
+                log.warning("redis publish failed; delivering locally", exc_info=True)
+        self.deliver(channel, event_id, message)
+        return event_id
+
+    def deliver(self, channel, event_id, message):
+        """Hand ``message`` to this worker's subscribers of ``channel``."""
+        with self._lock:
+            if len(self._recent) == self._recent.maxlen:
+                self._replay_floor = max(self._replay_floor, self._recent[0][0])
+            self._recent.append((event_id, channel, message))
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(event_id, message)
+
+    def status(self):
+        with self._lock:
+            subscribers = len(self._subscriptions)
+        return {
+            "backend": "redis" if self.redis is not None else "memory",
+            "subscribers": subscribers,
+            "max_subscribers": self.max_subscribers,
+        }
+
+    def _start_listener(self):
+        with self._lock:
+            if self._listener is not None:
+                return
+            self._listener = threading.Thread(
+                target=self._listen, name="signup-events-redis", daemon=True
+            )
+        self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(self.prefix + "*")
+                for item in pubsub.listen():
+                    if item["type"] != "pmessage":
+                        continue
+                    channel = _text(item["channel"])[len(self.prefix) :]
+                    event_id, message = _text(item["data"]).split(" ", 1)
+                    self.deliver(channel, int(event_id), message)
+            except Exception:
+                log.warning("redis listener failed; reconnecting", exc_info=True)
+                time.sleep(1)
+
+
+def _text(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def init_signup_events(app):
+    """Attach the signup event broker to ``app``."""
+    redis_client = None
+    redis_url = app.config.get("REDIS_URL")
+    if redis_url:
+        try:
+            import redis
+        except ImportError:
+            log.warning(
+                "REDIS_URL is set but redis is not installed; streams stay per worker"
+            )
+        else:
+            redis_client = redis.Redis.from_url(redis_url)
+    broker = Broker(
+        redis_client,
+        queue_size=app.config["SSE_QUEUE_SIZE"],
+        max_subscribers=app.config["SSE_MAX_STREAMS"],
+        replay_size=app.config["SSE_REPLAY_SIZE"],
+    )
+    app.extensions["signup_events"] = broker
+    return broker
+
+
+def current_broker():
+    return current_app.extensions["signup_events"]
+
+
+def _stream(subscription, keepalive, max_seconds):
+    deadline = time.monotonic() + max_seconds
+    yield f"retry: {RETRY_MS}\n\n"
+    if subscription.missed:
+        yield "event: reset\ndata: {}\n\n"
+    while not subscription.overflowed:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        item = subscription.get(min(keepalive, remaining))
+        if item is None:
+            yield ": keepalive\n\n"
+        else:
+            event_id, message = item
+            yield f"id: {event_id}\nevent: signup\ndata: {message}\n\n"
+
+
+def _last_event_id():
+    try:
+        return int(request.headers["Last-Event-ID"])
+    except (KeyError, ValueError):
+        return None
+
+
+def stream_response(channels):
+    """A ``text/event-stream`` response carrying ``channels``' signup events."""
+    config = current_app.config
+    try:
+        subscription = current_broker().subscribe(channels, _last_event_id())
+    except TooManyStreams:
+        # Ends right away; the browser reconnects after the retry delay.
+        return _event_stream_response(f"retry: {FULL_RETRY_MS}\n\n")
+    body = _stream(
+        subscription, config["SSE_KEEPALIVE_SECONDS"], config["SSE_MAX_SECONDS"]
+    )
+    response = _event_stream_response(body)
+    # Runs even if the body is never read (a generator's ``finally`` would not).
+    response.call_on_close(subscription.close)
+    return response
+
+
+def _event_stream_response(body):
+    return Response(
+        body,
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _collect_signups(session, flush_context):
+    from models import SignUp
+
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    for obj in session.new:
+        if isinstance(obj, SignUp):
+            pending[obj.id] = ("created", obj.to_dict())
+    for obj in session.dirty:
+        if isinstance(obj, SignUp) and session.is_modified(obj):
+            kind = pending.get(obj.id, ("updated",))[0]
+            pending[obj.id] = (kind, obj.to_dict())
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _publish_signups(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending or not has_app_context():
+        return
+    events = current_app.extensions.get("signup_events")
+    if events is None:
+        return
+    for kind, signup in pending.values():
+        message = json.dumps({"type": kind, "signup": signup})
+        events.publish(f"listing:{signup['listing_id']}", message)
+        events.publish(f"user:{signup['user_id']}", message)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard_signups(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,145 @@
+"""Serve the Vite build (``dist/``) from an in-memory manifest.
+
+The directory is scanned once at startup instead of stat-ing the disk on
+every request. For each file the manifest keeps its MIME type, an ETag and
+any precompressed siblings (``app.js.br``, ``app.js.gz``). Responses then
+follow these rules:
+
+* Content-hashed bundles (``assets/index-CglF_4OK.js``) are immutable and
+  cached for a year.
+* ``index.html`` and other unhashed files are ``no-cache``: browsers
+  revalidate with the ETag and get a 304 while it is unchanged.
+* A ``.br``/``.gz`` variant is sent when the client accepts that encoding.
+* When ``tools/compress_assets.py`` has written ``.static-manifest.json``
+  into the build, its strong content-hash ETags are used for files whose
+  size and mtime still match it; otherwise the ETag is derived from size
+  and mtime.
+* Unknown paths fall back to ``index.html`` so the SPA router can handle
+  them. Missing files under ``assets/`` are a 404, so a stale bundle URL
+  never receives HTML.
+"""
+
+import json
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+
+from flask import abort, send_file
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+HASHED_NAME = re.compile(r"-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+ASSETS_PREFIX = "assets/"
+# Written by tools/compress_assets.py
+MANIFEST_NAME = ".static-manifest.json"
+# Preferred first when the client accepts several.
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+@dataclass
+class Asset:
+    path: str
+    mimetype: str
+    etag: str
+    immutable: bool
+    encoded: dict = field(default_factory=dict)  # encoding -> file path
+
+
+def _weak_etag(stat):
+    return f"{stat.st_size:x}-{int(stat.st_mtime_ns):x}"
+
+
+def is_hashed(relpath):
+    return relpath.startswith(ASSETS_PREFIX) and bool(
+        HASHED_NAME.search(os.path.basename(relpath))
+    )
+
+
+class StaticAssets:
+    """Manifest of a build directory and the responses served from it."""
+
+    def __init__(self, root, index="index.html"):
+        self.root = os.path.abspath(root)
+        self.index = index
+        self.assets = {}
+        self.scan()
+
+    def _build_manifest(self):
+        try:
+            with open(os.path.join(self.root, MANIFEST_NAME)) as fh:
+                return json.load(fh).get("files", {})
+        except (OSError, ValueError):
+            return {}
+
+    def scan(self):
+        """(Re)build the manifest from the files currently on disk."""
+        assets = {}
+        built = self._build_manifest()
+        suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename == MANIFEST_NAME or filename.endswith(suffixes):
+                    continue
+                full = os.path.join(dirpath, filename)
+                relpath = os.path.relpath(full, self.root).replace(os.sep, "/")
+                mimetype = mimetypes.guess_type(filename)[0]
+                stat = os.stat(full)
+                entry = built.get(relpath)
+                if (
+                    entry
+                    and entry.get("size") == stat.st_size
+                    and entry.get("mtime_ns") == stat.st_mtime_ns
+                ):
+                    etag = entry["etag"]
+                else:
+                    etag = _weak_etag(stat)
+                asset = Asset(
+                    path=full,
+                    mimetype=mimetype or "application/octet-stream",
+                    etag=etag,
+                    immutable=is_hashed(relpath),
+                )
+                for encoding, suffix in ENCODINGS:
+                    if os.path.isfile(full + suffix):
+                        asset.encoded[encoding] = full + suffix
+                assets[relpath] = asset
+        self.assets = assets
+
+    def lookup(self, path):
+        """Return the asset for ``path``, falling back to the SPA index."""
+        asset = self.assets.get(path)
+        if asset is None and not path.startswith(ASSETS_PREFIX):
+            asset = self.assets.get(self.index)
+        return asset
+
+    def serve(self, path, request):
+        asset = self.lookup(path)
+        if asset is None:
+            abort(404)
+
+        accepted = request.accept_encodings
+        filename, etag, encoding = asset.path, asset.etag, None
+        for name, _ in ENCODINGS:
+            if name in asset.encoded and accepted[name]:
+                filename, encoding = asset.encoded[name], name
+                etag = f"{asset.etag}-{name}"
+                break
+
+        response = send_file(
+            filename,
+            mimetype=asset.mimetype,
+            etag=etag,
+            conditional=True,
+            max_age=None,
+        )
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if asset.encoded:
+            response.vary.add("Accept-Encoding")
+        if asset.immutable:
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response
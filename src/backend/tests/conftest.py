@@ -10,6 +10,7 @@ import pytest
 from uuid import uuid4
 from werkzeug.security import generate_password_hash
 from app import app, db
+from auth import token_for
 from models import User
 
 
@@ -49,6 +50,16 @@ def create_user():
     return _create
 
 
+@pytest.fixture
+def auth_headers():
+    """Return a function giving the Authorization header for a user id."""
+
+    def _headers(user_id):
+        return {"Authorization": f"Bearer {token_for(user_id)}"}
+
+    return _headers
+
+
 @pytest.fixture
 def client(test_client):
     """Alias for tests that expect a `client` fixture name."""
@@ -0,0 +1,111 @@
+"""Tests for the event-driven achievement engine."""
+
+from models import Achievement, SignUp, UserAchievement, db
+
+
+def _engine(client):
+    return client.application.extensions["achievements"]
+
+
+def _names(user_id):
+    rows = (
+        db.session.query(Achievement.name)
+        .join(UserAchievement, UserAchievement.achievement_id == Achievement.id)
+        .filter(UserAchievement.user_id == user_id)
+    )
+    return {name for (name,) in rows}
+
+
+def _listing(client, headers, title):
+    resp = client.post(
+        "/listings", json={"title": title, "description": "D"}, headers=headers
+    )
+    return resp.get_json()["id"]
+
+
+def _signup_id(user_id, listing_id):
+    return SignUp.query.filter_by(user_id=user_id, listing_id=listing_id).one().id
+
+
+def _accepted_signup(client, owner, volunteer, listing_id):
+    resp = client.post(f"/listings/{listing_id}/signup", json={}, headers=volunteer)
+    signup_id = resp.get_json()["id"]
+    resp = client.put(
+        f"/signups/{signup_id}", json={"status": "accepted"}, headers=owner
+    )
+    assert resp.status_code == 200
+    return signup_id
+
+
+def test_accepted_signups_award_in_batches(client, create_user, auth_headers):
+    engine = _engine(client)
+    engine.reset()
+    owner = auth_headers(create_user("ach-owner@x.com"))
+    volunteer = create_user("ach-volunteer@x.com")
+
+    listing_ids = [_listing(client, owner, f"Shift {i}") for i in range(5)]
+    resp = client.post(
+        f"/listings/{listing_ids[0]}/signup", json={}, headers=auth_headers(volunteer)
+    )
+    assert resp.status_code == 201
+    # Events are queued, not evaluated inline; a pending signup awards nothing.
+    assert engine.queue.qsize() == 1
+    assert engine.drain() == []
+
+    _accepted_signup(client, owner, auth_headers(volunteer), listing_ids[1])
+    assert engine.drain() == [(volunteer, "First Steps")]
+    assert _names(volunteer) == {"First Steps"}
+
+    for listing_id in listing_ids[2:]:
+        _accepted_signup(client, owner, auth_headers(volunteer), listing_id)
+    client.put(
+        f"/signups/{_signup_id(volunteer, listing_ids[0])}",
+        json={"status": "accepted"},
+        headers=owner,
+    )
+    assert engine.drain() == [(volunteer, "Helping Hand")]
+    assert _names(volunteer) == {"First Steps", "Helping Hand"}
+
+
+def test_cancelled_signup_does_not_count(client, create_user, auth_headers):
+    engine = _engine(client)
+    engine.reset()
+    owner = auth_headers(create_user("ach-owner2@x.com"))
+    volunteer = create_user("ach-volunteer2@x.com")
+    listing_id = _listing(client, owner, "Cancelled shift")
+    signup_id = _accepted_signup(client, owner, auth_headers(volunteer), listing_id)
+    client.put(
+        f"/signups/{signup_id}",
+        json={"status": "cancelled"},
+        headers=auth_headers(volunteer),
+    )
+    # Accepted then cancelled within one batch: the counter ends at zero.
+    assert engine.drain() == []
+    assert _names(volunteer) == set()
+
+
+def test_five_star_reviews_award_listing_owner(client, create_user, auth_headers):
+    engine = _engine(client)
+    engine.reset()
+    owner_id = create_user("ach-owner3@x.com")
+    listing_id = _listing(client, auth_headers(owner_id), "Reviewed event")
+
+    reviewer = create_user("ach-reviewer@x.com")
+    resp = client.post(
+        f"/listings/{listing_id}/reviews",
+        json={"rating": 5},
+        headers=auth_headers(reviewer),
+    )
+    assert resp.status_code == 201
+    assert engine.drain() == [(owner_id, "Good Samaritan")]
+
+    # Already awarded users are not awarded again, even after a cold start.
+    engine.reset()
+    other = create_user("ach-reviewer2@x.com")
+    client.post(
+        f"/listings/{listing_id}/reviews",
+        json={"rating": 5},
+        headers=auth_headers(other),
+    )
+    assert engine.drain() == []
+    assert _names(owner_id) == {"Good Samaritan"}
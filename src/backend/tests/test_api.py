@@ -9,7 +9,12 @@ def test_health(client):
     assert resp.status_code == 200
     data = resp.get_json()
     assert data["status"] == "ok"
-    assert "components" in data
+    # An alias of the cached readiness probe; no database URI in the output.
+    assert (
+        data["components"]["database"]
+        == client.get("/api/health/ready").get_json()["components"]["database"]
+    )
+    assert "uri_prefix" not in data["components"]["database"]
 
 
 def test_list_items(client):
@@ -0,0 +1,41 @@
+"""Tests for the application factory and lazy imports."""
+
+import os
+import subprocess
+import sys
+
+from app import create_app, db
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def test_create_app_applies_config_overrides():
+    app = create_app({"SECRET_KEY": "factory-secret", "TESTING": True})
+    assert app.config["SECRET_KEY"] == "factory-secret"
+    assert app.config["SQLALCHEMY_ENGINE_OPTIONS"] == {}
+    assert "api.get_listings" in app.view_functions
+
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+        assert client.get("/api/health/live").status_code == 200
+        assert client.get("/listings").get_json() == []
+        db.drop_all()
+
+
+def test_import_is_lazy():
+    code = (
+        "import sys, app; "
+        "heavy = ['googleapiclient', 'smtplib', 'flask_migrate', 'dotenv']; "
+        "print([m for m in heavy if m in sys.modules], app._default_app)"
+    )
+    env = dict(os.environ, TESTING="1")
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert out.strip() == "[] None"
@@ -0,0 +1,124 @@
+"""Tests for the ASGI entry point."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import federated_search
+import google_search
+from app import create_app
+from asgi import ThreadPoolWsgiToAsgi, asgi_app
+from models import db
+
+
+@pytest.fixture
+def concurrent_app(tmp_path):
+    """ASGI app on a file-backed database; requests run on separate connections.
+
+    The shared in-memory database hands every thread the same connection, so
+    overlapping requests would trip over each other's transactions.
+    """
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'asgi.db'}",
+            "SQLALCHEMY_ENGINE_OPTIONS": {
+                "connect_args": {"timeout": 30},
+                "pool_size": 10,
+            },
+        }
+    )
+    with app.app_context():
+        db.create_all()
+    return ThreadPoolWsgiToAsgi(app)
+
+
+def _get(path, query_string="", application=asgi_app):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query_string.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"testserver")],
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 1234),
+    }
+    response = {"body": b""}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        else:
+            response["body"] += message.get("body", b"")
+
+    async def run():
+        await application(scope, receive, send)
+        return response
+
+    return run()
+
+
+def test_asgi_serves_wsgi_routes(client):
+    response = asyncio.run(_get("/api/health/live"))
+    assert response["status"] == 200
+    assert b'"status"' in response["body"]
+
+
+def test_asgi_overlaps_slow_upstream_calls(concurrent_app, monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    monkeypatch.setenv("CUSTOM_SEARCH_ENGINE_ID", "test")
+
+    def slow_search(query, api_key, search_engine_id, num=10, timeout=None):
+        time.sleep(0.2)
+        return [{"title": query, "snippet": "", "link": "https://example.com"}]
+
+    monkeypatch.setattr(google_search, "_execute_search", slow_search)
+
+    async def burst():
+        return await asyncio.gather(
+            *(
+                _get("/api/search/events", f"q=park{i}", concurrent_app)
+                for i in range(10)
+            )
+        )
+
+    started = time.perf_counter()
+    responses = asyncio.run(burst())
+    elapsed = time.perf_counter() - started
+    assert all(r["status"] == 200 for r in responses)
+    # Ten 200ms upstream calls in well under the 2s a serial worker needs.
+    assert elapsed < 1.0
+
+
+def test_asgi_overlaps_blocking_database_work(concurrent_app, monkeypatch):
+    """Slow database calls in a request must not stall the others."""
+    threads = set()
+
+    def slow_local_results(query, category=None, limit=10):
+        threads.add(threading.current_thread().name)
+        time.sleep(0.2)  # stands in for a slow query on the request's session
+        return [{"source": "tapin", "title": query, "link": None}] * limit
+
+    monkeypatch.setattr(federated_search, "local_results", slow_local_results)
+
+    async def burst():
+        return await asyncio.gather(
+            *(_get("/api/search/events", f"q=db{i}", concurrent_app) for i in range(10))
+        )
+
+    started = time.perf_counter()
+    responses = asyncio.run(burst())
+    elapsed = time.perf_counter() - started
+    assert all(r["status"] == 200 for r in responses)
+    assert elapsed < 1.0
+    assert "MainThread" not in threads and len(threads) > 1
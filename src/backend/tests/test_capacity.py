@@ -0,0 +1,144 @@
+"""Tests for listing capacity and atomic slot reservation."""
+
+import threading
+
+from werkzeug.security import generate_password_hash
+
+from app import create_app, db
+from models import Listing, SignUp, User
+
+
+def _listing(client, headers, **fields):
+    resp = client.post(
+        "/listings",
+        json={"title": "Capacity", "description": "D", **fields},
+        headers=headers,
+    )
+    assert resp.status_code == 201, resp.get_json()
+    return resp.get_json()
+
+
+def test_capacity_is_validated(client, create_user, auth_headers):
+    owner = create_user("capacity-owner@x.com")
+    for capacity in (-1, "ten", 2.5, True):
+        resp = client.post(
+            "/listings",
+            json={"title": "Bad", "description": "D", "capacity": capacity},
+            headers=auth_headers(owner),
+        )
+        assert resp.status_code == 400
+    listing = _listing(client, auth_headers(owner))
+    assert (listing["capacity"], listing["filled"]) == (None, 0)
+    resp = client.put(
+        f"/listings/{listing['id']}", json={"capacity": 3}, headers=auth_headers(owner)
+    )
+    assert resp.get_json()["capacity"] == 3
+
+
+def test_slots_are_taken_and_given_back(client, create_user, auth_headers):
+    owner = create_user("capacity-owner@x.com")
+    listing_id = _listing(client, auth_headers(owner), capacity=2)["id"]
+    volunteers = [create_user(f"capacity-v{i}@x.com") for i in range(3)]
+
+    signups = []
+    for volunteer in volunteers[:2]:
+        resp = client.post(
+            f"/listings/{listing_id}/signup", json={}, headers=auth_headers(volunteer)
+        )
+        assert resp.status_code == 201
+        signups.append(resp.get_json()["id"])
+    assert client.get(f"/listings/{listing_id}").get_json()["filled"] == 2
+
+    # Declining frees the slot; accepting a declined signup needs one again.
+    resp = client.put(
+        f"/signups/{signups[0]}",
+        json={"status": "declined"},
+        headers=auth_headers(owner),
+    )
+    assert resp.status_code == 200
+    resp = client.post(
+        f"/listings/{listing_id}/signup", json={}, headers=auth_headers(volunteers[2])
+    )
+    assert resp.get_json()["status"] == "pending"
+    resp = client.put(
+        f"/signups/{signups[0]}",
+        json={"status": "accepted"},
+        headers=auth_headers(owner),
+    )
+    assert resp.status_code == 409
+    assert db.session.get(SignUp, signups[0]).status == "declined"
+
+    resp = client.put(
+        f"/signups/{signups[1]}",
+        json={"status": "cancelled"},
+        headers=auth_headers(volunteers[1]),
+    )
+    assert resp.status_code == 200
+    resp = client.put(
+        f"/signups/{signups[0]}",
+        json={"status": "accepted"},
+        headers=auth_headers(owner),
+    )
+    assert resp.status_code == 200
+    assert client.get(f"/listings/{listing_id}").get_json()["filled"] == 2
+
+
+def test_concurrent_signups_never_overfill(tmp_path, auth_headers):
+    """Many volunteers hit a small listing at once on a file-backed database."""
+    capacity, volunteers = 5, 24
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'capacity.db'}",
+            "SQLALCHEMY_ENGINE_OPTIONS": {
+                "connect_args": {"timeout": 30},
+                "pool_size": volunteers,
+            },
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        users = [
+            User(email=f"rush{i}@x.com", password_hash=generate_password_hash("pw"))
+            for i in range(volunteers)
+        ]
+        listing = Listing(title="Popular", description="D", capacity=capacity)
+        db.session.add_all(users + [listing])
+        db.session.commit()
+        listing_id = listing.id
+        headers = [auth_headers(user.id) for user in users]
+
+    start = threading.Barrier(volunteers)
+    statuses = []
+
+    def sign_up(user_headers):
+        client = app.test_client()
+        start.wait()
+        resp = client.post(
+            f"/listings/{listing_id}/signup", json={}, headers=user_headers
+        )
+        statuses.append(resp.status_code)
+
+    threads = [threading.Thread(target=sign_up, args=(h,)) for h in headers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses == [201] * volunteers
+    with app.app_context():
+        listing = db.session.get(Listing, listing_id)
+        assert (listing.filled, listing.waitlist_seq) == (
+            capacity,
+            volunteers - capacity,
+        )
+        rows = db.session.execute(
+            db.select(SignUp.status, SignUp.waitlist_position).where(
+                SignUp.listing_id == listing_id
+            )
+        ).all()
+        assert [status for status, _ in rows].count("pending") == capacity
+        positions = sorted(p for _, p in rows if p is not None)
+        assert positions == list(range(1, volunteers - capacity + 1))
+        db.session.remove()
+        db.engine.dispose()
@@ -0,0 +1,68 @@
+"""Tests for the category lookup table and the ?category= listing filter."""
+
+import pytest
+
+from auth import token_for
+from categories import LISTING_CATEGORIES
+from models import Category, Listing, category_id_for, category_names, db
+
+
+def _create(client, headers, title, category=None):
+    body = {"title": title, "description": "D"}
+    if category:
+        body["category"] = category
+    return client.post("/listings", json=body, headers=headers)
+
+
+def test_categories_are_seeded_in_order(client):
+    assert category_names() == LISTING_CATEGORIES
+    assert Category.query.count() == len(LISTING_CATEGORIES)
+    assert category_id_for("health") == category_id_for("Health")
+    assert category_id_for("Nope") is None
+
+
+def test_listing_stores_category_id(client, create_user):
+    headers = {"Authorization": f"Bearer {token_for(create_user('cat1@x.com'))}"}
+    resp = _create(client, headers, "Shelter walk", "Animals")
+    assert resp.status_code == 201
+    assert resp.get_json()["category"] == "Animals"
+
+    listing = db.session.get(Listing, resp.get_json()["id"])
+    assert listing.category_id == category_id_for("Animals")
+
+    resp = client.put(
+        f"/listings/{listing.id}", json={"category": "Education"}, headers=headers
+    )
+    assert resp.status_code == 200
+    assert resp.get_json()["category"] == "Education"
+
+
+def test_invalid_category_is_rejected(client, create_user):
+    headers = {"Authorization": f"Bearer {token_for(create_user('cat2@x.com'))}"}
+    assert _create(client, headers, "Bad", "Technology").status_code == 400
+    assert client.get("/listings?category=Technology").status_code == 400
+    with pytest.raises(ValueError):
+        Listing(title="x", category="Technology")
+
+
+def test_filter_by_category(client, create_user):
+    headers = {"Authorization": f"Bearer {token_for(create_user('cat3@x.com'))}"}
+    _create(client, headers, "Tree planting", "Environment")
+    _create(client, headers, "Blood drive", "Health")
+    _create(client, headers, "Uncategorized")
+
+    titles = {
+        row["title"] for row in client.get("/listings?category=health").get_json()
+    }
+    assert "Blood drive" in titles
+    assert "Tree planting" not in titles
+
+    # q matching a category name is a category filter, not a text search.
+    titles = {row["title"] for row in client.get("/listings?q=Environment").get_json()}
+    assert "Tree planting" in titles
+    assert "Blood drive" not in titles
+
+    everything = client.get("/listings?category=All").get_json()
+    assert {"Tree planting", "Blood drive", "Uncategorized"} <= {
+        row["title"] for row in everything
+    }
@@ -0,0 +1,55 @@
+"""Tests for the compiled search-result categorizer."""
+
+import re
+
+from categorizer import Categorizer, categorizer, trie_pattern
+from google_search import refine_and_categorize
+
+
+def test_trie_pattern_matches_exactly_the_terms():
+    terms = ["animal", "animals", "animal welfare", "art", "arts & culture"]
+    pattern = re.compile(rf"\b{trie_pattern(terms)}\b")
+    for term in terms:
+        assert pattern.fullmatch(term)
+    assert pattern.fullmatch("anim") is None
+    assert pattern.findall("arts & culture for animals") == [
+        "arts & culture",
+        "animals",
+    ]
+
+
+def test_scores_prefer_names_and_titles():
+    # The full name beats a synonym, and the title beats the snippet.
+    assert categorizer.categorize("Animal Welfare day", "food pantry") == (
+        "Animal Welfare"
+    )
+    assert categorizer.categorize("Food pantry shift", "pet adoption") == (
+        "Social Services"
+    )
+    # "shelter" belongs to two categories: alone it is a tie and the earlier
+    # category wins; another matching term breaks the tie.
+    assert categorizer.categorize("Shelter volunteers") == "Animal Welfare"
+    assert categorizer.categorize("Shelter volunteers", "homeless meals") == (
+        "Social Services"
+    )
+
+
+def test_word_boundaries_and_other():
+    assert categorizer.categorize("Small town hall meeting") == "Other"
+    assert categorizer.categorize("Artsy crafts", "seniorsx") == "Other"
+    assert categorizer.categorize("WOMEN'S ISSUES forum") == "Women's Issues"
+
+
+def test_custom_synonyms():
+    custom = Categorizer(["All", "Seniors", "Technology"], {"Seniors": ("bingo",)})
+    assert custom.categorize("Bingo night") == "Seniors"
+    assert custom.categorize("Tech night") == "Other"
+
+
+def test_refine_and_categorize_sets_category():
+    items = [
+        {"title": "River cleanup", "snippet": "Protect the environment"},
+        {"title": "Game night", "snippet": ""},
+    ]
+    refined = refine_and_categorize(items)
+    assert [item["category"] for item in refined] == ["Environment", "Other"]
@@ -0,0 +1,95 @@
+"""Tests for the circuit breaker state machine."""
+
+import pytest
+
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+class Clock:
+    now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _fail():
+    raise RuntimeError("upstream down")
+
+
+def _raise(exc):
+    raise exc
+
+
+def test_opens_after_consecutive_failures_and_probes_once():
+    clock = Clock()
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=10, clock=clock)
+    assert breaker.call(lambda: "ok") == "ok"
+    with pytest.raises(RuntimeError):
+        breaker.call(_fail)
+    assert breaker.call(lambda: "ok") == "ok"  # success resets the count
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            breaker.call(_fail)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "never called")
+    assert breaker.status()["retry_in"] == 10
+
+    clock.now = 10
+    assert breaker.state == "half_open"
+    # Only one probe is let through at a time; a failed probe re-opens.
+    with pytest.raises(RuntimeError):
+        breaker.call(_fail)
+    assert breaker.state == "open"
+
+    clock.now = 20
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.status() == {
+        "state": "closed",
+        "consecutive_failures": 0,
+        "calls": 7,
+        "failures": 4,
+        "rejected": 1,
+    }
+
+
+def test_half_open_rejects_concurrent_calls():
+    clock = Clock()
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=1, clock=clock)
+    with pytest.raises(RuntimeError):
+        breaker.call(_fail)
+    clock.now = 1
+
+    def probe():
+        # A second caller arriving while the probe is in flight fails fast.
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: "second")
+        return "probed"
+
+    assert breaker.call(probe) == "probed"
+    assert breaker.state == "closed"
+
+
+def test_only_matching_exceptions_count_as_failures():
+    breaker = CircuitBreaker(
+        "test", failure_threshold=1, is_failure=lambda e: isinstance(e, OSError)
+    )
+    with pytest.raises(ValueError):
+        breaker.call(_raise, ValueError("bad request"))
+    assert breaker.state == "closed"
+    with pytest.raises(ConnectionError):
+        breaker.call(_raise, ConnectionError("refused"))
+    assert breaker.state == "open"
+
+
+def test_interrupted_probe_lets_the_next_call_probe():
+    clock = Clock()
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=1, clock=clock)
+    with pytest.raises(RuntimeError):
+        breaker.call(_fail)
+    clock.now = 1
+    with pytest.raises(KeyboardInterrupt):
+        breaker.call(_raise, KeyboardInterrupt())
+    assert breaker.state == "half_open"
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == "closed"
@@ -0,0 +1,94 @@
+"""Tests for the build-time asset compression tool and its manifest."""
+
+import gzip
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flask import Flask, request
+
+from static_assets import MANIFEST_NAME, StaticAssets
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../tools"))
+)
+import compress_assets  # noqa: E402
+
+BUNDLE = "assets/index-CglF_4OK.js"
+
+
+@pytest.fixture
+def dist(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_text("<html>" + "x" * 400 + "</html>")
+    (tmp_path / BUNDLE).write_text("console.log('bundle');\n" * 200)
+    (tmp_path / "assets" / "logo-AbCdEf12.png").write_bytes(os.urandom(1024))
+    return tmp_path
+
+
+def test_build_writes_siblings_and_manifest(dist):
+    manifest = compress_assets.build(dist, workers=2)
+    files = manifest["files"]
+
+    bundle = files[BUNDLE]
+    assert len(bundle["sha256"]) == 64
+    assert "gzip" in bundle["encodings"]
+    original = (dist / BUNDLE).read_bytes()
+    assert gzip.decompress((dist / (BUNDLE + ".gz")).read_bytes()) == original
+    if compress_assets.brotli is not None:
+        assert (dist / (BUNDLE + ".br")).exists()
+
+    # Binary images are listed with an ETag but not compressed.
+    png = files["assets/logo-AbCdEf12.png"]
+    assert png["encodings"] == {}
+    assert not (dist / "assets" / "logo-AbCdEf12.png.gz").exists()
+
+    on_disk = json.loads((dist / MANIFEST_NAME).read_text())
+    assert on_disk["files"][BUNDLE]["etag"] == bundle["etag"]
+
+
+def test_rebuild_skips_unchanged_files(dist, monkeypatch):
+    compress_assets.build(dist, workers=1)
+    (dist / "index.html").write_text("<html>" + "y" * 400 + "</html>")
+
+    compressed = []
+    real = compress_assets.compress_file
+
+    def tracking(path, encodings):
+        compressed.append(os.path.basename(path))
+        return real(path, encodings)
+
+    # Threads instead of processes so the monkeypatched function is used.
+    monkeypatch.setattr(compress_assets, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(compress_assets, "compress_file", tracking)
+    compress_assets.build(dist)
+    assert compressed == ["index.html"]
+
+
+def test_static_server_uses_manifest_etags(dist):
+    manifest = compress_assets.build(dist, workers=1)
+    assets = StaticAssets(dist)
+    assert MANIFEST_NAME not in assets.assets
+
+    app = Flask(__name__)
+
+    @app.route("/<path:path>")
+    def serve(path):
+        return assets.serve(path, request)
+
+    resp = app.test_client().get(BUNDLE, headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.headers["ETag"] == f'"{manifest["files"][BUNDLE]["etag"]}-gzip"'
+
+
+def test_edit_to_same_length_drops_manifest_etag(dist):
+    manifest = compress_assets.build(dist, workers=1)
+    index = dist / "index.html"
+    stat = index.stat()
+    index.write_text("<html>" + "y" * 400 + "</html>")
+    os.utime(index, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    asset = StaticAssets(dist).assets["index.html"]
+    assert asset.etag != manifest["files"]["index.html"]["etag"]
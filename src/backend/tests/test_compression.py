@@ -0,0 +1,83 @@
+"""Tests for negotiated API response compression."""
+
+import gzip
+import json
+
+import pytest
+from flask import Response, stream_with_context
+
+import compression
+from app import create_app, db
+from models import Listing
+
+
+@pytest.fixture
+def app():
+    app = create_app({"TESTING": True, "COMPRESS_MIN_SIZE": 200})
+
+    @app.route("/stream-test")
+    def stream_test():
+        def rows():
+            for i in range(50):
+                yield json.dumps({"row": i, "pad": "x" * 40}) + "\n"
+
+        return Response(stream_with_context(rows()), mimetype="application/json")
+
+    with app.app_context():
+        db.create_all()
+        for i in range(20):
+            db.session.add(
+                Listing(title=f"Beach cleanup {i}", description="Bring gloves " * 5)
+            )
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+def test_large_json_is_gzipped_when_accepted(app, monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    client = app.test_client()
+    plain = client.get("/listings")
+    assert "Content-Encoding" not in plain.headers
+
+    resp = client.get("/listings", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    assert int(resp.headers["Content-Length"]) < len(plain.data)
+    assert gzip.decompress(resp.data) == plain.data
+
+
+def test_brotli_preferred_when_available(app):
+    if compression.brotli is None:
+        pytest.skip("brotli not installed")
+    client = app.test_client()
+    resp = client.get("/listings", headers={"Accept-Encoding": "gzip, br"})
+    assert resp.headers["Content-Encoding"] == "br"
+    assert compression.brotli.decompress(resp.data) == client.get("/listings").data
+
+
+def test_small_responses_are_not_compressed(app):
+    resp = app.test_client().get(
+        "/api/health/live", headers={"Accept-Encoding": "gzip"}
+    )
+    assert "Content-Encoding" not in resp.headers
+
+
+def test_streamed_response_is_compressed_incrementally(app, monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    client = app.test_client()
+    resp = client.get("/stream-test", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in resp.headers
+    lines = gzip.decompress(resp.data).decode().splitlines()
+    assert len(lines) == 50
+    assert json.loads(lines[-1])["row"] == 49
+
+
+def test_compress_stream_flushes_each_chunk():
+    import zlib
+
+    decoder = zlib.decompressobj(31)
+    stream = compression.compress_stream(iter([b"first", b"second"]), "gzip")
+    assert decoder.decompress(next(stream)) == b"first"
+    assert decoder.decompress(next(stream)) == b"second"
@@ -0,0 +1,73 @@
+"""Tests for connection-pool configuration."""
+
+import sqlalchemy as sa
+
+from db_pool import (
+    TimedNullPool,
+    TimedQueuePool,
+    engine_options,
+    is_transaction_pooler,
+    pool_sizing,
+)
+
+SUPABASE_TX = "postgresql://u:p@aws-0.pooler.supabase.com:6543/postgres"
+SUPABASE_SESSION = "postgresql://u:p@aws-0.pooler.supabase.com:5432/postgres"
+
+
+def test_sqlite_and_testing_use_defaults():
+    assert engine_options("sqlite:///data.db", environ={}) == {}
+    assert engine_options(SUPABASE_SESSION, environ={"TESTING": "1"}) == {}
+
+
+def test_detects_transaction_pooler():
+    assert is_transaction_pooler(SUPABASE_TX, environ={})
+    assert not is_transaction_pooler(SUPABASE_SESSION, environ={})
+    assert is_transaction_pooler(
+        "postgresql://u:p@host:5432/db?pgbouncer=true", environ={}
+    )
+    assert is_transaction_pooler(
+        SUPABASE_SESSION, environ={"DB_POOL_MODE": "transaction"}
+    )
+
+
+def test_transaction_pooler_uses_null_pool_without_startup_options():
+    options = engine_options(SUPABASE_TX, environ={})
+    assert options["poolclass"] is TimedNullPool
+    assert "pool_size" not in options
+    assert "options" not in options["connect_args"]
+
+
+def test_transaction_pooler_psycopg3_disables_prepared_statements():
+    url = SUPABASE_TX.replace("postgresql://", "postgresql+psycopg://")
+    options = engine_options(url, environ={"DB_TRANSACTION_POOL": "queue"})
+    assert options["poolclass"] is TimedQueuePool
+    assert options["connect_args"]["prepare_threshold"] is None
+
+
+def test_direct_connection_pool_sized_from_threads():
+    options = engine_options(SUPABASE_SESSION, environ={"GUNICORN_THREADS": "4"})
+    assert options["poolclass"] is TimedQueuePool
+    assert options["pool_size"] == 5
+    assert options["max_overflow"] == 4
+    assert options["connect_args"]["options"] == "-c statement_timeout=30000"
+
+
+def test_pool_sizing_respects_connection_budget_and_overrides():
+    env = {"GUNICORN_THREADS": "8", "WEB_CONCURRENCY": "4", "DB_MAX_CONNECTIONS": "12"}
+    assert pool_sizing(env) == (3, 0)
+    env["DB_POOL_SIZE"] = "2"
+    assert pool_sizing(env)[0] == 2
+
+
+def test_timed_pool_records_wait_stats(tmp_path):
+    engine = sa.create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool, pool_size=1
+    )
+    for _ in range(3):
+        with engine.connect() as conn:
+            conn.execute(sa.text("SELECT 1"))
+    stats = engine.pool.wait_stats.snapshot()
+    assert stats["checkouts"] == 3
+    assert stats["timeouts"] == 0
+    assert stats["max_wait_ms"] >= stats["avg_wait_ms"] >= 0
+    engine.dispose()
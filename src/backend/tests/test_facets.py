@@ -0,0 +1,96 @@
+"""Tests for /listings/facets counts and their cache invalidation."""
+
+from cache import cache
+from facets import CACHE_PREFIX
+from listing_events import listings_version
+from models import LISTINGS_VERSION, DataVersion, Listing, db
+
+
+def _post(client, headers, title, category, location):
+    resp = client.post(
+        "/listings",
+        json={
+            "title": title,
+            "description": "D",
+            "category": category,
+            "location": location,
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    return resp.get_json()["id"]
+
+
+def _counts(rows):
+    return {row["name"]: row["count"] for row in rows}
+
+
+def test_facet_counts_respect_filters(client, create_user, auth_headers):
+    headers = auth_headers(create_user("facets1@x.com"))
+    _post(client, headers, "Zeta park cleanup", "Environment", "Zeta City")
+    _post(client, headers, "Zeta beach cleanup", "Environment", "Zeta Beach")
+    _post(client, headers, "Zeta clinic", "Health", "Zeta City")
+    _post(client, headers, "Other tutoring", "Education", "Zeta City")
+
+    facets = client.get("/listings/facets?q=zeta").get_json()
+    assert _counts(facets["categories"]) == {"Environment": 2, "Health": 1}
+    assert _counts(facets["locations"]) == {"Zeta City": 2, "Zeta Beach": 1}
+    assert facets["categories"][0]["name"] == "Environment"
+
+    # A facet ignores its own filter but applies the others.
+    facets = client.get("/listings/facets?q=zeta&category=Health").get_json()
+    assert _counts(facets["categories"]) == {"Environment": 2, "Health": 1}
+    assert _counts(facets["locations"]) == {"Zeta City": 1}
+
+    assert client.get("/listings/facets?category=Nope").status_code == 400
+
+
+def test_facets_are_cached_until_a_listing_changes(client, create_user, auth_headers):
+    headers = auth_headers(create_user("facets2@x.com"))
+    lid = _post(client, headers, "Yotta drive", "Health", "Yotta Town")
+
+    first = client.get("/listings/facets?q=yotta").get_json()
+    assert _counts(first["categories"]) == {"Health": 1}
+    version = listings_version(db.session)
+    assert cache.get(f"{CACHE_PREFIX}{version}:yotta||") == first
+
+    resp = client.put(f"/listings/{lid}", json={"category": "Animals"}, headers=headers)
+    assert resp.status_code == 200
+    assert listings_version(db.session) == version + 1
+    assert cache.get(f"{CACHE_PREFIX}{version}:yotta||") is None
+    updated = client.get("/listings/facets?q=yotta").get_json()
+    assert _counts(updated["categories"]) == {"Animals": 1}
+
+    _post(client, headers, "Yotta shelter", "Animals", "Yotta Town")
+    assert _counts(client.get("/listings/facets?q=yotta").get_json()["categories"]) == {
+        "Animals": 2
+    }
+
+    client.delete(f"/listings/{lid}", headers=headers)
+    assert _counts(client.get("/listings/facets?q=yotta").get_json()["categories"]) == {
+        "Animals": 1
+    }
+
+
+def test_writes_in_other_processes_invalidate(client, create_user, auth_headers):
+    headers = auth_headers(create_user("facets3@x.com"))
+    _post(client, headers, "Kilo run", "Health", "Kilo Town")
+    assert _counts(client.get("/listings/facets?q=kilo").get_json()["categories"]) == {
+        "Health": 1
+    }
+
+    # Another worker changed listings: only the shared version moved, no
+    # signal reached this process, yet the cached counts are not reused.
+    db.session.execute(
+        db.update(DataVersion)
+        .where(DataVersion.name == LISTINGS_VERSION)
+        .values(version=DataVersion.version + 1)
+    )
+    db.session.execute(
+        db.update(Listing)
+        .where(Listing.title == "Kilo run")
+        .values(location="Kilo City")
+    )
+    db.session.commit()
+    facets = client.get("/listings/facets?q=kilo").get_json()
+    assert _counts(facets["locations"]) == {"Kilo City": 1}
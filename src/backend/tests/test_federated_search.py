@@ -0,0 +1,237 @@
+"""Tests for /api/search/events: listings first, stored results, then Google."""
+
+import time
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+import google_search
+from categories import CATEGORIES
+from federated_search import normalize_url, url_hash
+from models import ExternalEvent, ExternalSearch, Listing, category_id_for, db
+
+
+@pytest.fixture(autouse=True)
+def closed_breaker():
+    google_search.breaker.reset()
+    yield
+    google_search.breaker.reset()
+
+
+@pytest.fixture
+def google(monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    monkeypatch.setenv("CUSTOM_SEARCH_ENGINE_ID", "test")
+    calls = []
+
+    def fake_search(query, api_key, search_engine_id, num=10, timeout=None):
+        calls.append(query)
+        return [
+            {"title": "Beach cleanup", "snippet": "", "link": "https://ex.com/a"},
+            {"title": "Beach cleanup", "snippet": "", "link": "https://EX.com/a/#x"},
+            {"title": "Animal shelter", "snippet": "", "link": "https://ex.com/b"},
+        ]
+
+    monkeypatch.setattr(google_search, "_execute_search", fake_search)
+    return calls
+
+
+def test_normalize_url_dedupes_trivial_variants():
+    assert normalize_url("HTTPS://Ex.com/a/#top") == "https://ex.com/a"
+    assert url_hash("https://ex.com/a?x=1") != url_hash("https://ex.com/a")
+
+
+def test_cold_miss_stores_results_then_serves_them(client, google):
+    resp = client.get("/api/search/events?q=Tide+pools")
+    assert resp.status_code == 200
+    assert resp.headers["X-Search-Source"] == "google"
+    results = resp.get_json()
+    assert [r["link"] for r in results] == ["https://ex.com/a", "https://ex.com/b"]
+    assert results[0]["category"] == "Environment"
+    assert all(r["source"] == "external" for r in results)
+    assert google == ["Tide pools"]
+
+    # Same query modulo case and spacing: answered from the store.
+    resp = client.get("/api/search/events?q=tide%20%20POOLS")
+    assert resp.headers["X-Search-Source"] == "store"
+    assert resp.get_json() == results
+    assert google == ["Tide pools"]
+
+    with client.application.app_context():
+        assert ExternalEvent.query.filter_by(url=results[0]["link"]).count() == 1
+
+
+def test_expired_query_goes_back_to_google(client, google):
+    client.get("/api/search/events?q=river+walk")
+    client.application.config["EXTERNAL_SEARCH_TTL_SECONDS"] = 0
+    try:
+        resp = client.get("/api/search/events?q=river+walk")
+    finally:
+        client.application.config["EXTERNAL_SEARCH_TTL_SECONDS"] = 86400
+    assert resp.headers["X-Search-Source"] == "google"
+    assert google == ["river walk", "river walk"]
+    with client.application.app_context():
+        # Re-fetched URLs and queries update their rows, not duplicate them.
+        assert ExternalEvent.query.filter_by(url="https://ex.com/b").count() == 1
+        assert ExternalSearch.query.filter_by(query_text="river walk").count() == 1
+
+
+def test_local_listings_come_first_and_can_skip_google(client, google):
+    db.session.add_all(
+        [
+            Listing(
+                title="Dog walking",
+                description="Walk shelter dogs",
+                category_id=category_id_for("Animals"),
+            ),
+            Listing(title="Cat cafe shifts", description="Help at the shelter"),
+            Listing(title="Bake sale", description="For the food pantry shelter"),
+        ]
+    )
+    db.session.commit()
+
+    resp = client.get("/api/search/events?q=shelter&category=Animal+Welfare")
+    results = resp.get_json()
+    local = {r["title"] for r in results if r["source"] == "tapin"}
+    assert local == {"Dog walking", "Cat cafe shifts"}
+    assert results[0]["source"] == "tapin"
+    assert google == ["shelter in Animal Welfare"]
+
+    client.application.config["SEARCH_LOCAL_ENOUGH"] = 2
+    try:
+        resp = client.get("/api/search/events?q=shelter")
+    finally:
+        client.application.config["SEARCH_LOCAL_ENOUGH"] = 10
+    assert resp.headers["X-Search-Source"] == "local"
+    assert [r["source"] for r in resp.get_json()] == ["tapin", "tapin"]
+    assert len(google) == 1
+
+
+def test_google_failure_keeps_local_results(client, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    db.session.add(Listing(title="Library tutoring", description="Reading help"))
+    db.session.commit()
+
+    resp = client.get("/api/search/events?q=tutoring")
+    assert resp.headers["X-Search-Source"] == "local"
+    assert [r["title"] for r in resp.get_json()] == ["Library tutoring"]
+
+    resp = client.get("/api/search/events?q=nothing+matches+this")
+    assert resp.status_code == 503
+    assert "error" in resp.get_json()
+
+
+def test_all_fans_out_and_interleaves(client, monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    monkeypatch.setenv("CUSTOM_SEARCH_ENGINE_ID", "test")
+    calls = []
+
+    def fake_search(query, api_key, search_engine_id, num=10, timeout=None):
+        calls.append(query)
+        time.sleep(0.1)
+        slug = query.replace(" ", "-")
+        return [
+            {"title": query, "snippet": "", "link": f"https://ex.com/{slug}/1"},
+            {"title": query, "snippet": "", "link": f"https://ex.com/{slug}/2"},
+            {"title": "dup", "snippet": "", "link": "https://ex.com/shared"},
+        ]
+
+    monkeypatch.setattr(google_search, "_execute_search", fake_search)
+    started = time.perf_counter()
+    resp = client.get("/api/search/events?q=fanout&category=All")
+    elapsed = time.perf_counter() - started
+
+    categories = [c for c in CATEGORIES if c != "All"]
+    assert sorted(calls) == sorted(["fanout"] + [f"fanout in {c}" for c in categories])
+    assert elapsed < 1.0  # 15 calls of 100ms each, run concurrently
+    assert "X-Search-Partial" not in resp.headers
+    links = [r["link"] for r in resp.get_json()]
+    assert len(links) == len(set(links)) == 2 * len(calls) + 1
+    # Round-robin: every sub-query's first hit comes before any second hit.
+    assert all(link.endswith("/1") for link in links[: len(calls)])
+
+
+def test_fan_out_deadline_returns_partial_results(client, monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    monkeypatch.setenv("CUSTOM_SEARCH_ENGINE_ID", "test")
+
+    def fake_search(query, api_key, search_engine_id, num=10, timeout=None):
+        if query.endswith(("Seniors", "Technology")):
+            time.sleep(0.5)
+        link = "https://ex.com/slow/" + query.replace(" ", "-")
+        return [{"title": query, "snippet": "", "link": link}]
+
+    monkeypatch.setattr(google_search, "_execute_search", fake_search)
+    client.application.config["SEARCH_DEADLINE_SECONDS"] = 0.2
+    try:
+        started = time.perf_counter()
+        resp = client.get("/api/search/events?q=deadline&category=All")
+        elapsed = time.perf_counter() - started
+        assert elapsed < 0.45
+        assert resp.headers["X-Search-Partial"] == "2"
+        titles = {r["title"] for r in resp.get_json()}
+        assert "deadline in Environment" in titles
+        assert "deadline in Seniors" not in titles
+
+        # The completed sub-queries were stored; only the missing ones rerun.
+        client.application.config["SEARCH_DEADLINE_SECONDS"] = 2
+        resp = client.get("/api/search/events?q=deadline&category=All")
+        assert "X-Search-Partial" not in resp.headers
+        assert "deadline in Seniors" in {r["title"] for r in resp.get_json()}
+    finally:
+        client.application.config["SEARCH_DEADLINE_SECONDS"] = 5
+
+
+def test_failing_google_trips_breaker_and_falls_back_to_stale(client, monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    monkeypatch.setenv("CUSTOM_SEARCH_ENGINE_ID", "test")
+    calls = []
+
+    def fake_search(query, api_key, search_engine_id, num=10, timeout=None):
+        calls.append(query)
+        if query == "tripwire":
+            raise TimeoutError("timed out")
+        raise HttpError(httplib2.Response({"status": 500}), b"backend error")
+
+    monkeypatch.setattr(google_search, "_execute_search", fake_search)
+    resp = client.get("/api/search/events?q=tripwire")
+    assert resp.status_code == 504
+    for _ in range(google_search.breaker.failure_threshold - 1):
+        assert client.get("/api/search/events?q=broken").status_code == 502
+    assert google_search.breaker.state == "open"
+
+    # Open: fail fast without calling Google.
+    calls.clear()
+    resp = client.get("/api/search/events?q=broken")
+    assert resp.status_code == 503
+    assert calls == []
+    health = client.get("/api/health/ready").get_json()
+    assert health["components"]["google_search"]["state"] == "open"
+
+    # A query stored earlier is served stale, whatever its age.
+    client.application.config["EXTERNAL_SEARCH_TTL_SECONDS"] = 0
+    try:
+        resp = client.get("/api/search/events?q=river+walk")
+    finally:
+        client.application.config["EXTERNAL_SEARCH_TTL_SECONDS"] = 86400
+    assert resp.status_code == 200
+    assert resp.headers["X-Search-Stale"] == "1"
+    assert [r["link"] for r in resp.get_json()] == [
+        "https://ex.com/a",
+        "https://ex.com/b",
+    ]
+
+
+def test_client_errors_do_not_trip_breaker(client, monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    monkeypatch.setenv("CUSTOM_SEARCH_ENGINE_ID", "test")
+
+    def fake_search(query, api_key, search_engine_id, num=10, timeout=None):
+        raise HttpError(httplib2.Response({"status": 400}), b"invalid argument")
+
+    monkeypatch.setattr(google_search, "_execute_search", fake_search)
+    for i in range(google_search.breaker.failure_threshold + 1):
+        assert client.get(f"/api/search/events?q=bad+{i}").status_code == 502
+    assert google_search.breaker.status()["state"] == "closed"
+    assert google_search.breaker.status()["failures"] == 0
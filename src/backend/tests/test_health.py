@@ -0,0 +1,58 @@
+"""Tests for the liveness and readiness probes."""
+
+import health
+from cache import cache
+
+
+def test_health_live_does_no_io(client, monkeypatch):
+    def fail():
+        raise AssertionError("liveness must not touch the database")
+
+    monkeypatch.setattr(health, "database_probe", fail)
+    resp = client.get("/api/health/live")
+    assert resp.status_code == 200
+    assert resp.get_json() == {"status": "ok"}
+
+
+def test_health_ready_reports_components(client):
+    cache.delete(health.READY_CACHE_KEY)
+    resp = client.get("/api/health/ready")
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["status"] == "ok"
+    components = data["components"]
+    assert components["database"]["status"] == "connected"
+    assert "head" in components["database"]["migrations"]
+    assert "class" in components["pool"]
+    assert components["cache"]["backend"] == "memory"
+    assert components["google_search"]["state"] == "closed"
+
+
+def test_health_ready_caches_database_probe(client, monkeypatch):
+    cache.delete(health.READY_CACHE_KEY)
+    calls = []
+    real_probe = health.database_probe
+
+    def counting_probe():
+        calls.append(1)
+        return real_probe()
+
+    monkeypatch.setattr(health, "database_probe", counting_probe)
+    for _ in range(3):
+        assert client.get("/api/health/ready").status_code == 200
+    assert len(calls) == 1
+
+
+def test_health_ready_degraded_when_database_fails(client, monkeypatch):
+    cache.delete(health.READY_CACHE_KEY)
+
+    def broken_probe():
+        raise RuntimeError("connection refused")
+
+    monkeypatch.setattr(health, "database_probe", broken_probe)
+    resp = client.get("/api/health/ready")
+    cache.delete(health.READY_CACHE_KEY)
+    assert resp.status_code == 503
+    data = resp.get_json()
+    assert data["status"] == "degraded"
+    assert data["components"]["database"]["error"] == "connection refused"
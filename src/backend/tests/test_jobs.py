@@ -0,0 +1,136 @@
+"""Tests for the database-backed job queue."""
+
+import importlib
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+import jobs
+from models import Job, db
+
+calls = []
+
+
+@jobs.job("test_record")
+def record(value):
+    calls.append(value)
+
+
+@jobs.job("test_flaky")
+def flaky(fail_times):
+    calls.append("attempt")
+    if len(calls) <= fail_times:
+        raise RuntimeError("upstream down")
+
+
+@pytest.fixture(autouse=True)
+def empty_queue(client, monkeypatch):
+    monkeypatch.setattr(jobs, "RETRY_BASE_SECONDS", 0)
+    db.session.query(Job).delete()
+    db.session.commit()
+    calls.clear()
+
+
+def test_enqueued_jobs_commit_with_the_caller():
+    jobs.enqueue("test_record", value=1)
+    db.session.commit()
+    jobs.enqueue("test_record", value=2)
+    db.session.rollback()  # rolled back with the caller's transaction
+
+    assert jobs.work(once=True) == 1
+    assert calls == [1]
+    row = db.session.scalars(db.select(Job)).one()
+    assert (row.status, row.attempts, row.locked_by) == ("done", 1, None)
+
+    with pytest.raises(KeyError):
+        jobs.enqueue("no_such_job")
+
+
+def test_failures_retry_then_give_up():
+    jobs.enqueue("test_flaky", fail_times=2, max_attempts=5)
+    db.session.commit()
+    assert jobs.work(once=True) == 3
+    row = db.session.scalars(db.select(Job)).one()
+    assert (row.status, row.attempts, row.last_error) == ("done", 3, None)
+
+    calls.clear()
+    jobs.enqueue("test_flaky", fail_times=10, max_attempts=2)
+    db.session.commit()
+    jobs.work(once=True)
+    row = db.session.scalars(db.select(Job).where(Job.status == "failed")).one()
+    assert row.attempts == 2
+    assert row.last_error == "RuntimeError: upstream down"
+
+
+def test_scheduled_jobs_wait_and_backoff_delays_retries(monkeypatch):
+    jobs.enqueue("test_record", delay=60, value="later")
+    db.session.commit()
+    assert jobs.work(once=True) == 0
+
+    monkeypatch.setattr(jobs, "RETRY_BASE_SECONDS", 60)
+    jobs.enqueue("test_flaky", fail_times=1)
+    db.session.commit()
+    assert jobs.work(once=True) == 1  # failed once, next try is a minute out
+    assert calls == ["attempt"]
+
+
+def test_lapsed_claim_is_taken_over():
+    jobs.enqueue("test_record", value="x")
+    db.session.commit()
+    (row,) = jobs.claim("worker-a", visibility_timeout=0)
+    assert jobs.claim("worker-b", visibility_timeout=60)[0].id == row.id
+
+    # The first worker's late result is ignored; the new owner finishes it.
+    assert jobs.run(row, "worker-a")
+    assert db.session.get(Job, row.id).status == "running"
+    assert jobs.claim("worker-c") == []
+    assert jobs.run(db.session.get(Job, row.id), "worker-b")
+    assert db.session.get(Job, row.id).status == "done"
+    assert db.session.get(Job, row.id).attempts == 2
+
+
+def test_unique_jobs_share_one_queued_row():
+    first = jobs.enqueue("test_record", unique=True, value=1)
+    assert jobs.enqueue("test_record", unique=True, value=2) is first
+    jobs.enqueue("test_record", value=3)  # not unique: always added
+    db.session.commit()
+
+    # The index, not the lookup, rules out a second queued row, so a racing
+    # caller that missed the first one cannot add another.
+    with pytest.raises(IntegrityError):
+        db.session.execute(
+            insert(Job).values(
+                name="test_record",
+                unique_key="test_record",
+                status="queued",
+                payload={},
+                run_at=first.run_at,
+            )
+        )
+    db.session.rollback()
+
+    # Once claimed, the key is free for the next run.
+    assert [row.id for row in jobs.claim("worker-a", limit=1)] == [first.id]
+    assert jobs.enqueue("test_record", unique=True, value=4).id != first.id
+    db.session.commit()
+    assert db.session.query(Job).count() == 3
+
+
+def test_reset_password_enqueues_email(client, create_user, monkeypatch):
+    app_module = importlib.import_module("app")
+    sent = []
+    monkeypatch.setenv("SMTP_HOST", "smtp.example.com")
+    monkeypatch.setattr(
+        app_module, "send_reset_email", lambda *args: sent.append(args) or (True, "")
+    )
+    create_user("queued-reset@example.com")
+
+    resp = client.post("/reset-password", json={"email": "queued-reset@example.com"})
+    assert resp.status_code == 200
+    assert "reset_url" not in resp.get_json()
+    assert sent == []
+
+    assert jobs.work(once=True) == 1
+    assert sent[0][0] == "queued-reset@example.com"
+    assert "/reset-password/confirm/" in sent[0][1]
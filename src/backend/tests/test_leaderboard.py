@@ -0,0 +1,100 @@
+"""Tests for the sorted-list leaderboards and /api/leaderboard."""
+
+from leaderboard import Leaderboard, boards
+
+
+def test_leaderboard_ranks_and_incremental_updates():
+    scores = {1: 3, 2: 7, 3: 3, 4: 0}
+    calls = []
+
+    def load(user_ids=None):
+        calls.append(user_ids)
+        if user_ids is None:
+            return dict(scores)
+        return {u: scores[u] for u in user_ids if u in scores}
+
+    board = Leaderboard(load)
+    assert board.top(10) == [(1, 2, 7), (2, 1, 3), (3, 3, 3)]
+    assert board.rank(3) == (3, 3)
+    assert board.rank(4) == (None, 0)
+
+    scores[3] = 9
+    scores[2] = 0
+    board.mark_dirty({2, 3})
+    assert board.top(2) == [(1, 3, 9), (2, 1, 3)]
+    assert board.rank(2) == (None, 0)
+    # One full load, then only the dirty users were re-read.
+    assert calls == [None, {2, 3}]
+
+    board.max_age = 0
+    scores[4] = 1
+    assert board.rank(4) == (3, 1)  # periodic reload picks up missed writes
+
+
+def test_leaderboard_endpoint_follows_acceptance(client, create_user, auth_headers):
+    owner_id = create_user("lb-owner@x.com")
+    owner = auth_headers(owner_id)
+    alice = create_user("lb-alice@x.com")
+    bob = create_user("lb-bob@x.com")
+    boards["signups"].clear()
+
+    def accept(user_id, title):
+        resp = client.post(
+            "/listings", json={"title": title, "description": "D"}, headers=owner
+        )
+        listing_id = resp.get_json()["id"]
+        resp = client.post(
+            f"/listings/{listing_id}/signup", json={}, headers=auth_headers(user_id)
+        )
+        client.put(
+            f"/signups/{resp.get_json()['id']}",
+            json={"status": "accepted"},
+            headers=owner,
+        )
+
+    accept(alice, "A1")
+    resp = client.get("/api/leaderboard", headers=auth_headers(bob))
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["top"] == [{"rank": 1, "user_id": alice, "score": 1}]
+    assert body["me"] == {"rank": None, "user_id": bob, "score": 0}
+
+    accept(bob, "B1")
+    accept(bob, "B2")
+    body = client.get(
+        "/api/leaderboard?limit=1", headers=auth_headers(alice)
+    ).get_json()
+    assert body["top"] == [{"rank": 1, "user_id": bob, "score": 2}]
+    assert body["me"] == {"rank": 2, "user_id": alice, "score": 1}
+
+    anonymous = client.get("/api/leaderboard").get_json()
+    assert anonymous["me"] is None
+    assert client.get("/api/leaderboard?by=karma").status_code == 400
+
+
+def test_achievements_board_updates_after_awards(client, create_user, auth_headers):
+    owner_id = create_user("lb-owner2@x.com")
+    volunteer = create_user("lb-volunteer@x.com")
+    engine = client.application.extensions["achievements"]
+    engine.reset()
+    boards["achievements"].clear()
+    assert client.get("/api/leaderboard?by=achievements").get_json()["top"] == []
+
+    resp = client.post(
+        "/listings",
+        json={"title": "Award me", "description": "D"},
+        headers=auth_headers(owner_id),
+    )
+    listing_id = resp.get_json()["id"]
+    resp = client.post(
+        f"/listings/{listing_id}/signup", json={}, headers=auth_headers(volunteer)
+    )
+    client.put(
+        f"/signups/{resp.get_json()['id']}",
+        json={"status": "accepted"},
+        headers=auth_headers(owner_id),
+    )
+    engine.drain()
+
+    top = client.get("/api/leaderboard?by=achievements").get_json()["top"]
+    assert top == [{"rank": 1, "user_id": volunteer, "score": 1}]
@@ -0,0 +1,96 @@
+"""Tests for listing event dates and the from/to filters on /listings."""
+
+from datetime import datetime, timedelta, timezone
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def _iso(days, hours=0):
+    return (NOW + timedelta(days=days, hours=hours)).isoformat()
+
+
+def _create(client, headers, title, **dates):
+    resp = client.post(
+        "/listings", json={"title": title, "description": "D", **dates}, headers=headers
+    )
+    assert resp.status_code == 201, resp.get_json()
+    return resp.get_json()
+
+
+def _titles(client, query=""):
+    resp = client.get(f"/listings?q=dates-&{query}")
+    assert resp.status_code == 200, resp.get_json()
+    return [listing["title"] for listing in resp.get_json()]
+
+
+def test_dates_are_validated(client, create_user, auth_headers):
+    headers = auth_headers(create_user("dates-owner@x.com"))
+    one_off = _create(client, headers, "dates-one-off", starts_at=_iso(3))
+    assert one_off["ends_at"] == one_off["starts_at"]
+
+    for dates in (
+        {"starts_at": "next tuesday"},
+        {"ends_at": _iso(3)},
+        {"starts_at": _iso(3), "ends_at": _iso(2)},
+    ):
+        resp = client.post(
+            "/listings",
+            json={"title": "dates-bad", "description": "D", **dates},
+            headers=headers,
+        )
+        assert resp.status_code == 400
+
+    resp = client.put(
+        f"/listings/{one_off['id']}", json={"ends_at": _iso(4)}, headers=headers
+    )
+    assert resp.status_code == 200
+    assert resp.get_json()["ends_at"].startswith(_iso(4)[:19])
+    resp = client.put(
+        f"/listings/{one_off['id']}", json={"ends_at": _iso(1)}, headers=headers
+    )
+    assert resp.status_code == 400
+
+
+def test_past_events_hidden_and_windows_filter(client, create_user, auth_headers):
+    headers = auth_headers(create_user("dates-owner2@x.com"))
+    _create(client, headers, "dates-ongoing")
+    _create(client, headers, "dates-past", starts_at=_iso(-10), ends_at=_iso(-9))
+    _create(client, headers, "dates-running", starts_at=_iso(-1), ends_at=_iso(1))
+    _create(client, headers, "dates-soon", starts_at=_iso(2), ends_at=_iso(2, 3))
+    _create(client, headers, "dates-later", starts_at=_iso(20), ends_at=_iso(21))
+
+    default = _titles(client)
+    assert "dates-past" not in default
+    assert {"dates-ongoing", "dates-running", "dates-soon", "dates-later"} <= set(
+        default
+    )
+    assert "dates-past" in _titles(client, "include_past=1")
+
+    # Dated listings overlapping the window, soonest first.
+    window = f"from={_iso(0)}&to={_iso(3)}".replace("+", "%2B")
+    assert _titles(client, window) == ["dates-running", "dates-soon"]
+    # A bare `to` date includes that whole day.
+    to_day = (NOW + timedelta(days=20)).date().isoformat()
+    assert _titles(client, f"to={to_day}")[-1] == "dates-later"
+    assert "dates-past" not in _titles(client, f"to={to_day}")
+    from_day = (NOW - timedelta(days=10)).date().isoformat()
+    assert _titles(client, f"from={from_day}&to={_iso(-1)}".replace("+", "%2B")) == [
+        "dates-past"
+    ]
+
+    assert client.get("/listings?from=soon").status_code == 400
+    assert client.get(f"/listings?from={to_day}&to={from_day}").status_code == 400
+    assert client.get("/listings/facets?from=soon").status_code == 400
+
+
+def test_utc_z_suffix_and_offsets(client, create_user, auth_headers):
+    headers = auth_headers(create_user("dates-owner-z@x.com"))
+    starts = NOW + timedelta(days=5)
+    listing = _create(
+        client, headers, "zulu-event", starts_at=starts.strftime("%Y-%m-%dT%H:%M:%SZ")
+    )
+    assert listing["starts_at"] == starts.isoformat()
+
+    fetched = client.get(f"/listings/{listing['id']}").get_json()
+    assert fetched["starts_at"] == fetched["ends_at"] == starts.isoformat()
+    assert fetched["starts_at"].endswith("+00:00")
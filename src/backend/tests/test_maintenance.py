@@ -0,0 +1,156 @@
+"""Tests for listing archival and signup purging."""
+
+from datetime import datetime, timedelta, timezone
+
+import jobs
+from maintenance import archive_listings, purge_signups
+from models import (
+    Job,
+    Listing,
+    ListingArchive,
+    Review,
+    ReviewArchive,
+    SignUp,
+    SignUpArchive,
+    db,
+)
+from user_stats import backfill, stats_for
+
+NOW = datetime.now(timezone.utc)
+
+
+def _days_ago(days):
+    return NOW - timedelta(days=days)
+
+
+def _counters(*user_ids):
+    return [stats_for(user_id).to_dict() for user_id in user_ids]
+
+
+def test_archive_tables_mirror_their_sources():
+    for model, archive in (
+        (Listing, ListingArchive),
+        (SignUp, SignUpArchive),
+        (Review, ReviewArchive),
+    ):
+        source = set(model.__table__.columns.keys())
+        assert source | {"archived_at"} == set(archive.__table__.columns.keys())
+
+
+def test_inactive_listings_move_with_their_history(client, create_user):
+    owner = create_user("archive-owner@x.com")
+    volunteer = create_user("archive-volunteer@x.com")
+    old = [Listing(title=f"Old {i}", description="D", owner_id=owner) for i in range(3)]
+    busy = Listing(title="Old but busy", description="D", created_at=_days_ago(400))
+    fresh = Listing(title="Fresh", description="D")
+    for listing in old:
+        listing.created_at = _days_ago(365)
+    db.session.add_all(old + [busy, fresh])
+    db.session.commit()
+    db.session.add_all(
+        [
+            SignUp(
+                user_id=volunteer,
+                listing_id=old[0].id,
+                status="accepted",
+                created_at=_days_ago(300),
+            ),
+            Review(user_id=volunteer, listing_id=old[0].id, rating=5),
+            SignUp(user_id=volunteer, listing_id=busy.id, created_at=_days_ago(2)),
+        ]
+    )
+    db.session.commit()
+    before = _counters(owner, volunteer)
+    old_ids = [listing.id for listing in old]
+
+    assert archive_listings(180, batch_size=2, now=NOW) == 3
+    remaining = set(db.session.scalars(db.select(Listing.title)))
+    assert {"Old but busy", "Fresh"} <= remaining
+    assert not remaining & {"Old 0", "Old 1", "Old 2"}
+    archived = db.session.scalars(
+        db.select(ListingArchive).where(ListingArchive.id.in_(old_ids))
+    ).all()
+    assert sorted(a.title for a in archived) == ["Old 0", "Old 1", "Old 2"]
+    signup = db.session.scalars(
+        db.select(SignUpArchive).where(SignUpArchive.listing_id == old_ids[0])
+    ).one()
+    review = db.session.scalars(
+        db.select(ReviewArchive).where(ReviewArchive.listing_id == old_ids[0])
+    ).one()
+    assert (signup.status, review.rating) == ("accepted", 5)
+
+    # Archived history still counts, now and after a rebuild.
+    assert _counters(owner, volunteer) == before
+    backfill()
+    assert _counters(owner, volunteer) == before
+    assert client.get(f"/listings/{old_ids[0]}").status_code == 404
+
+
+def test_ended_events_are_archived_by_end_date(client):
+    long_over = Listing(
+        title="Long over", description="D", ends_at=_days_ago(40), created_at=NOW
+    )
+    just_over = Listing(title="Just over", description="D", ends_at=_days_ago(5))
+    # Created long ago, but the event is still to come.
+    upcoming = Listing(
+        title="Upcoming",
+        description="D",
+        created_at=_days_ago(400),
+        ends_at=NOW + timedelta(days=10),
+    )
+    db.session.add_all([long_over, just_over, upcoming])
+    db.session.commit()
+
+    archive_listings(180, ended_days=30, now=NOW)
+    remaining = set(db.session.scalars(db.select(Listing.title)))
+    assert "Long over" not in remaining
+    assert {"Just over", "Upcoming"} <= remaining
+
+
+def test_purge_old_dead_signups(client, create_user):
+    volunteer = create_user("purge-volunteer@x.com")
+    listing = Listing(title="Purge", description="D")
+    db.session.add(listing)
+    db.session.commit()
+    db.session.add_all(
+        [
+            SignUp(
+                user_id=volunteer,
+                listing_id=listing.id,
+                status=status,
+                created_at=_days_ago(days),
+            )
+            for status, days in (
+                ("cancelled", 120),
+                ("declined", 100),
+                ("cancelled", 10),
+                ("accepted", 120),
+            )
+        ]
+    )
+    db.session.commit()
+    assert stats_for(volunteer).signups == 4
+
+    assert purge_signups(90, batch_size=1, now=NOW) == 2
+    statuses = db.session.scalars(
+        db.select(SignUp.status).where(SignUp.user_id == volunteer)
+    ).all()
+    assert sorted(statuses) == ["accepted", "cancelled"]
+    assert stats_for(volunteer).signups == 2
+    assert stats_for(volunteer).accepted_signups == 1
+    before = _counters(volunteer)
+    backfill()
+    assert _counters(volunteer) == before
+
+
+def test_cleanup_job_reschedules_itself(client):
+    db.session.query(Job).delete()
+    jobs.enqueue("cleanup")
+    db.session.commit()
+    assert jobs.work(once=True) == 1
+    rows = db.session.scalars(db.select(Job).order_by(Job.id)).all()
+    assert [(r.name, r.status) for r in rows] == [
+        ("cleanup", "done"),
+        ("cleanup", "queued"),
+    ]
+    assert rows[1].run_at > rows[0].run_at
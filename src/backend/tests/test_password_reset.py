@@ -6,3 +6,21 @@ def test_reset_password_flow(client, monkeypatch):
     assert resp.status_code == 200
     data = resp.get_json()
     assert "message" in data
+
+
+def test_reset_password_existing_user_round_trip(client, create_user, monkeypatch):
+    monkeypatch.delenv("SMTP_HOST", raising=False)
+    create_user("reset@example.com", password="old-password")
+    resp = client.post("/reset-password", json={"email": "reset@example.com"})
+    assert resp.status_code == 200
+    reset_url = resp.get_json()["reset_url"]
+    token = reset_url.rsplit("/", 1)[-1]
+
+    resp = client.post(
+        f"/reset-password/confirm/{token}", json={"password": "new-password"}
+    )
+    assert resp.status_code == 200
+    resp = client.post(
+        "/login", json={"email": "reset@example.com", "password": "new-password"}
+    )
+    assert resp.status_code == 200
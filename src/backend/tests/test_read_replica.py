@@ -0,0 +1,67 @@
+"""Tests for read-replica routing with read-your-writes stickiness."""
+
+import pytest
+import sqlalchemy as sa
+
+from app import app, db
+from auth import token_for
+
+
+@pytest.fixture
+def replica(client, tmp_path, monkeypatch):
+    """Attach a second SQLite database as the `replica` bind."""
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            sa.text(
+                "INSERT INTO listing (title, description, created_at) "
+                "VALUES ('Replica only', 'lagging copy', CURRENT_TIMESTAMP)"
+            )
+        )
+    monkeypatch.setitem(db.engines, "replica", engine)
+    yield engine
+    with app.app_context():
+        db.session.remove()
+    engine.dispose()
+
+
+def _titles(resp):
+    assert resp.status_code == 200
+    return {listing["title"] for listing in resp.get_json()}
+
+
+def test_reads_go_to_replica(replica):
+    anonymous = app.test_client()
+    assert "Replica only" in _titles(anonymous.get("/listings"))
+
+
+def test_writer_reads_own_writes_from_primary(replica, create_user):
+    user_id = create_user()
+    headers = {"Authorization": f"Bearer {token_for(user_id)}"}
+    writer = app.test_client()
+
+    resp = writer.post(
+        "/listings",
+        json={"title": "Fresh write", "description": "D"},
+        headers=headers,
+    )
+    assert resp.status_code == 201
+    lid = resp.get_json()["id"]
+
+    titles = _titles(writer.get("/listings", headers=headers))
+    assert "Fresh write" in titles
+    assert "Replica only" not in titles
+    assert writer.get(f"/listings/{lid}", headers=headers).status_code == 200
+
+    # Same identity on a client without the cookie is pinned in-process.
+    other_session = app.test_client()
+    assert "Fresh write" in _titles(other_session.get("/listings", headers=headers))
+
+    # Other readers still use the replica.
+    assert "Fresh write" not in _titles(app.test_client().get("/listings"))
+
+
+def test_no_replica_configured_uses_primary(client):
+    assert "replica" not in db.engines
+    assert "Replica only" not in _titles(client.get("/listings"))
@@ -0,0 +1,117 @@
+"""Tests for /listings/recommended and the recommendation index."""
+
+from models import Listing, SignUp, UserValues, db
+from recommendations import index, listing_weights
+
+
+def _post(client, headers, title, category=None, description="D"):
+    body = {"title": title, "description": description}
+    if category:
+        body["category"] = category
+    resp = client.post("/listings", json=body, headers=headers)
+    assert resp.status_code == 201
+    return resp.get_json()["id"]
+
+
+def test_listing_weights_combine_category_and_keywords(client):
+    listing = Listing(
+        title="Dog shelter walk", description="Help the rescue", category="Animals"
+    )
+    weights = listing_weights(listing)
+    assert weights["Animal Welfare"] == 3.0  # category + keyword
+    assert weights["Social Services"] == 1.0  # "shelter"
+    assert "Technology" not in weights
+
+
+def test_recommended_ranks_by_values_and_history(client, create_user, auth_headers):
+    owner = auth_headers(create_user("rec-owner@x.com"))
+    animals = _post(client, owner, "Cat cuddling", "Animals")
+    trees = _post(client, owner, "Tree planting", "Environment")
+    clinic = _post(client, owner, "Clinic greeter", "Health")
+    tutoring = _post(client, owner, "Reading buddies", "Education")
+
+    user_id = create_user("rec-user@x.com")
+    db.session.add(UserValues(user_id=user_id, value="Animal Welfare"))
+    db.session.add(UserValues(user_id=user_id, value="Environment"))
+    db.session.add(SignUp(user_id=user_id, listing_id=tutoring, status="accepted"))
+    db.session.commit()
+
+    resp = client.get("/listings/recommended?limit=3", headers=auth_headers(user_id))
+    assert resp.status_code == 200
+    ranked = resp.get_json()
+    # Equal scores rank the newer listing first. The tutoring listing is
+    # already signed up for, so the last slot goes to the newest other one.
+    assert [row["id"] for row in ranked] == [trees, animals, clinic]
+    assert ranked[0]["score"] == ranked[1]["score"] > 0
+    assert ranked[2]["score"] == 0
+
+
+def test_index_follows_listing_writes(client, create_user, auth_headers):
+    owner_id = create_user("rec-owner2@x.com")
+    owner = auth_headers(owner_id)
+
+    def top_ids():
+        return [lid for lid, score in index.recommend(["Technology"]) if score > 0]
+
+    assert top_ids() == []
+    lid = _post(client, owner, "Coding club", description="Teach kids coding")
+    assert top_ids() == [lid]
+
+    client.put(f"/listings/{lid}", json={"description": "Board games"}, headers=owner)
+    client.put(f"/listings/{lid}", json={"title": "Game night"}, headers=owner)
+    assert top_ids() == []
+
+    client.put(f"/listings/{lid}", json={"title": "Tech help desk"}, headers=owner)
+    assert top_ids() == [lid]
+    # Owners are not recommended their own listings.
+    assert lid not in [i for i, _ in index.recommend(["Technology"], user_id=owner_id)]
+
+    client.delete(f"/listings/{lid}", headers=owner)
+    assert top_ids() == []
+
+
+def test_recommended_requires_auth(client):
+    assert client.get("/listings/recommended").status_code == 401
+
+
+def test_signup_history_boosts_category(client, create_user, auth_headers):
+    owner = auth_headers(create_user("rec-owner3@x.com"))
+    first = _post(client, owner, "Homework help", "Education")
+    second = _post(client, owner, "Library shelving", "Education")
+    other = _post(client, owner, "Food drive", "Community")
+
+    history = [db.session.get(Listing, first).category_id]
+    scores = dict(index.recommend([], history=history, exclude=[first]))
+    assert scores[second] > 0 and scores[second] > scores.get(other, 0)
+
+
+def test_history_boost_scores_only_the_newest_k_per_category(
+    client, create_user, auth_headers
+):
+    owner = auth_headers(create_user("rec-owner4@x.com"))
+    health = [_post(client, owner, f"Ward round {i}", "Health") for i in range(5)]
+    category_id = db.session.get(Listing, health[0]).category_id
+
+    ranked = index.recommend([], history=[category_id] * 2, exclude=health[4:], k=2)
+    assert ranked == [(health[3], 1.0), (health[2], 1.0)]
+
+
+def test_history_counts_only_active_signups(client, create_user, auth_headers):
+    owner = auth_headers(create_user("rec-owner5@x.com"))
+    party = _post(client, owner, "Street party", "Community")
+    past = [_post(client, owner, f"Block party {i}", "Community") for i in range(3)]
+    user_id = create_user("rec-user5@x.com")
+    for listing_id, status in zip(past, ("declined", "cancelled", "waitlisted")):
+        db.session.add(SignUp(user_id=user_id, listing_id=listing_id, status=status))
+    db.session.commit()
+
+    def party_score():
+        resp = client.get(
+            "/listings/recommended?limit=50", headers=auth_headers(user_id)
+        )
+        return {row["id"]: row["score"] for row in resp.get_json()}.get(party, 0)
+
+    assert party_score() == 0
+    db.session.add(SignUp(user_id=user_id, listing_id=past[2], status="accepted"))
+    db.session.commit()
+    assert party_score() > 0
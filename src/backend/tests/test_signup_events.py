@@ -0,0 +1,186 @@
+"""Tests for the Server-Sent Event streams of signup changes."""
+
+import json
+import zlib
+
+import pytest
+
+from app import app
+from auth import token_for
+from signup_events import Broker, current_broker
+
+
+@pytest.fixture(autouse=True)
+def short_keepalive(client, monkeypatch):
+    monkeypatch.setitem(app.config, "SSE_KEEPALIVE_SECONDS", 0.01)
+
+
+def _fields(chunk):
+    return dict(line.split(": ", 1) for line in chunk.decode().splitlines() if line)
+
+
+def _events(chunks, count, ids=None):
+    """Read ``count`` signup events from an open stream, skipping keepalives."""
+    events = []
+    while len(events) < count:
+        fields = _fields(next(chunks))
+        if fields.get("event") == "signup":
+            events.append(json.loads(fields["data"]))
+            if ids is not None:
+                ids.append(int(fields["id"]))
+    return events
+
+
+def test_owner_and_volunteer_streams(client, create_user, auth_headers):
+    owner = create_user("sse-owner@x.com")
+    first, second = create_user("sse-v1@x.com"), create_user("sse-v2@x.com")
+    listing_id = client.post(
+        "/listings",
+        json={"title": "Live", "description": "D", "capacity": 1},
+        headers=auth_headers(owner),
+    ).get_json()["id"]
+    url = f"/listings/{listing_id}/signups/stream"
+
+    assert client.get(url).status_code == 401
+    assert client.get(url, headers=auth_headers(first)).status_code == 403
+
+    # EventSource cannot send headers, so the token rides in the query string.
+    owner_stream = client.get(f"{url}?jwt={token_for(owner)}", buffered=False)
+    assert owner_stream.mimetype == "text/event-stream"
+    volunteer_stream = client.get(
+        "/user/signups/stream", headers=auth_headers(second), buffered=False
+    )
+    owner_chunks = iter(owner_stream.response)
+    volunteer_chunks = iter(volunteer_stream.response)
+    assert next(owner_chunks) == next(volunteer_chunks) == b"retry: 3000\n\n"
+    assert current_broker().status()["subscribers"] == 2
+
+    signup_ids = []
+    for user in (first, second):
+        resp = client.post(
+            f"/listings/{listing_id}/signup", json={}, headers=auth_headers(user)
+        )
+        signup_ids.append(resp.get_json()["id"])
+    client.put(
+        f"/signups/{signup_ids[0]}",
+        json={"status": "cancelled"},
+        headers=auth_headers(first),
+    )
+
+    seen = [(e["type"], e["signup"]["status"]) for e in _events(owner_chunks, 4)]
+    assert seen[:2] == [("created", "pending"), ("created", "waitlisted")]
+    assert sorted(seen[2:]) == [("updated", "cancelled"), ("updated", "pending")]
+    # The volunteer only hears about their own signup, promotion included.
+    events = _events(volunteer_chunks, 2)
+    assert [(e["signup"]["id"], e["signup"]["status"]) for e in events] == [
+        (signup_ids[1], "waitlisted"),
+        (signup_ids[1], "pending"),
+    ]
+
+    owner_stream.close()
+    volunteer_stream.close()
+    assert current_broker().status()["subscribers"] == 0
+
+
+def test_gzip_stream_flushes_events_and_closes(client, create_user, auth_headers):
+    user = create_user("sse-gzip@x.com")
+    resp = client.get(
+        "/user/signups/stream",
+        headers={**auth_headers(user), "Accept-Encoding": "gzip"},
+        buffered=False,
+    )
+    assert resp.headers["Content-Encoding"] == "gzip"
+    chunks = iter(resp.response)
+    decoder = zlib.decompressobj(31)
+    assert decoder.decompress(next(chunks)) == b"retry: 3000\n\n"
+    current_broker().publish(f"user:{user}", json.dumps({"type": "created"}))
+    text = ""
+    while "event: signup" not in text:
+        text += decoder.decompress(next(chunks)).decode()
+    assert 'data: {"type": "created"}' in text
+
+    resp.close()
+    assert current_broker().status()["subscribers"] == 0
+
+
+def test_slow_subscriber_is_dropped():
+    broker = Broker(queue_size=2)
+    slow = broker.subscribe(["listing:1"])
+    for i in range(3):
+        broker.publish("listing:1", str(i))
+    assert slow.overflowed
+    first, second = slow.get(0), slow.get(0)
+    assert [first[1], second[1], slow.get(0)] == ["0", "1", None]
+    assert first[0] < second[0]
+    slow.close()
+    assert broker.status() == {
+        "backend": "memory",
+        "subscribers": 0,
+        "max_subscribers": None,
+    }
+
+
+def test_streams_per_worker_are_capped(client, create_user, monkeypatch, auth_headers):
+    user = create_user("sse-cap@x.com")
+    monkeypatch.setattr(current_broker(), "max_subscribers", 1)
+    first = client.get(
+        "/user/signups/stream", headers=auth_headers(user), buffered=False
+    )
+    # Subscribed before the body is read, so this event is not missed.
+    current_broker().publish(f"user:{user}", json.dumps({"type": "created"}))
+
+    # Not an error status, which EventSource would not retry.
+    resp = client.get("/user/signups/stream", headers=auth_headers(user))
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/event-stream"
+    assert resp.get_data(as_text=True) == "retry: 15000\n\n"
+
+    assert _events(iter(first.response), 1) == [{"type": "created"}]
+    first.close()
+    # A stream closed before its body was read gives its slot back too.
+    unread = client.get(
+        "/user/signups/stream", headers=auth_headers(user), buffered=False
+    )
+    assert unread.status_code == 200
+    unread.close()
+    assert current_broker().status()["subscribers"] == 0
+
+
+def test_reconnect_replays_missed_events(client, create_user, auth_headers):
+    user = create_user("sse-replay@x.com")
+    channel = f"user:{user}"
+    stream = client.get(
+        "/user/signups/stream", headers=auth_headers(user), buffered=False
+    )
+    current_broker().publish(channel, json.dumps({"n": 1}))
+    ids = []
+    assert _events(iter(stream.response), 1, ids) == [{"n": 1}]
+    stream.close()
+
+    # Published while the client was away: one for it, one for someone else.
+    current_broker().publish(channel, json.dumps({"n": 2}))
+    current_broker().publish("user:0", json.dumps({"n": "other"}))
+    current_broker().publish(channel, json.dumps({"n": 3}))
+
+    stream = client.get(
+        "/user/signups/stream",
+        headers={**auth_headers(user), "Last-Event-ID": str(ids[0])},
+        buffered=False,
+    )
+    chunks = iter(stream.response)
+    assert next(chunks) == b"retry: 3000\n\n"
+    assert _events(chunks, 2, ids) == [{"n": 2}, {"n": 3}]
+    assert ids == sorted(ids)
+    stream.close()
+
+
+def test_reset_when_missed_events_are_gone():
+    broker = Broker(replay_size=2)
+    ids = [broker.publish("listing:1", str(i)) for i in range(3)]
+
+    # The first event fell out of the buffer; the client must reload.
+    assert broker.subscribe(["listing:1"], last_event_id=ids[0] - 1).missed
+    assert broker.subscribe(["listing:1"], last_event_id=0).missed
+    caught_up = broker.subscribe(["listing:1"], last_event_id=ids[0])
+    assert not caught_up.missed
+    assert [caught_up.get(0), caught_up.get(0)] == [(ids[1], "1"), (ids[2], "2")]
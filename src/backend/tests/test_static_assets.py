@@ -0,0 +1,61 @@
+"""Tests for serving the Vite build from the in-memory manifest."""
+
+import gzip
+
+import pytest
+from flask import Flask, request
+
+from static_assets import IMMUTABLE_MAX_AGE, StaticAssets
+
+
+@pytest.fixture
+def static_client(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_text("<html>app</html>")
+    bundle = tmp_path / "assets" / "index-CglF_4OK.js"
+    bundle.write_text("console.log('hi');" * 50)
+    (tmp_path / "assets" / "index-CglF_4OK.js.gz").write_bytes(
+        gzip.compress(bundle.read_bytes())
+    )
+
+    assets = StaticAssets(tmp_path)
+    app = Flask(__name__)
+
+    @app.route("/<path:path>")
+    def serve(path):
+        return assets.serve(path, request)
+
+    return app.test_client()
+
+
+def test_hashed_asset_is_immutable(static_client):
+    resp = static_client.get("/assets/index-CglF_4OK.js")
+    assert resp.status_code == 200
+    assert resp.mimetype in ("text/javascript", "application/javascript")
+    assert resp.cache_control.immutable
+    assert resp.cache_control.max_age == IMMUTABLE_MAX_AGE
+    assert "Content-Encoding" not in resp.headers
+
+
+def test_precompressed_variant_when_accepted(static_client):
+    resp = static_client.get(
+        "/assets/index-CglF_4OK.js", headers={"Accept-Encoding": "br, gzip"}
+    )
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    assert gzip.decompress(resp.data).startswith(b"console.log")
+
+
+def test_index_is_no_cache_and_revalidates(static_client):
+    resp = static_client.get("/index.html")
+    assert resp.cache_control.no_cache
+    etag = resp.headers["ETag"]
+    again = static_client.get("/index.html", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+
+
+def test_spa_fallback_and_missing_assets(static_client):
+    resp = static_client.get("/listings/42")
+    assert resp.status_code == 200
+    assert resp.data == b"<html>app</html>"
+    assert static_client.get("/assets/index-0ldHash1.js").status_code == 404
@@ -0,0 +1,103 @@
+"""Tests for the transactional user_stats counters and their backfill."""
+
+from models import Listing, Review, SignUp, UserStats, db
+from user_stats import backfill, stats_for
+
+
+def _counters(user_id):
+    data = stats_for(user_id).to_dict()
+    del data["user_id"]
+    return data
+
+
+def test_counters_follow_signups_and_reviews(client, create_user, auth_headers):
+    owner_id = create_user("stats-owner@x.com")
+    volunteer_id = create_user("stats-volunteer@x.com")
+    resp = client.post(
+        "/listings",
+        json={"title": "Stats event", "description": "D"},
+        headers=auth_headers(owner_id),
+    )
+    listing_id = resp.get_json()["id"]
+
+    resp = client.post(
+        f"/listings/{listing_id}/signup", json={}, headers=auth_headers(volunteer_id)
+    )
+    signup_id = resp.get_json()["id"]
+    assert _counters(volunteer_id)["signups"] == 1
+    assert _counters(volunteer_id)["accepted_signups"] == 0
+
+    client.put(
+        f"/signups/{signup_id}",
+        json={"status": "accepted"},
+        headers=auth_headers(owner_id),
+    )
+    assert _counters(volunteer_id)["accepted_signups"] == 1
+    client.put(
+        f"/signups/{signup_id}",
+        json={"status": "cancelled"},
+        headers=auth_headers(volunteer_id),
+    )
+    assert _counters(volunteer_id)["accepted_signups"] == 0
+
+    client.post(
+        f"/listings/{listing_id}/reviews",
+        json={"rating": 5},
+        headers=auth_headers(volunteer_id),
+    )
+    assert _counters(volunteer_id)["reviews_written"] == 1
+    assert _counters(owner_id)["five_star_reviews_received"] == 1
+
+    resp = client.get(f"/api/user/{volunteer_id}/stats", headers=auth_headers(owner_id))
+    assert resp.status_code == 200
+    assert resp.get_json() == {
+        "user_id": volunteer_id,
+        "signups": 1,
+        "accepted_signups": 0,
+        "reviews_written": 1,
+        "five_star_reviews_received": 0,
+    }
+
+
+def test_counters_roll_back_with_the_write(client, create_user):
+    user_id = create_user("stats-rollback@x.com")
+    listing = Listing(title="Rollback", description="D")
+    db.session.add(listing)
+    db.session.commit()
+
+    db.session.add(SignUp(user_id=user_id, listing_id=listing.id, status="accepted"))
+    db.session.flush()
+    assert _counters(user_id)["accepted_signups"] == 1
+    db.session.rollback()
+    assert _counters(user_id)["accepted_signups"] == 0
+
+
+def test_backfill_rebuilds_from_rows(client, create_user):
+    owner_id = create_user("stats-owner2@x.com")
+    user_id = create_user("stats-backfill@x.com")
+    listing = Listing(title="Backfill", description="D", owner_id=owner_id)
+    db.session.add(listing)
+    db.session.commit()
+    db.session.add(SignUp(user_id=user_id, listing_id=listing.id, status="accepted"))
+    db.session.add(Review(user_id=user_id, listing_id=listing.id, rating=5))
+    db.session.commit()
+    expected = _counters(user_id), _counters(owner_id)
+
+    # Simulate drift, e.g. from a bulk delete that skipped the flush hook.
+    db.session.query(UserStats).update({UserStats.accepted_signups: 42})
+    db.session.commit()
+    assert _counters(user_id)["accepted_signups"] == 42
+
+    assert backfill() >= 2
+    assert (_counters(user_id), _counters(owner_id)) == expected
+    assert expected[0]["accepted_signups"] == 1
+    assert expected[1]["five_star_reviews_received"] == 1
+
+
+def test_stats_unknown_user(client, create_user, auth_headers):
+    headers = auth_headers(create_user("stats-viewer@x.com"))
+    assert client.get("/api/user/999999/stats", headers=headers).status_code == 404
+
+
+def test_stats_requires_auth(client):
+    assert client.get("/api/user/1/stats").status_code == 401
@@ -0,0 +1,74 @@
+"""Tests for replacing a user's values with PUT /user/values."""
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from models import UserValues, db
+
+
+def _values(client, headers):
+    return sorted(client.get("/user/values", headers=headers).get_json()["values"])
+
+
+def test_put_replaces_values(client, create_user, auth_headers):
+    headers = auth_headers(create_user("values1@x.com"))
+    resp = client.put(
+        "/user/values", json={"values": ["Seniors", "Technology"]}, headers=headers
+    )
+    assert resp.status_code == 200
+    assert resp.get_json()["values"] == ["Seniors", "Technology"]
+
+    resp = client.put(
+        "/user/values",
+        json={"values": ["Technology", "Environment", "Environment"]},
+        headers=headers,
+    )
+    assert resp.status_code == 200
+    assert _values(client, headers) == ["Environment", "Technology"]
+
+    resp = client.put("/user/values", json={"values": []}, headers=headers)
+    assert resp.status_code == 200
+    assert _values(client, headers) == []
+
+
+def test_put_writes_only_the_difference(client, create_user, auth_headers):
+    headers = auth_headers(create_user("values2@x.com"))
+    client.put("/user/values", json={"values": ["A", "B", "C"]}, headers=headers)
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        resp = client.put(
+            "/user/values", json={"values": ["B", "C", "D", "E"]}, headers=headers
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert resp.status_code == 200
+    assert statements.count("INSERT") == 1
+    assert statements.count("DELETE") == 1
+    assert _values(client, headers) == ["B", "C", "D", "E"]
+
+
+def test_put_validates_payload(client, create_user, auth_headers):
+    headers = auth_headers(create_user("values3@x.com"))
+    for body in ({}, {"values": "Seniors"}, {"values": [1]}, {"values": ["x" * 51]}):
+        assert client.put("/user/values", json=body, headers=headers).status_code == 400
+
+
+def test_values_are_unique_per_user(client, create_user, auth_headers):
+    user_id = create_user("values4@x.com")
+    headers = auth_headers(user_id)
+    client.post("/user/values", json={"value": "Seniors"}, headers=headers)
+    client.post("/user/values", json={"value": "Seniors"}, headers=headers)
+    assert _values(client, headers) == ["Seniors"]
+
+    db.session.add(UserValues(user_id=user_id, value="Seniors"))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
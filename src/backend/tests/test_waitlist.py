@@ -0,0 +1,90 @@
+"""Tests for the FIFO waitlist on full listings."""
+
+from models import Listing, SignUp, db
+
+
+def _sign_up(client, listing_id, headers):
+    resp = client.post(f"/listings/{listing_id}/signup", json={}, headers=headers)
+    assert resp.status_code == 201
+    return resp.get_json()
+
+
+def _status(client, signup_id, status, headers):
+    return client.put(f"/signups/{signup_id}", json={"status": status}, headers=headers)
+
+
+def _state(signup_id):
+    signup = db.session.get(SignUp, signup_id)
+    db.session.refresh(signup)
+    return signup.status, signup.waitlist_position
+
+
+def _setup(client, create_user, auth_headers, prefix, capacity, volunteers):
+    owner = create_user(f"{prefix}-owner@x.com")
+    resp = client.post(
+        "/listings",
+        json={"title": "Waitlist", "description": "D", "capacity": capacity},
+        headers=auth_headers(owner),
+    )
+    listing_id = resp.get_json()["id"]
+    users = [create_user(f"{prefix}-v{i}@x.com") for i in range(volunteers)]
+    signups = [_sign_up(client, listing_id, auth_headers(user)) for user in users]
+    return owner, listing_id, users, signups
+
+
+def test_full_listing_waitlists_in_order(client, create_user, auth_headers):
+    owner, listing_id, users, signups = _setup(
+        client, create_user, auth_headers, "wl", 1, 4
+    )
+    assert [s["status"] for s in signups] == ["pending"] + ["waitlisted"] * 3
+    assert [s["waitlist_position"] for s in signups] == [None, 1, 2, 3]
+
+    # The second in line gives up; a cancellation then promotes the third.
+    assert (
+        _status(
+            client, signups[2]["id"], "cancelled", auth_headers(users[2])
+        ).status_code
+        == 200
+    )
+    assert _state(signups[2]["id"]) == ("cancelled", None)
+    assert (
+        _status(
+            client, signups[0]["id"], "cancelled", auth_headers(users[0])
+        ).status_code
+        == 200
+    )
+    assert _state(signups[1]["id"]) == ("pending", None)
+    assert _state(signups[3]["id"]) == ("waitlisted", 3)
+
+    # Declining the promoted volunteer moves the next one up.
+    assert (
+        _status(client, signups[1]["id"], "declined", auth_headers(owner)).status_code
+        == 200
+    )
+    assert _state(signups[3]["id"]) == ("pending", None)
+    listing = db.session.get(Listing, listing_id)
+    db.session.refresh(listing)
+    assert listing.filled == 1
+
+
+def test_raising_capacity_promotes_the_waitlist(client, create_user, auth_headers):
+    owner, listing_id, _, signups = _setup(
+        client, create_user, auth_headers, "wl-cap", 1, 4
+    )
+    resp = client.put(
+        f"/listings/{listing_id}", json={"capacity": 3}, headers=auth_headers(owner)
+    )
+    assert resp.get_json()["filled"] == 3
+    assert [_state(s["id"])[0] for s in signups] == [
+        "pending",
+        "pending",
+        "pending",
+        "waitlisted",
+    ]
+
+    # Owners cannot accept past the capacity.
+    assert (
+        _status(client, signups[3]["id"], "accepted", auth_headers(owner)).status_code
+        == 409
+    )
+    assert _state(signups[3]["id"]) == ("waitlisted", 3)
@@ -0,0 +1,204 @@
+"""Keep ``user_stats`` counters in step with signup and review writes.
+
+An ``after_flush`` hook turns the SignUp/Review rows a flush inserted,
+updated or deleted into per-user counter deltas and applies them with one
+upsert per user on the flush's own connection, so the counters commit or
+roll back together with the rows they count:
+
+* ``signups`` — signups the user made (any status)
+* ``accepted_signups`` — of those, currently ``accepted``
+* ``reviews_written`` — reviews the user wrote
+* ``five_star_reviews_received`` — 5-star reviews of listings the user owns
+
+Once the transaction commits, ``user_stats_changed`` is sent with the ids
+of the users whose counters changed.
+
+Bulk ``query.update()``/``delete()`` statements skip the hook; code that
+uses them must adjust the counters itself (``adjust``) or run
+``backfill()`` (``python manage.py backfill-user-stats``).
+
+Signups and reviews moved to the archive tables by ``maintenance.py`` still
+count: archiving leaves the counters alone and ``backfill()`` reads the
+archives too.
+"""
+
+from collections import Counter, defaultdict
+
+from blinker import Namespace
+from sqlalchemy import delete, event, func, inspect, insert, select, union_all, update
+
+from db_routing import RoutingSession
+from models import (
+    Listing,
+    ListingArchive,
+    Review,
+    ReviewArchive,
+    SignUp,
+    SignUpArchive,
+    UserStats,
+    db,
+    dialect_insert,
+)
+
+ACCEPTED = "accepted"
+
+_signals = Namespace()
+user_stats_changed = _signals.signal("user-stats-changed")
+
+_PENDING_KEY = "user_stats_changed"
+
+
+def _old_value(obj, attr):
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, attr)
+
+
+def _signup_deltas(deltas, session):
+    for signup in session.new:
+        if isinstance(signup, SignUp):
+            deltas[signup.user_id]["signups"] += 1
+            if signup.status == ACCEPTED:
+                deltas[signup.user_id]["accepted_signups"] += 1
+    for signup in session.dirty:
+        if isinstance(signup, SignUp):
+            old = _old_value(signup, "status") == ACCEPTED
+            new = signup.status == ACCEPTED
+            if old != new:
+                deltas[signup.user_id]["accepted_signups"] += 1 if new else -1
+    for signup in session.deleted:
+        if isinstance(signup, SignUp):
+            deltas[signup.user_id]["signups"] -= 1
+            if _old_value(signup, "status") == ACCEPTED:
+                deltas[signup.user_id]["accepted_signups"] -= 1
+
+
+def _review_deltas(deltas, session, connection):
+    five_star = []  # (listing id, +1/-1)
+    for sign, reviews in ((1, session.new), (-1, session.deleted)):
+        for review in reviews:
+            if isinstance(review, Review):
+                if review.user_id is not None:
+                    deltas[review.user_id]["reviews_written"] += sign
+                if review.rating == 5 and review.listing_id is not None:
+                    five_star.append((review.listing_id, sign))
+    if not five_star:
+        return
+    owners = dict(
+        connection.execute(
+            select(Listing.id, Listing.owner_id).where(
+                Listing.id.in_({listing_id for listing_id, _ in five_star})
+            )
+        ).all()
+    )
+    for listing_id, sign in five_star:
+        owner_id = owners.get(listing_id)
+        if owner_id is not None:
+            deltas[owner_id]["five_star_reviews_received"] += sign
+
+
+def apply_deltas(connection, deltas):
+    """Add ``{user_id: {counter: delta}}`` to the stored counters."""
+    table = UserStats.__table__
+    upsert = dialect_insert(connection.dialect.name)
+    for user_id, counters in deltas.items():
+        counters = {name: delta for name, delta in counters.items() if delta}
+        if not counters:
+            continue
+        increments = {name: table.c[name] + delta for name, delta in counters.items()}
+        row = dict.fromkeys(UserStats.COUNTERS, 0)
+        row.update(counters, user_id=user_id)
+        if upsert is not None:
+            # Atomic even when two transactions create the same user's row.
+            connection.execute(
+                upsert(table)
+                .values(row)
+                .on_conflict_do_update(index_elements=["user_id"], set_=increments)
+            )
+            continue
+        changed = connection.execute(
+            update(table).where(table.c.user_id == user_id).values(increments)
+        ).rowcount
+        if not changed:
+            connection.execute(insert(table).values(row))
+
+
+def adjust(session, deltas):
+    """Apply ``{user_id: {counter: delta}}`` in the session's transaction."""
+    apply_deltas(session.connection(), deltas)
+    session.info.setdefault(_PENDING_KEY, set()).update(deltas)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _update_user_stats(session, flush_context):
+    deltas = defaultdict(Counter)
+    _signup_deltas(deltas, session)
+    _review_deltas(deltas, session, session.connection())
+    if deltas:
+        adjust(session, deltas)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _announce_changes(session):
+    user_ids = session.info.pop(_PENDING_KEY, None)
+    if user_ids:
+        user_stats_changed.send(session, user_ids=user_ids)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard_changes(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def backfill():
+    """Recompute every user's counters; return rows written.
+
+    Counts signups and reviews in both the live and the archive tables.
+    """
+    stats = defaultdict(lambda: dict.fromkeys(UserStats.COUNTERS, 0))
+    signups = union_all(
+        select(SignUp.user_id, SignUp.status),
+        select(SignUpArchive.user_id, SignUpArchive.status),
+    ).subquery()
+    reviews = union_all(
+        select(Review.user_id, Review.listing_id, Review.rating),
+        select(ReviewArchive.user_id, ReviewArchive.listing_id, ReviewArchive.rating),
+    ).subquery()
+    listings = union_all(
+        select(Listing.id, Listing.owner_id),
+        select(ListingArchive.id, ListingArchive.owner_id),
+    ).subquery()
+    queries = {
+        "signups": select(signups.c.user_id, func.count()).group_by(signups.c.user_id),
+        "accepted_signups": select(signups.c.user_id, func.count())
+        .where(signups.c.status == ACCEPTED)
+        .group_by(signups.c.user_id),
+        "reviews_written": select(reviews.c.user_id, func.count())
+        .where(reviews.c.user_id.is_not(None))
+        .group_by(reviews.c.user_id),
+        "five_star_reviews_received": select(listings.c.owner_id, func.count())
+        .join(reviews, reviews.c.listing_id == listings.c.id)
+        .where(reviews.c.rating == 5, listings.c.owner_id.is_not(None))
+        .group_by(listings.c.owner_id),
+    }
+    for name, query in queries.items():
+        for user_id, count in db.session.execute(query):
+            stats[user_id][name] = count
+
+    db.session.execute(delete(UserStats))
+    if stats:
+        db.session.execute(
+            insert(UserStats),
+            [dict(counters, user_id=user_id) for user_id, counters in stats.items()],
+        )
+    db.session.commit()
+    return len(stats)
+
+
+def stats_for(user_id):
+    """Counters for ``user_id`` (all zero when the user has no activity)."""
+    stats = db.session.get(UserStats, user_id)
+    if stats is None:
+        return UserStats(user_id=user_id, **dict.fromkeys(UserStats.COUNTERS, 0))
+    return stats
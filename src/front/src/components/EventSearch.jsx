@@ -55,9 +55,15 @@ export default function EventSearch() {
             <div className="results-container">
                 {results.map((item, index) => (
                     <div key={index} className="result-item">
-                        <h3><a href={item.link} target="_blank" rel="noopener noreferrer">{item.title}</a></h3>
+                        {item.link ? (
+                            <h3><a href={item.link} target="_blank" rel="noopener noreferrer">{item.title}</a></h3>
+                        ) : (
+                            <h3>{item.title} <span className="result-source">Tapin listing</span></h3>
+                        )}
                         <p>{item.snippet}</p>
-                        <a href={item.link} target="_blank" rel="noopener noreferrer" className="result-link">View Opportunity</a>
+                        {item.link && (
+                            <a href={item.link} target="_blank" rel="noopener noreferrer" className="result-link">View Opportunity</a>
+                        )}
                     </div>
                 ))}
             </div>
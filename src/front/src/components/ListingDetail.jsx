@@ -24,6 +24,7 @@ export default function ListingDetail({
   const [reviews, setReviews] = useState([]);
   const [averageRating, setAverageRating] = useState(null);
   const [loadingReviews, setLoadingReviews] = useState(false);
+  const [signups, setSignups] = useState([]);
 
   if (!listing) return null;
 
@@ -58,6 +59,45 @@ export default function ListingDetail({
     fetchReviews();
   }, [listing.id]);
 
+  useEffect(() => {
+    if (!isOwner || !token) return undefined;
+    let cancelled = false;
+
+    async function fetchSignups() {
+      try {
+        const res = await fetch(`${API_URL}/listings/${listing.id}/signups`, {
+          headers: { Authorization: `Bearer ${token}` },
+        });
+        if (res.ok && !cancelled) setSignups(await res.json());
+      } catch (err) {
+        console.error('Error fetching sign-ups:', err);
+      }
+    }
+
+    fetchSignups();
+    // EventSource cannot send headers, so the token goes in the query string.
+    // The browser reconnects by itself when the server ends the stream,
+    // including when it is busy and only sends a longer retry delay.
+    const stream = new EventSource(
+      `${API_URL}/listings/${listing.id}/signups/stream?jwt=${encodeURIComponent(token)}`,
+    );
+    stream.addEventListener('signup', (e) => {
+      const { signup } = JSON.parse(e.data);
+      setSignups((current) =>
+        current.some((s) => s.id === signup.id)
+          ? current.map((s) => (s.id === signup.id ? { ...s, ...signup } : s))
+          : [signup, ...current],
+      );
+    });
+    // Sent when events were missed while disconnected.
+    stream.addEventListener('reset', fetchSignups);
+
+    return () => {
+      cancelled = true;
+      stream.close();
+    };
+  }, [listing.id, isOwner, token]);
+
   function handleReviewAdded(newReview) {
     setReviews([newReview, ...reviews]);
 
@@ -236,6 +276,34 @@ export default function ListingDetail({
               )}
             </div>
 
+            {isOwner && (
+              <div style={{ marginTop: '24px', borderTop: '1px solid #eee', paddingTop: '16px' }}>
+                <h3 style={{ margin: '0 0 16px' }}>Sign-ups ({signups.length})</h3>
+                {signups.length === 0 ? (
+                  <p style={{ textAlign: 'center', color: '#666', fontStyle: 'italic' }}>
+                    No sign-ups yet.
+                  </p>
+                ) : (
+                  <ul style={{ listStyle: 'none', margin: 0, padding: 0 }}>
+                    {signups.map((signup) => (
+                      <li
+                        key={signup.id}
+                        style={{
+                          display: 'flex',
+                          justifyContent: 'space-between',
+                          padding: '8px 0',
+                          borderBottom: '1px solid #f0f0f0',
+                        }}
+                      >
+                        <span>{signup.user_email || `Volunteer #${signup.user_id}`}</span>
+                        <small style={{ color: '#666' }}>{signup.status}</small>
+                      </li>
+                    ))}
+                  </ul>
+                )}
+              </div>
+            )}
+
             {error && (
               <div className="error" role="alert">
                 {error}
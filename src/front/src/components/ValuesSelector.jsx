@@ -45,27 +45,14 @@ export default function ValuesSelector({ user, onSave }) {
     const handleSave = async () => {
         const token = localStorage.getItem('access_token');
 
-        for (const value of selectedValues) {
-            await fetch('/user/values', {
-                method: 'DELETE',
-                headers: {
-                    'Content-Type': 'application/json',
-                    'Authorization': `Bearer ${token}`
-                },
-                body: JSON.stringify({ value })
-            });
-        }
-
-        for (const value of selectedValues) {
-            await fetch('/user/values', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                    'Authorization': `Bearer ${token}`
-                },
-                body: JSON.stringify({ value })
-            });
-        }
+        await fetch('/user/values', {
+            method: 'PUT',
+            headers: {
+                'Content-Type': 'application/json',
+                'Authorization': `Bearer ${token}`
+            },
+            body: JSON.stringify({ values: selectedValues })
+        });
         if (onSave) {
             onSave(selectedValues);
         }
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Precompress the Vite build and write the static asset manifest.
+
+Walks the build output (default: dist/), writes `.gz` and, when the
+`brotli` package is installed, `.br` siblings for compressible files, and
+records a strong ETag (SHA-256 of the content) per file, with the size
+and mtime it was computed for, in `dist/.static-manifest.json`.
+`src/backend/static_assets.py` reads that manifest to serve the
+precompressed variants with stable ETags.
+
+Files are compressed in parallel with a process pool. A file whose content
+hash matches the previous manifest and whose siblings still exist is
+skipped, so re-running after a partial rebuild only touches what changed.
+
+Run from repo root after `npm run build`:
+  python3 tools/compress_assets.py [dist] [--workers N]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # gzip-only when brotli is not installed
+    brotli = None
+
+# Keep in sync with MANIFEST_NAME in src/backend/static_assets.py
+MANIFEST_NAME = ".static-manifest.json"
+COMPRESSIBLE = {
+    ".css",
+    ".html",
+    ".js",
+    ".json",
+    ".map",
+    ".mjs",
+    ".svg",
+    ".txt",
+    ".wasm",
+    ".xml",
+}
+MIN_SIZE = 256  # bytes; smaller files gain nothing from compression
+SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
+
+def sha256_of(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _compress(data, encoding):
+    if encoding == "gzip":
+        # mtime=0 keeps the output byte-for-byte reproducible.
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return brotli.compress(data, quality=11)
+
+
+def compress_file(path, encodings):
+    """Write compressed siblings of `path`; return {encoding: size}.
+
+    A variant that is not smaller than the original is removed instead.
+    """
+    data = Path(path).read_bytes()
+    written = {}
+    for encoding in encodings:
+        target = Path(path + SUFFIXES[encoding])
+        compressed = _compress(data, encoding)
+        if len(compressed) < len(data):
+            target.write_bytes(compressed)
+            written[encoding] = len(compressed)
+        elif target.exists():
+            target.unlink()
+    return written
+
+
+def load_manifest(root):
+    try:
+        with open(root / MANIFEST_NAME) as fh:
+            return json.load(fh).get("files", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def iter_files(root):
+    suffixes = tuple(SUFFIXES.values())
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            if filename == MANIFEST_NAME or filename.endswith(suffixes):
+                continue
+            full = Path(dirpath) / filename
+            yield full.relative_to(root).as_posix(), full
+
+
+def build(root, workers=None):
+    """Compress `root` in place and write its manifest; return the manifest."""
+    root = Path(root)
+    previous = load_manifest(root)
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+    files, jobs = {}, {}
+    skipped = 0
+
+    for relpath, full in iter_files(root):
+        digest = sha256_of(full)
+        stat = full.stat()
+        entry = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest,
+            "etag": digest[:32],
+            "encodings": {},
+        }
+        files[relpath] = entry
+        if full.suffix not in COMPRESSIBLE or entry["size"] < MIN_SIZE:
+            continue
+        entry["tried"] = encodings
+        old = previous.get(relpath, {})
+        old_encodings = old.get("encodings", {})
+        if (
+            old.get("sha256") == digest
+            and set(old.get("tried", [])) >= set(encodings)
+            and all(Path(str(full) + SUFFIXES[e]).exists() for e in old_encodings)
+        ):
+            entry["encodings"] = old_encodings
+            skipped += 1
+            continue
+        jobs[relpath] = str(full)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            relpath: pool.submit(compress_file, path, encodings)
+            for relpath, path in jobs.items()
+        }
+        for relpath, future in futures.items():
+            sizes = future.result()
+            files[relpath]["encodings"] = {
+                encoding: {"size": size} for encoding, size in sizes.items()
+            }
+
+    manifest = {"version": 1, "files": files}
+    with open(root / MANIFEST_NAME, "w") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    print(
+        f"{len(files)} files, {len(jobs)} compressed, {skipped} unchanged "
+        f"({', '.join(encodings)})"
+    )
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompress the Vite build.")
+    parser.add_argument("root", nargs="?", default="dist")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+    if not Path(args.root).is_dir():
+        print(f"{args.root} is not a directory", file=sys.stderr)
+        return 1
+    build(args.root, workers=args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())